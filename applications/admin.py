@@ -11,7 +11,9 @@ from django_ilmoitin.utils import send_notification
 from parler.admin import TranslatableAdmin
 from pytz import timezone
 
+from berth_reservations.translated_names import translated_names
 from exports.xlsx_writer import BerthApplicationXlsx, WinterStorageApplicationXlsx
+from resources.models import Harbor
 
 from .enums import ApplicationAreaType
 from .models import (
@@ -208,7 +210,7 @@ class BerthApplicationAdmin(admin.ModelAdmin):
 
     def get_berth_switch_berth(self, obj):
         return (
-            f"{obj.berth_switch.berth.pier.harbor.name} "
+            f"{translated_names.get(Harbor, obj.berth_switch.berth.pier.harbor_id)} "
             f"({obj.berth_switch.berth.pier.identifier}) "
             f"{obj.berth_switch.berth.number}"
         )
@@ -216,7 +218,9 @@ class BerthApplicationAdmin(admin.ModelAdmin):
     get_berth_switch_berth.short_description = _("Berth")
 
     def get_berth_switch_reason(self, obj):
-        return obj.berth_switch.reason.title
+        return translated_names.get(
+            BerthSwitchReason, obj.berth_switch.reason_id, field="title"
+        )
 
     get_berth_switch_reason.short_description = _("Reason")
 
@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+
+from applications.matching import DEFAULT_CANDIDATES_LIMIT, match_berth_applications
+
+
+class Command(BaseCommand):
+    help = (
+        "List the available berths suitable for each pending berth application, "
+        "ranked by the harbor choices and the best fit"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=DEFAULT_CANDIDATES_LIMIT,
+            help="The maximum number of berths listed for each application",
+        )
+
+    def handle(self, *args, **options):
+        matches = match_berth_applications(limit=options["limit"])
+
+        for match in matches:
+            berth_ids = ", ".join(str(berth_id) for berth_id in match.berth_ids)
+            self.stdout.write(f"{match.application_id}: {berth_ids or '-'}")
+
+        unmatched = sum(1 for match in matches if not match.berth_ids)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Matched {len(matches)} applications, "
+                f"{unmatched} without suitable berths"
+            )
+        )
@@ -0,0 +1,333 @@
+"""
+Batch matching of the applications with the available berths and winter storage places.
+
+All the available berths (or places) are loaded once into compact arrays, grouped by
+harbor (or area) and sorted by their width, so the suitable ones for each application
+are found with a binary search on the boat width instead of querying them separately
+for each application.
+
+The unmarked applications are checked against the free area stored on the sections,
+so they are answered by the database in a single query.
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+)
+
+from resources.models import Berth, WinterStoragePlace, WinterStorageSection
+
+from .enums import ApplicationAreaType, ApplicationStatus
+from .models import (
+    BerthApplication,
+    HarborChoice,
+    WinterStorageApplication,
+    WinterStorageAreaChoice,
+)
+
+DEFAULT_CANDIDATES_LIMIT = 10
+
+
+@dataclass(frozen=True)
+class BerthApplicationMatch:
+    application_id: int
+    # The suitable berths, the best candidate first
+    berth_ids: List[UUID]
+
+
+@dataclass(frozen=True)
+class WinterStoragePlaceSuggestion:
+    application_id: int
+    # None when there's no free place left for the boat on the chosen areas
+    place_id: Optional[UUID]
+
+
+@dataclass(frozen=True)
+class UnmarkedWinterStorageFit:
+    application_id: int
+    # The section with the most free area the boat fits in, None if it doesn't fit
+    section_id: Optional[UUID]
+
+    @property
+    def fits(self) -> bool:
+        return self.section_id is not None
+
+
+@dataclass(frozen=True)
+class _Boat:
+    width: float
+    length: float
+    draught: float
+    accessibility_required: bool
+
+
+class _HarborBerths:
+    """The available berths of a harbor, sorted by the width and the length"""
+
+    def __init__(self):
+        self.ids: List[UUID] = []
+        self.widths = array("d")
+        self.lengths = array("d")
+        # The depth is infinite when it's not known, so it doesn't limit the boats
+        self.depths = array("d")
+        self.accessible = array("b")
+
+    def append(self, berth_id, width, length, depth, is_accessible) -> None:
+        self.ids.append(berth_id)
+        self.widths.append(width)
+        self.lengths.append(length)
+        self.depths.append(math.inf if depth is None else depth)
+        self.accessible.append(bool(is_accessible))
+
+    def find(self, boat: _Boat, limit: int) -> List[UUID]:
+        """The berths suitable for the boat, the narrowest (i.e. best fitting) first"""
+        berth_ids = []
+        for i in range(bisect_left(self.widths, boat.width), len(self.ids)):
+            if (
+                self.lengths[i] < boat.length
+                or self.depths[i] < boat.draught
+                or (boat.accessibility_required and not self.accessible[i])
+            ):
+                continue
+            berth_ids.append(self.ids[i])
+            if len(berth_ids) == limit:
+                break
+        return berth_ids
+
+
+def _load_available_berths() -> Dict[UUID, _HarborBerths]:
+    berths_by_harbor = defaultdict(_HarborBerths)
+    for berth_id, harbor_id, width, length, depth, is_accessible in (
+        Berth.objects.filter(is_available=True, is_active=True)
+        .order_by(
+            "pier__harbor_id", "berth_type__width", "berth_type__length", "number"
+        )
+        .values_list(
+            "id",
+            "pier__harbor_id",
+            "berth_type__width",
+            "berth_type__length",
+            "berth_type__depth",
+            "is_accessible",
+        )
+        .iterator()
+    ):
+        berths_by_harbor[harbor_id].append(
+            berth_id,
+            float(width),
+            float(length),
+            None if depth is None else float(depth),
+            is_accessible,
+        )
+    return berths_by_harbor
+
+
+def _load_harbor_choices(application_ids) -> Dict[int, List[UUID]]:
+    harbor_ids_by_application = defaultdict(list)
+    for application_id, harbor_id in (
+        HarborChoice.objects.filter(application_id__in=application_ids)
+        .order_by("application_id", "priority")
+        .values_list("application_id", "harbor_id")
+        .iterator()
+    ):
+        harbor_ids_by_application[application_id].append(harbor_id)
+    return harbor_ids_by_application
+
+
+def match_berth_applications(
+    applications: Optional[QuerySet] = None, limit: int = DEFAULT_CANDIDATES_LIMIT
+) -> List[BerthApplicationMatch]:
+    """
+    Rank the available berths suitable for the given applications (by default, all
+    the pending ones). A berth is suitable when the boat fits on it (width, length
+    and draught) and it's accessible if the application requires it. The berths are
+    ranked by the priority of the harbor choices, and then by the best fit.
+
+    The matches are in the order of the applications, which by default is the order
+    they should be handled in (by the application priority and the creation time).
+    """
+    if applications is None:
+        applications = BerthApplication.objects.filter(status=ApplicationStatus.PENDING)
+    applications = list(
+        applications.values_list(
+            "id",
+            "boat__width",
+            "boat__length",
+            "boat__draught",
+            "accessibility_required",
+        )
+    )
+    if not applications:
+        return []
+
+    berths_by_harbor = _load_available_berths()
+    harbor_ids_by_application = _load_harbor_choices([row[0] for row in applications])
+
+    matches = []
+    for application_id, width, length, draught, accessibility_required in applications:
+        boat = _Boat(
+            width=float(width or 0),
+            length=float(length or 0),
+            draught=float(draught or 0),
+            accessibility_required=accessibility_required,
+        )
+        berth_ids = []
+        for harbor_id in harbor_ids_by_application.get(application_id, []):
+            if len(berth_ids) == limit:
+                break
+            if harbor_berths := berths_by_harbor.get(harbor_id):
+                berth_ids += harbor_berths.find(boat, limit - len(berth_ids))
+        matches.append(BerthApplicationMatch(application_id, berth_ids))
+
+    return matches
+
+
+class _AreaPlaces:
+    """The free places of a winter storage area, sorted by the width and the length"""
+
+    def __init__(self):
+        self.ids: List[UUID] = []
+        self.widths = array("d")
+        self.lengths = array("d")
+
+    def append(self, place_id, width, length) -> None:
+        self.ids.append(place_id)
+        self.widths.append(width)
+        self.lengths.append(length)
+
+    def take(self, width: float, length: float) -> Optional[UUID]:
+        """Remove and return the smallest place the boat fits in, if there's any"""
+        for i in range(bisect_left(self.widths, width), len(self.ids)):
+            if self.lengths[i] >= length:
+                del self.widths[i]
+                del self.lengths[i]
+                return self.ids.pop(i)
+        return None
+
+
+def _load_free_places(area_ids) -> Dict[UUID, _AreaPlaces]:
+    places_by_area = defaultdict(_AreaPlaces)
+    for place_id, area_id, width, length in (
+        WinterStoragePlace.objects.filter(
+            winter_storage_section__area_id__in=area_ids,
+            is_available=True,
+            is_active=True,
+        )
+        .order_by(
+            "winter_storage_section__area_id",
+            "place_type__width",
+            "place_type__length",
+            "winter_storage_section__identifier",
+            "number",
+        )
+        .values_list(
+            "id",
+            "winter_storage_section__area_id",
+            "place_type__width",
+            "place_type__length",
+        )
+        .iterator()
+    ):
+        places_by_area[area_id].append(place_id, float(width), float(length))
+    return places_by_area
+
+
+def suggest_winter_storage_places(
+    applications: Optional[QuerySet] = None,
+) -> List[WinterStoragePlaceSuggestion]:
+    """
+    Suggest a free place for each of the given marked winter storage applications
+    (by default, all the pending ones). The applications are handled in their order,
+    which by default is the priority and the creation time, and each one gets the
+    smallest place its boat fits in, from the first area choice with one left.
+    A place is only suggested for a single application.
+    """
+    if applications is None:
+        applications = WinterStorageApplication.objects.filter(
+            status=ApplicationStatus.PENDING, area_type=ApplicationAreaType.MARKED
+        )
+    applications = list(applications.values_list("id", "boat__width", "boat__length"))
+    if not applications:
+        return []
+
+    area_ids_by_application = defaultdict(list)
+    for application_id, area_id in (
+        WinterStorageAreaChoice.objects.filter(
+            application_id__in=[row[0] for row in applications]
+        )
+        .order_by("application_id", "priority")
+        .values_list("application_id", "winter_storage_area_id")
+        .iterator()
+    ):
+        area_ids_by_application[application_id].append(area_id)
+
+    places_by_area = _load_free_places(
+        {
+            area_id
+            for area_ids in area_ids_by_application.values()
+            for area_id in area_ids
+        }
+    )
+
+    suggestions = []
+    for application_id, width, length in applications:
+        place_id = None
+        for area_id in area_ids_by_application.get(application_id, []):
+            if area_places := places_by_area.get(area_id):
+                if place_id := area_places.take(float(width or 0), float(length or 0)):
+                    break
+        suggestions.append(WinterStoragePlaceSuggestion(application_id, place_id))
+
+    return suggestions
+
+
+def check_unmarked_winter_storage_applications(
+    applications: Optional[QuerySet] = None,
+) -> List[UnmarkedWinterStorageFit]:
+    """
+    Check whether the boats of the given unmarked winter storage applications (by
+    default, all the pending ones) fit in the free unmarked area of a section on
+    their chosen area. Each application is checked separately against the current
+    free area, so the result doesn't tell whether all of them fit at the same time.
+    """
+    if applications is None:
+        applications = WinterStorageApplication.objects.filter(
+            status=ApplicationStatus.PENDING, area_type=ApplicationAreaType.UNMARKED
+        )
+
+    area_field = DecimalField(max_digits=10, decimal_places=2)
+    section_qs = (
+        WinterStorageSection.objects.filter(
+            area__winterstorageareachoice__application=OuterRef("pk")
+        )
+        .annotate(
+            free_area=ExpressionWrapper(
+                F("unmarked_capacity") - F("unmarked_allocated_area"),
+                output_field=area_field,
+            )
+        )
+        .filter(free_area__gte=OuterRef("boat_area"))
+        .order_by("area__winterstorageareachoice__priority", "-free_area")
+        .values("id")[:1]
+    )
+    return [
+        UnmarkedWinterStorageFit(application_id, section_id)
+        for application_id, section_id in applications.annotate(
+            boat_area=ExpressionWrapper(
+                F("boat__width") * F("boat__length"), output_field=area_field
+            ),
+            fitting_section_id=Subquery(section_qs),
+        ).values_list("id", "fitting_section_id")
+    ]
@@ -8,7 +8,7 @@ from parler.models import TranslatableModel, TranslatedFields
 
 from customers.models import Boat, CustomerProfile
 from resources.models import Berth, Harbor, WinterStorageArea
-from utils.models import TimeStampedModel, UUIDModel
+from utils.models import SerializableManager, TimeStampedModel, UUIDModel
 
 from .enums import (
     ApplicationAreaType,
@@ -24,6 +24,8 @@ class HarborChoice(SerializableMixin):
     application = models.ForeignKey("BerthApplication", on_delete=models.CASCADE)
     priority = models.PositiveSmallIntegerField(verbose_name=_("priority"))
 
+    objects = SerializableManager()
+
     class Meta:
         unique_together = ("application", "priority")
         ordering = ("application", "priority")
@@ -41,6 +43,8 @@ class WinterStorageAreaChoice(SerializableMixin):
     )
     priority = models.PositiveSmallIntegerField(verbose_name=_("priority"))
 
+    objects = SerializableManager()
+
     class Meta:
         unique_together = ("application", "priority")
         ordering = ("application", "priority")
@@ -82,6 +86,11 @@ class BerthSwitch(SerializableMixin):
 
 
 class BaseApplication(models.Model):
+    # Fields which are stripped from surrounding whitespace before saving
+    fields_to_strip = []
+    # Fields whose changes are logged on the application changes
+    fields_to_compare = []
+
     created_at = models.DateTimeField(verbose_name=_("created at"), auto_now_add=True)
 
     status = models.CharField(
@@ -175,7 +184,113 @@ class BaseApplication(models.Model):
     def __str__(self):
         return "{}: {} {}".format(self.pk, self.first_name, self.last_name)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot the values as they were loaded, so the change entries
+        # can be generated without reading the application again
+        instance._loaded_values = instance._get_compared_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._update_loaded_values(fields)
+
+    def _update_loaded_values(self, fields=None):
+        """Snapshot the values of the fields that match the database again"""
+        current_values = self._get_compared_values()
+        if fields is not None:
+            field_names = self._get_field_names(fields)
+            current_values = {
+                field: value
+                for field, value in current_values.items()
+                if self._meta.get_field(field).name in field_names
+            }
+        self._loaded_values = {
+            **getattr(self, "_loaded_values", {}),
+            **current_values,
+        }
+
+    def _get_compared_values(self) -> dict:
+        deferred_fields = self.get_deferred_fields()
+        return {
+            field: getattr(self, field)
+            for field in self.fields_to_compare
+            if field not in deferred_fields
+        }
+
+    def _get_field_names(self, fields) -> set:
+        return {self._meta.get_field(field).name for field in fields}
+
+    def get_change_list(self, update_fields=None) -> str:
+        fields_to_compare = self.fields_to_compare
+        if update_fields is not None:
+            # Only the fields being saved can have changed on the database
+            updated_field_names = self._get_field_names(update_fields)
+            fields_to_compare = [
+                field
+                for field in fields_to_compare
+                if self._meta.get_field(field).name in updated_field_names
+            ]
+        if not fields_to_compare:
+            return ""
+
+        old_values = getattr(self, "_loaded_values", {})
+        if any(field not in old_values for field in fields_to_compare):
+            # The instance was not loaded from the database (or the fields were deferred)
+            old_instance = type(self).objects.get(id=self.id)
+            old_values = old_instance._get_compared_values()
+
+        change_list = ""
+        for field in fields_to_compare:
+            old_value = old_values.get(field, "[Empty]")
+            new_value = getattr(self, field, "[Empty]")
+            if old_value != new_value:
+                field_name = self._meta.get_field(field).verbose_name.capitalize()
+                change_list += f"{field_name}: {old_value} -> {new_value}\n"
+        return change_list
+
+    def create_change_entry(self, update_fields=None):
+        if self._state.adding:
+            return
+
+        if change_list := self.get_change_list(update_fields):
+            self.changes.create(change_list=change_list)
+
+    def validate_update_fields(self, update_fields):
+        """Run only the validations affected by the fields being saved"""
+        updated_field_names = self._get_field_names(update_fields)
+        self.clean_fields(
+            exclude=[
+                field.name
+                for field in self._meta.fields
+                if field.name not in updated_field_names
+            ]
+        )
+        if updated_field_names & {"boat", "customer"}:
+            self._validate_boat_owner()
+
+    def save(self, *args, **kwargs):
+        for field in self.fields_to_strip:
+            if field_value := getattr(self, field):
+                setattr(self, field, field_value.strip())
+
+        # Ensure clean is always ran, partial updates only validate the saved fields
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.full_clean()
+        else:
+            self.validate_update_fields(update_fields)
+
+        self.create_change_entry(update_fields)
+        super().save(*args, **kwargs)
+        # The fields left out of a partial update don't match the database yet
+        self._update_loaded_values(update_fields)
+
     def clean(self):
+        self._validate_boat_owner()
+
+    def _validate_boat_owner(self):
         if self.customer and self.boat.owner != self.customer:
             raise ValidationError(
                 _("The boat should belong to the customer of the application")
@@ -208,7 +323,7 @@ class WinterStorageApplicationChange(BaseApplicationChange):
     )
 
 
-class BerthApplicationManager(SerializableMixin.SerializableManager):
+class BerthApplicationManager(SerializableManager):
     def reset_application_priority(
         self, only_low_priority: bool = False, dry_run: bool = False
     ):
@@ -261,6 +376,48 @@ class BerthApplication(BaseApplication, SerializableMixin):
 
     objects = BerthApplicationManager()
 
+    fields_to_strip = [
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "address",
+        "zip_code",
+        "municipality",
+        "company_name",
+        "business_id",
+        "application_code",
+        "renting_period",
+        "rent_from",
+        "rent_till",
+    ]
+    fields_to_compare = [
+        "status",
+        "language",
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "address",
+        "zip_code",
+        "municipality",
+        "company_name",
+        "business_id",
+        "boat_id",
+        "accept_boating_newsletter",
+        "accept_fitness_news",
+        "accept_library_news",
+        "accept_other_culture_news",
+        "information_accuracy_confirmed",
+        "application_code",
+        "berth_switch_id",
+        "accessibility_required",
+        "renting_period",
+        "rent_from",
+        "rent_till",
+        "agree_to_terms",
+    ]
+
     @property
     def boat_draught(self):
         return self.boat.draught
@@ -338,83 +495,15 @@ class BerthApplication(BaseApplication, SerializableMixin):
                     )
                 )
 
-    def create_change_entry(self):
-        fields_to_compare = [
-            "status",
-            "language",
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "address",
-            "zip_code",
-            "municipality",
-            "company_name",
-            "business_id",
-            "boat_id",
-            "accept_boating_newsletter",
-            "accept_fitness_news",
-            "accept_library_news",
-            "accept_other_culture_news",
-            "information_accuracy_confirmed",
-            "application_code",
-            "berth_switch",
-            "accessibility_required",
-            "renting_period",
-            "rent_from",
-            "rent_till",
-            "agree_to_terms",
-        ]
-
-        creating = self._state.adding
-        if not creating:
-            old_instance = BerthApplication.objects.get(id=self.id)
-
-            change_list = ""
-            for field in fields_to_compare:
-                old_value = getattr(old_instance, field, "[Empty]")
-                new_value = getattr(self, field, "[Empty]")
-                if old_value != new_value:
-                    field_name = BerthApplication._meta.get_field(
-                        field
-                    ).verbose_name.capitalize()
-                    change_list += f"{field_name}: {old_value} -> {new_value}\n"
-
-            if len(change_list) > 0:
-                BerthApplicationChange.objects.create(
-                    application=self, change_list=change_list
-                )
-
-    def save(self, *args, **kwargs):
-        fields_to_strip = [
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "address",
-            "zip_code",
-            "municipality",
-            "company_name",
-            "business_id",
-            "application_code",
-            "renting_period",
-            "rent_from",
-            "rent_till",
-        ]
-        for field in fields_to_strip:
-            if field_value := getattr(self, field):
-                setattr(self, field, field_value.strip())
-
-        self.create_change_entry()
-
-        # Ensure clean is always ran
-        self.full_clean()
-        super().save(*args, **kwargs)
-
     def clean(self):
         super().clean()
         self._validate_status()
 
+    def validate_update_fields(self, update_fields):
+        super().validate_update_fields(update_fields)
+        if "status" in self._get_field_names(update_fields):
+            self._validate_status()
+
     serialize_fields = (
         {"name": "id"},
         {"name": "created_at", "accessor": lambda x: x.strftime("%d-%m-%Y %H:%M:%S")},
@@ -484,73 +573,41 @@ class WinterStorageApplication(BaseApplication, SerializableMixin):
         verbose_name=_("trailer registration number"), max_length=64, blank=True
     )
 
-    def create_change_entry(self):
-        fields_to_compare = [
-            "status",
-            "language",
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "address",
-            "zip_code",
-            "municipality",
-            "company_name",
-            "business_id",
-            "boat_id",
-            "accept_boating_newsletter",
-            "accept_fitness_news",
-            "accept_library_news",
-            "accept_other_culture_news",
-            "information_accuracy_confirmed",
-            "application_code",
-            "storage_method",
-            "trailer_registration_number",
-        ]
-
-        creating = self._state.adding
-        if not creating:
-            old_instance = WinterStorageApplication.objects.get(id=self.id)
-
-            change_list = ""
-            for field in fields_to_compare:
-                old_value = getattr(old_instance, field, "[Empty]")
-                new_value = getattr(self, field, "[Empty]")
-                if old_value != new_value:
-                    field_name = WinterStorageApplication._meta.get_field(
-                        field
-                    ).verbose_name.capitalize()
-                    change_list += f"{field_name}: {old_value} -> {new_value}\n"
-
-            if len(change_list) > 0:
-                WinterStorageApplicationChange.objects.create(
-                    application=self, change_list=change_list
-                )
-
-    def save(self, *args, **kwargs):
-        fields_to_strip = [
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "address",
-            "zip_code",
-            "municipality",
-            "company_name",
-            "business_id",
-            "application_code",
-            "trailer_registration_number",
-        ]
-        for field in fields_to_strip:
-            if field_value := getattr(self, field):
-                setattr(self, field, field_value.strip())
-
-        self.create_change_entry()
-
-        # Ensure clean is always ran
-        self.full_clean()
-
-        super().save(*args, **kwargs)
+    fields_to_strip = [
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "address",
+        "zip_code",
+        "municipality",
+        "company_name",
+        "business_id",
+        "application_code",
+        "trailer_registration_number",
+    ]
+    fields_to_compare = [
+        "status",
+        "language",
+        "first_name",
+        "last_name",
+        "email",
+        "phone_number",
+        "address",
+        "zip_code",
+        "municipality",
+        "company_name",
+        "business_id",
+        "boat_id",
+        "accept_boating_newsletter",
+        "accept_fitness_news",
+        "accept_library_news",
+        "accept_other_culture_news",
+        "information_accuracy_confirmed",
+        "application_code",
+        "storage_method",
+        "trailer_registration_number",
+    ]
 
     def resolve_area_type(self) -> ApplicationAreaType:
         first_area = self.chosen_areas.first()
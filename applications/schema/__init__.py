@@ -2,22 +2,28 @@ from .mutations import Mutation
 from .queries import Query
 from .types import (
     BerthApplicationFilter,
+    BerthApplicationMatchType,
     BerthApplicationNode,
     BerthSwitchReasonType,
     BerthSwitchType,
     HarborChoiceType,
+    UnmarkedWinterStorageFitType,
     WinterStorageApplicationNode,
     WinterStorageAreaChoiceType,
+    WinterStoragePlaceSuggestionType,
 )
 
 __all__ = [
     "BerthApplicationFilter",
+    "BerthApplicationMatchType",
     "BerthApplicationNode",
     "BerthSwitchReasonType",
     "BerthSwitchType",
     "HarborChoiceType",
     "Mutation",
     "Query",
+    "UnmarkedWinterStorageFitType",
     "WinterStorageApplicationNode",
     "WinterStorageAreaChoiceType",
+    "WinterStoragePlaceSuggestionType",
 ]
@@ -2,15 +2,29 @@ import graphene
 import graphene_django_optimizer as gql_optimizer
 from graphene_django.filter import DjangoFilterConnectionField
 
+from customers.utils import from_global_ids
+from resources.models import WinterStoragePlace, WinterStorageSection
+from users.decorators import view_permission_required
+
+from ..enums import ApplicationAreaType
+from ..matching import (
+    check_unmarked_winter_storage_applications,
+    DEFAULT_CANDIDATES_LIMIT,
+    match_berth_applications,
+    suggest_winter_storage_places,
+)
 from ..models import BerthApplication, BerthSwitchReason, WinterStorageApplication
 from .types import (
     ApplicationAreaTypeEnum,
     ApplicationStatusEnum,
     BerthApplicationFilter,
+    BerthApplicationMatchType,
     BerthApplicationNode,
     BerthSwitchReasonType,
+    UnmarkedWinterStorageFitType,
     WinterStorageApplicationFilter,
     WinterStorageApplicationNode,
+    WinterStoragePlaceSuggestionType,
 )
 
 
@@ -44,6 +58,117 @@ class Query:
         "\n* A value passed is not a valid status",
     )
     berth_switch_reasons = graphene.List(BerthSwitchReasonType)
+    berth_application_matches = graphene.NonNull(
+        graphene.List(graphene.NonNull(BerthApplicationMatchType)),
+        application_ids=graphene.List(graphene.NonNull(graphene.ID)),
+        limit=graphene.Int(default_value=DEFAULT_CANDIDATES_LIMIT),
+        description="The available berths suitable for each of the given applications "
+        "(all the pending applications by default), ranked by the harbor choices and the best fit. "
+        "A berth is suitable when the boat fits on it (width, length and draught) "
+        "and it's accessible, if the application requires it."
+        "\n\nThe applications are ordered by their priority and `createdAt`."
+        "\n\n**Requires permissions** to access applications.",
+    )
+
+    @view_permission_required(BerthApplication)
+    def resolve_berth_application_matches(
+        self, info, application_ids=None, limit=DEFAULT_CANDIDATES_LIMIT, **kwargs
+    ):
+        if application_ids:
+            applications = BerthApplication.objects.filter(
+                id__in=from_global_ids(application_ids, BerthApplicationNode)
+            )
+        else:
+            applications = None
+
+        matches = match_berth_applications(applications, limit=limit)
+        applications = BerthApplication.objects.select_related("boat").in_bulk(
+            [match.application_id for match in matches]
+        )
+        return [
+            BerthApplicationMatchType(
+                application=applications[match.application_id],
+                berths=info.context.berth_loader.load_many(match.berth_ids),
+            )
+            for match in matches
+        ]
+
+    winter_storage_place_suggestions = graphene.NonNull(
+        graphene.List(graphene.NonNull(WinterStoragePlaceSuggestionType)),
+        application_ids=graphene.List(graphene.NonNull(graphene.ID)),
+        description="Suggests a free place for each of the given marked winter storage applications "
+        "(all the pending ones by default). The applications are handled by their priority and `createdAt`, "
+        "each one gets the smallest place the boat fits in from the first chosen area with one left, "
+        "and a place is only suggested once."
+        "\n\nThe suggestions can be confirmed with `bulkCreateWinterStorageLeases`."
+        "\n\n**Requires permissions** to access applications.",
+    )
+
+    @view_permission_required(WinterStorageApplication)
+    def resolve_winter_storage_place_suggestions(
+        self, info, application_ids=None, **kwargs
+    ):
+        if application_ids:
+            applications = WinterStorageApplication.objects.filter(
+                id__in=from_global_ids(application_ids, WinterStorageApplicationNode),
+                area_type=ApplicationAreaType.MARKED,
+            )
+        else:
+            applications = None
+
+        suggestions = suggest_winter_storage_places(applications)
+        applications = WinterStorageApplication.objects.select_related("boat").in_bulk(
+            [suggestion.application_id for suggestion in suggestions]
+        )
+        places = WinterStoragePlace.objects.select_related(
+            "place_type", "winter_storage_section"
+        ).in_bulk(
+            [suggestion.place_id for suggestion in suggestions if suggestion.place_id]
+        )
+        return [
+            WinterStoragePlaceSuggestionType(
+                application=applications[suggestion.application_id],
+                place=places.get(suggestion.place_id),
+            )
+            for suggestion in suggestions
+        ]
+
+    unmarked_winter_storage_fits = graphene.NonNull(
+        graphene.List(graphene.NonNull(UnmarkedWinterStorageFitType)),
+        application_ids=graphene.List(graphene.NonNull(graphene.ID)),
+        description="Checks whether the boats of the given unmarked winter storage applications "
+        "(all the pending ones by default) fit in the free unmarked area of a section on the chosen area. "
+        "Each application is checked separately against the current free area."
+        "\n\n**Requires permissions** to access applications.",
+    )
+
+    @view_permission_required(WinterStorageApplication)
+    def resolve_unmarked_winter_storage_fits(
+        self, info, application_ids=None, **kwargs
+    ):
+        if application_ids:
+            applications = WinterStorageApplication.objects.filter(
+                id__in=from_global_ids(application_ids, WinterStorageApplicationNode),
+                area_type=ApplicationAreaType.UNMARKED,
+            )
+        else:
+            applications = None
+
+        fits = check_unmarked_winter_storage_applications(applications)
+        applications = WinterStorageApplication.objects.select_related("boat").in_bulk(
+            [fit.application_id for fit in fits]
+        )
+        sections = WinterStorageSection.objects.in_bulk(
+            [fit.section_id for fit in fits if fit.fits]
+        )
+        return [
+            UnmarkedWinterStorageFitType(
+                application=applications[fit.application_id],
+                fits=fit.fits,
+                section=sections.get(fit.section_id),
+            )
+            for fit in fits
+        ]
 
     def resolve_berth_switch_reasons(self, info, **kwargs):
         return BerthSwitchReason.objects.all()
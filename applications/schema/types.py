@@ -163,6 +163,14 @@ class BerthApplicationNode(DjangoObjectType):
         )
 
 
+class BerthApplicationMatchType(graphene.ObjectType):
+    application = graphene.Field(BerthApplicationNode, required=True)
+    berths = graphene.NonNull(
+        graphene.List(graphene.NonNull("resources.schema.BerthNode")),
+        description="The suitable berths, the best candidate first",
+    )
+
+
 class WinterStorageAreaChoiceType(DjangoObjectType):
     winter_storage_area = graphene.Field(
         "resources.schema.WinterStorageAreaNode", required=True
@@ -256,3 +264,20 @@ class WinterStorageApplicationNode(DjangoObjectType):
             WinterStorageLease,
             CustomerProfile,
         )
+
+
+class WinterStoragePlaceSuggestionType(graphene.ObjectType):
+    application = graphene.Field(WinterStorageApplicationNode, required=True)
+    place = graphene.Field(
+        "resources.schema.WinterStoragePlaceNode",
+        description="Empty when there's no free place for the boat on the chosen areas",
+    )
+
+
+class UnmarkedWinterStorageFitType(graphene.ObjectType):
+    application = graphene.Field(WinterStorageApplicationNode, required=True)
+    fits = graphene.Boolean(required=True)
+    section = graphene.Field(
+        "resources.schema.WinterStorageSectionNode",
+        description="The section with the most free area the boat fits in",
+    )
@@ -1,15 +1,21 @@
 from anymail.exceptions import AnymailError
 from django.conf import settings
-from django.dispatch import Signal
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver, Signal
 from django_ilmoitin.utils import send_notification
 from sentry_sdk import capture_exception
 
+from berth_reservations.translated_names import invalidate_translated_names
+
 from .constants import MARKED_WS_SENDER, REJECT_BERTH_SENDER, UNMARKED_WS_SENDER
+from .models import BerthSwitchReason
 from .notifications import NotificationType
 
 application_saved = Signal()
 application_rejected = Signal()
 
+BerthSwitchReasonTranslation = BerthSwitchReason._parler_meta.root_model
+
 
 def application_notification_handler(sender, application, **kwargs):
     notification_type = NotificationType.BERTH_APPLICATION_CREATED
@@ -42,3 +48,9 @@ if settings.NOTIFICATIONS_ENABLED:
     application_rejected.connect(
         application_notification_handler, dispatch_uid="application_rejected"
     )
+
+
+@receiver([post_save, post_delete], sender=BerthSwitchReason)
+@receiver([post_save, post_delete], sender=BerthSwitchReasonTranslation)
+def invalidate_translated_names_handler(sender, **kwargs):
+    invalidate_translated_names(sender)
@@ -0,0 +1,196 @@
+from decimal import Decimal
+
+import pytest
+
+from resources.models import WinterStorageSection
+from resources.tests.factories import (
+    BerthFactory,
+    BerthTypeFactory,
+    HarborFactory,
+    PierFactory,
+    WinterStorageAreaFactory,
+    WinterStoragePlaceFactory,
+    WinterStoragePlaceTypeFactory,
+    WinterStorageSectionFactory,
+)
+
+from ..enums import ApplicationAreaType, ApplicationPriority, ApplicationStatus
+from ..matching import (
+    check_unmarked_winter_storage_applications,
+    match_berth_applications,
+    suggest_winter_storage_places,
+)
+from .factories import (
+    BerthApplicationFactory,
+    HarborChoiceFactory,
+    WinterAreaChoiceFactory,
+    WinterStorageApplicationFactory,
+)
+
+
+def _create_berth(pier, width, length, depth=None, **kwargs):
+    berth_type = BerthTypeFactory(
+        width=Decimal(width), length=Decimal(length), depth=depth
+    )
+    return BerthFactory(pier=pier, berth_type=berth_type, **kwargs)
+
+
+@pytest.fixture
+def application():
+    return BerthApplicationFactory(
+        boat__width=Decimal("2.5"),
+        boat__length=Decimal("6.0"),
+        boat__draught=Decimal("1.0"),
+    )
+
+
+def test_match_berth_applications_ranks_the_suitable_berths(application):
+    first_harbor = HarborFactory()
+    second_harbor = HarborFactory()
+    HarborChoiceFactory(application=application, harbor=first_harbor, priority=1)
+    HarborChoiceFactory(application=application, harbor=second_harbor, priority=2)
+
+    first_pier = PierFactory(harbor=first_harbor)
+    second_pier = PierFactory(harbor=second_harbor)
+    wide_berth = _create_berth(first_pier, "4.0", "10.0")
+    fitting_berth = _create_berth(first_pier, "3.0", "8.0")
+    second_choice_berth = _create_berth(second_pier, "2.5", "6.0")
+    # Too narrow, too short, too shallow and inactive
+    _create_berth(first_pier, "2.0", "8.0")
+    _create_berth(first_pier, "3.5", "5.0")
+    _create_berth(first_pier, "3.5", "9.0", depth=Decimal("0.5"))
+    _create_berth(first_pier, "3.5", "9.5", is_active=False)
+    # Not on the chosen harbors
+    _create_berth(PierFactory(), "3.0", "8.5")
+
+    [match] = match_berth_applications()
+
+    assert match.application_id == application.id
+    assert match.berth_ids == [fitting_berth.id, wide_berth.id, second_choice_berth.id]
+
+
+def test_match_berth_applications_limit(application):
+    harbor = HarborFactory()
+    HarborChoiceFactory(application=application, harbor=harbor, priority=1)
+    pier = PierFactory(harbor=harbor)
+    berths = [
+        _create_berth(pier, width, "8.0") for width in ("3.0", "3.5", "4.0", "4.5")
+    ]
+
+    [match] = match_berth_applications(limit=2)
+
+    assert match.berth_ids == [berths[0].id, berths[1].id]
+
+
+def test_match_berth_applications_accessibility_required(application):
+    application.accessibility_required = True
+    application.save()
+    harbor = HarborFactory()
+    HarborChoiceFactory(application=application, harbor=harbor, priority=1)
+    pier = PierFactory(harbor=harbor)
+    _create_berth(pier, "3.0", "8.0", is_accessible=False)
+    accessible_berth = _create_berth(pier, "3.5", "8.0", is_accessible=True)
+
+    [match] = match_berth_applications()
+
+    assert match.berth_ids == [accessible_berth.id]
+
+
+def test_match_berth_applications_only_pending_by_default(application):
+    BerthApplicationFactory(status=ApplicationStatus.HANDLED)
+
+    matches = match_berth_applications()
+
+    assert [match.application_id for match in matches] == [application.id]
+    assert matches[0].berth_ids == []
+
+
+def _create_place(section, width, length):
+    place_type = WinterStoragePlaceTypeFactory(
+        width=Decimal(width), length=Decimal(length)
+    )
+    return WinterStoragePlaceFactory(
+        winter_storage_section=section, place_type=place_type
+    )
+
+
+def _create_ws_application(
+    area, width, length, area_type=ApplicationAreaType.MARKED, **kwargs
+):
+    application = WinterStorageApplicationFactory(
+        area_type=area_type,
+        boat__width=Decimal(width),
+        boat__length=Decimal(length),
+        **kwargs,
+    )
+    WinterAreaChoiceFactory(
+        application=application, winter_storage_area=area, priority=1
+    )
+    return application
+
+
+def test_suggest_winter_storage_places_best_fit_in_priority_order():
+    area = WinterStorageAreaFactory()
+    section = WinterStorageSectionFactory(area=area)
+    small_place = _create_place(section, "2.5", "6.0")
+    large_place = _create_place(section, "3.5", "9.0")
+    # Handled first because of the priority, gets the smallest place that fits
+    high_priority_application = _create_ws_application(
+        area, "2.0", "5.0", priority=ApplicationPriority.HIGH
+    )
+    application = _create_ws_application(area, "2.0", "5.0")
+    without_place_application = _create_ws_application(area, "2.0", "5.0")
+
+    suggestions = suggest_winter_storage_places()
+
+    assert [
+        (suggestion.application_id, suggestion.place_id) for suggestion in suggestions
+    ] == [
+        (high_priority_application.id, small_place.id),
+        (application.id, large_place.id),
+        (without_place_application.id, None),
+    ]
+
+
+def test_suggest_winter_storage_places_area_choices():
+    first_area = WinterStorageAreaFactory()
+    second_area = WinterStorageAreaFactory()
+    # Too short for the boat
+    _create_place(WinterStorageSectionFactory(area=first_area), "3.0", "4.0")
+    place = _create_place(WinterStorageSectionFactory(area=second_area), "3.0", "8.0")
+    application = _create_ws_application(first_area, "2.0", "5.0")
+    WinterAreaChoiceFactory(
+        application=application, winter_storage_area=second_area, priority=2
+    )
+    # Unmarked applications don't get places
+    WinterStorageApplicationFactory(area_type=ApplicationAreaType.UNMARKED)
+
+    [suggestion] = suggest_winter_storage_places()
+
+    assert suggestion.application_id == application.id
+    assert suggestion.place_id == place.id
+
+
+def test_check_unmarked_winter_storage_applications():
+    area = WinterStorageAreaFactory()
+    WinterStorageSectionFactory(area=area, unmarked_capacity=Decimal("20"))
+    section = WinterStorageSectionFactory(area=area, unmarked_capacity=Decimal("40"))
+    # The section with the most free area is preferred
+    WinterStorageSection.objects.filter(pk=section.pk).update(
+        unmarked_allocated_area=Decimal("10")
+    )
+    fitting_application = _create_ws_application(
+        area, "2.0", "5.0", area_type=ApplicationAreaType.UNMARKED
+    )
+    too_large_application = _create_ws_application(
+        area, "4.0", "10.0", area_type=ApplicationAreaType.UNMARKED
+    )
+
+    fits = {
+        fit.application_id: fit for fit in check_unmarked_winter_storage_applications()
+    }
+
+    assert fits[fitting_application.id].fits
+    assert fits[fitting_application.id].section_id == section.id
+    assert not fits[too_large_application.id].fits
+    assert fits[too_large_application.id].section_id is None
@@ -1,10 +1,12 @@
+from unittest.mock import patch
+
 import pytest
 from django.core.exceptions import ValidationError
 
 from resources.tests.factories import WinterStorageAreaFactory
 
 from ..enums import ApplicationAreaType, ApplicationPriority, ApplicationStatus
-from ..models import BerthApplication
+from ..models import BerthApplication, BerthApplicationManager
 from .factories import (
     BerthApplicationFactory,
     WinterAreaChoiceFactory,
@@ -163,3 +165,66 @@ def test_serialize_berth_switch(berth_switch_info):
     """No exceptions when serializing the model."""
     data = berth_switch_info.serialize()
     assert data["key"] == "BERTHSWITCH"
+
+
+def test_berth_application_change_entry_uses_loaded_values(berth_application):
+    application = BerthApplication.objects.get(id=berth_application.id)
+    old_first_name = application.first_name
+    application.first_name = "New name"
+
+    # The application should not be read again to find the changes
+    with patch.object(
+        BerthApplicationManager, "get", side_effect=AssertionError("Re-read")
+    ):
+        application.save()
+
+    assert application.changes.count() == 1
+    assert (
+        application.changes.first().change_list
+        == f"First name: {old_first_name} -> New name\n"
+    )
+
+
+def test_berth_application_update_fields_only_compare_saved_fields(
+    berth_application,
+):
+    berth_application.first_name = "Not saved"
+    berth_application.priority = ApplicationPriority.HIGH
+    berth_application.save(update_fields=["priority"])
+
+    assert berth_application.changes.count() == 0
+
+    berth_application.status = ApplicationStatus.EXPIRED
+    berth_application.save(update_fields=["status"])
+
+    assert berth_application.changes.count() == 1
+    assert (
+        berth_application.changes.first().change_list
+        == "Handling status: pending -> expired\n"
+    )
+
+
+def test_berth_application_partial_save_keeps_unsaved_changes(berth_application):
+    application = BerthApplication.objects.get(id=berth_application.id)
+    old_first_name = application.first_name
+    application.first_name = "Not saved"
+    application.status = ApplicationStatus.EXPIRED
+    application.save(update_fields=["status"])
+
+    # The first name is only saved now, so its change is logged now
+    application.save()
+
+    assert [change.change_list for change in application.changes.all()] == [
+        "Handling status: pending -> expired\n",
+        f"First name: {old_first_name} -> Not saved\n",
+    ]
+
+
+def test_berth_application_refresh_from_db_updates_loaded_values(berth_application):
+    BerthApplication.objects.filter(id=berth_application.id).update(
+        status=ApplicationStatus.EXPIRED
+    )
+    berth_application.refresh_from_db()
+    berth_application.save()
+
+    assert berth_application.changes.count() == 0
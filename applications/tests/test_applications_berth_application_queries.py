@@ -5,14 +5,20 @@ from dateutil.parser import isoparse
 from freezegun import freeze_time
 from graphql_relay.node.node import to_global_id
 
-from berth_reservations.tests.utils import assert_in_errors, create_api_client
+from berth_reservations.tests.utils import (
+    assert_in_errors,
+    assert_not_enough_permissions,
+    create_api_client,
+)
 from customers.schema import ProfileNode
 from leases.tests.factories import BerthLeaseFactory
+from resources.schema import BerthNode
+from resources.tests.factories import BerthFactory
 
 from ..enums import ApplicationPriority, ApplicationStatus
 from ..models import BerthApplication
 from ..schema import BerthApplicationNode
-from .factories import BerthApplicationFactory
+from .factories import BerthApplicationFactory, HarborChoiceFactory
 
 BERTH_APPLICATIONS_WITH_NO_CUSTOMER_FILTER_QUERY = """
 query APPLICATIONS {
@@ -543,3 +549,66 @@ def test_berth_application_priority(superuser_api_client):
         "createdAt": first_application.created_at.isoformat(),
         "priority": ApplicationPriority.LOW.name,
     }
+
+
+BERTH_APPLICATION_MATCHES_QUERY = """
+query BERTH_APPLICATION_MATCHES($applicationIds: [ID!]) {
+    berthApplicationMatches(applicationIds: $applicationIds) {
+        application {
+            id
+        }
+        berths {
+            id
+        }
+    }
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services", "berth_handler", "berth_supervisor"],
+    indirect=True,
+)
+def test_berth_application_matches(berth_application, api_client):
+    berth = BerthFactory(
+        berth_type__width=berth_application.boat.width + 1,
+        berth_type__length=berth_application.boat.length + 1,
+        berth_type__depth=None,
+    )
+    HarborChoiceFactory(
+        application=berth_application, harbor=berth.pier.harbor, priority=1
+    )
+    # Not requested
+    BerthApplicationFactory()
+
+    executed = api_client.execute(
+        BERTH_APPLICATION_MATCHES_QUERY,
+        variables={
+            "applicationIds": [
+                to_global_id(BerthApplicationNode._meta.name, berth_application.id)
+            ]
+        },
+    )
+
+    assert executed["data"]["berthApplicationMatches"] == [
+        {
+            "application": {
+                "id": to_global_id(
+                    BerthApplicationNode._meta.name, berth_application.id
+                )
+            },
+            "berths": [{"id": to_global_id(BerthNode._meta.name, berth.id)}],
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["api_client", "user", "harbor_services"],
+    indirect=True,
+)
+def test_berth_application_matches_not_enough_permissions(api_client):
+    executed = api_client.execute(BERTH_APPLICATION_MATCHES_QUERY)
+
+    assert_not_enough_permissions(executed)
@@ -0,0 +1,69 @@
+import pytest
+from freezegun import freeze_time
+
+from berth_reservations.tests.conftest import *  # noqa
+
+from .dataset import BENCHMARK_DATE, generate_dataset, SCALES
+from .runner import Baselines
+
+BASELINES_KEY = pytest.StashKey[Baselines]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmark-scale",
+        choices=list(SCALES.keys()),
+        default="small",
+        help="Size of the generated dataset (and the baselines to compare against)",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        help="Number of rounds to run each scenario, overrides the scenario default",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed increase of the median latency over the baseline (0.5 = +50%%)",
+    )
+    group.addoption(
+        "--benchmark-update-baselines",
+        action="store_true",
+        help="Store the results as the new baselines instead of comparing them",
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if baselines := config.stash.get(BASELINES_KEY, None):
+        terminalreporter.section("benchmarks")
+        for result in baselines.results:
+            terminalreporter.write_line(str(result))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def benchmark_date():
+    # Ticking, so the time still advances for measuring the latencies
+    with freeze_time(BENCHMARK_DATE, tick=True):
+        yield
+
+
+@pytest.fixture(scope="session")
+def benchmark_dataset(request, benchmark_date, django_db_setup, django_db_blocker):
+    # Generated once, outside the transactions of the tests
+    with django_db_blocker.unblock():
+        return generate_dataset(SCALES[request.config.getoption("benchmark_scale")])
+
+
+@pytest.fixture(scope="session")
+def benchmark_baselines(request):
+    baselines = Baselines(
+        request.config.getoption("benchmark_scale"),
+        request.config.getoption("benchmark_tolerance"),
+    )
+    request.config.stash[BASELINES_KEY] = baselines
+    yield baselines
+
+    if request.config.getoption("benchmark_update_baselines"):
+        baselines.save()
@@ -0,0 +1,477 @@
+"""
+Synthetic city-scale dataset for the benchmarks.
+
+The rows are built with the test factories, and the bulk of them (berths, places,
+customers, leases, orders...) are saved with ``bulk_create``, since saving them one
+by one would take hours on the city scale. Because of that, no signals are sent nor
+the model validations ran, so the dataset has to be consistent by construction.
+
+The dataset is generated relative to ``BENCHMARK_DATE``, which the benchmarks freeze
+as the current date, so the same seasons, renewals and due dates are benchmarked
+on every run.
+"""
+
+import random
+import string
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+import factory.fuzzy
+import factory.random
+from django.conf import settings
+
+from applications.enums import ApplicationStatus
+from applications.models import (
+    BerthApplication,
+    HarborChoice,
+    WinterStorageApplication,
+    WinterStorageAreaChoice,
+)
+from applications.tests.factories import (
+    BerthApplicationFactory,
+    HarborChoiceFactory,
+    WinterAreaChoiceFactory,
+    WinterStorageApplicationFactory,
+)
+from berth_reservations.tests.factories import CustomerProfileFactory, UserFactory
+from contracts.tests.factories import BerthContractFactory
+from customers.enums import InvoicingType
+from customers.models import Boat, CustomerProfile
+from customers.tests.factories import BoatFactory
+from leases.enums import LeaseStatus
+from leases.models import BerthLease, WinterStorageLease
+from leases.tests.factories import BerthLeaseFactory, WinterStorageLeaseFactory
+from leases.utils import (
+    calculate_season_end_date,
+    calculate_season_start_date,
+    calculate_winter_season_end_date,
+    calculate_winter_season_start_date,
+)
+from payments.enums import OrderStatus, PricingCategory
+from payments.models import BerthProduct, Order, OrderLogEntry, WinterStorageProduct
+from payments.tests.factories import (
+    BerthProductFactory,
+    OrderFactory,
+    OrderLogEntryFactory,
+    WinterStorageProductFactory,
+)
+from payments.tests.utils import random_price
+from resources.counters import update_winter_storage_counters
+from resources.models import Berth, BoatType, WinterStoragePlace
+from resources.tests.factories import (
+    BerthFactory,
+    BerthTypeFactory,
+    BoatTypeFactory,
+    HarborFactory,
+    PierFactory,
+    WinterStorageAreaFactory,
+    WinterStoragePlaceFactory,
+    WinterStoragePlaceTypeFactory,
+    WinterStorageSectionFactory,
+)
+from users.models import User
+
+# Off-season, when the leases of the last season are renewed
+BENCHMARK_DATE = date(2021, 1, 15)
+BENCHMARK_SEED = 2021
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+# The widths of the berth types, each one has its own berth product
+BERTH_WIDTHS = [Decimal("2.00") + Decimal("0.25") * i for i in range(17)]
+
+
+@dataclass(frozen=True)
+class DatasetScale:
+    harbors: int
+    piers_per_harbor: int
+    berths_per_pier: int
+    winter_storage_areas: int
+    sections_per_area: int
+    places_per_section: int
+    customers: int
+    # Number of past seasons with leases
+    seasons: int
+    # Share of the berths and places leased on each season
+    lease_ratio: float
+    # Leases of the last season that are not renewed yet for the next one
+    renewable_leases: int
+    berth_applications: int
+    winter_storage_applications: int
+    # Offered orders of the next season, due in less than a week (payment reminders)
+    # and overdue (order expiration)
+    due_orders: int
+    overdue_orders: int
+
+
+SCALES = {
+    "small": DatasetScale(
+        harbors=3,
+        piers_per_harbor=3,
+        berths_per_pier=20,
+        winter_storage_areas=2,
+        sections_per_area=2,
+        places_per_section=20,
+        customers=300,
+        seasons=2,
+        lease_ratio=0.7,
+        renewable_leases=20,
+        berth_applications=50,
+        winter_storage_applications=20,
+        due_orders=10,
+        overdue_orders=10,
+    ),
+    "city": DatasetScale(
+        harbors=40,
+        piers_per_harbor=8,
+        berths_per_pier=70,
+        winter_storage_areas=10,
+        sections_per_area=6,
+        places_per_section=80,
+        customers=25000,
+        seasons=3,
+        lease_ratio=0.7,
+        renewable_leases=300,
+        berth_applications=3000,
+        winter_storage_applications=1000,
+        due_orders=300,
+        overdue_orders=300,
+    ),
+}
+
+
+@dataclass
+class Dataset:
+    scale: DatasetScale
+    admin_user: User
+    harbor_ids: List[UUID]
+    berth_application_ids: List[int]
+
+
+def _bulk_create(model, objs: list) -> list:
+    return model.objects.bulk_create(objs, batch_size=BULK_CREATE_BATCH_SIZE)
+
+
+def _create_harbors(
+    scale: DatasetScale, boat_types: List[BoatType]
+) -> Tuple[list, List[Berth]]:
+    berth_types = [
+        BerthTypeFactory(width=width, length=width * 3, depth=width)
+        for width in BERTH_WIDTHS
+    ]
+    # A single product per width and pricing category, the products are looked up
+    # by the berth width when the orders are created
+    for width in BERTH_WIDTHS:
+        for pricing_category in PricingCategory.values:
+            BerthProductFactory(
+                min_width=width - Decimal("0.25"),
+                max_width=width,
+                pricing_category=pricing_category,
+            )
+
+    harbors = []
+    berths = []
+    for _i in range(scale.harbors):
+        harbor = HarborFactory()
+        harbors.append(harbor)
+        for identifier in string.ascii_uppercase[: scale.piers_per_harbor]:
+            pier = PierFactory(harbor=harbor, identifier=identifier)
+            pier.suitable_boat_types.set(boat_types)
+            berths += [
+                BerthFactory.build(
+                    pier=pier,
+                    berth_type=random.choice(berth_types),
+                    number=str(number),
+                )
+                for number in range(1, scale.berths_per_pier + 1)
+            ]
+    return harbors, _bulk_create(Berth, berths)
+
+
+def _create_winter_storage_areas(
+    scale: DatasetScale,
+) -> Tuple[list, List[WinterStoragePlace]]:
+    place_types = WinterStoragePlaceTypeFactory.create_batch(
+        5, width=factory.fuzzy.FuzzyDecimal(2, 5, 2)
+    )
+
+    areas = []
+    places = []
+    for _i in range(scale.winter_storage_areas):
+        area = WinterStorageAreaFactory()
+        areas.append(area)
+        WinterStorageProductFactory(winter_storage_area=area)
+        for identifier in string.ascii_uppercase[: scale.sections_per_area]:
+            section = WinterStorageSectionFactory(area=area, identifier=identifier)
+            places += [
+                WinterStoragePlaceFactory.build(
+                    winter_storage_section=section,
+                    place_type=random.choice(place_types),
+                    number=number,
+                )
+                for number in range(1, scale.places_per_section + 1)
+            ]
+    return areas, _bulk_create(WinterStoragePlace, places)
+
+
+def _create_customers(
+    scale: DatasetScale, boat_types: List[BoatType]
+) -> List[Tuple[CustomerProfile, Boat]]:
+    """Create the customers, each one with a boat"""
+    users = _bulk_create(User, UserFactory.build_batch(scale.customers))
+
+    customers = _bulk_create(
+        CustomerProfile,
+        [
+            CustomerProfileFactory.build(
+                user=user,
+                invoicing_type=(
+                    InvoicingType.PAPER_INVOICE
+                    if random.random() < 0.05
+                    else InvoicingType.ONLINE_PAYMENT
+                ),
+            )
+            for user in users
+        ],
+    )
+    boats = _bulk_create(
+        Boat,
+        [
+            BoatFactory.build(
+                owner=customer,
+                boat_type=random.choice(boat_types),
+                width=factory.fuzzy.FuzzyDecimal(1.5, 5.5, 2),
+                length=factory.fuzzy.FuzzyDecimal(4, 15, 2),
+            )
+            for customer in customers
+        ],
+    )
+    return list(zip(customers, boats))
+
+
+class _LeaseOrders:
+    """Collect the orders of the leases, to be saved after the leases"""
+
+    def __init__(self, today: date):
+        self.today = today
+        self.orders: List[Order] = []
+        self.log_entries: List[OrderLogEntry] = []
+
+    def add(self, lease, product, status: OrderStatus, due_date: date) -> None:
+        order = OrderFactory.build(
+            customer=lease.customer,
+            lease=lease,
+            product=product,
+            price=random_price(50, 500),
+            tax_percentage=product.tax_percentage,
+            status=status,
+            due_date=due_date,
+        )
+        self.orders.append(order)
+
+        self.log_entries.append(
+            OrderLogEntryFactory.build(
+                order=order,
+                from_status=OrderStatus.DRAFTED,
+                to_status=OrderStatus.OFFERED,
+            )
+        )
+        if status != OrderStatus.OFFERED:
+            self.log_entries.append(
+                OrderLogEntryFactory.build(
+                    order=order, from_status=OrderStatus.OFFERED, to_status=status
+                )
+            )
+
+    def get_next_season_status(self, index: int, scale: DatasetScale):
+        """The first orders are offered (due soon or overdue), the rest are paid"""
+        if index < scale.due_orders:
+            return OrderStatus.OFFERED, self.today + timedelta(days=index % 8)
+        if index < scale.due_orders + scale.overdue_orders:
+            overdue_days = settings.EXPIRE_WAITING_ORDERS_OLDER_THAN_DAYS + 1
+            return OrderStatus.OFFERED, self.today - timedelta(
+                days=overdue_days + index % 30
+            )
+        return OrderStatus.PAID, self.today - timedelta(days=30)
+
+    def save(self) -> None:
+        _bulk_create(Order, self.orders)
+        _bulk_create(OrderLogEntry, self.log_entries)
+
+
+def _get_berth_products() -> Dict[Tuple[Decimal, int], BerthProduct]:
+    return {
+        (product.max_width, product.pricing_category): product
+        for product in BerthProduct.objects.all()
+    }
+
+
+def _create_berth_leases(
+    scale: DatasetScale, berths: List[Berth], customers: list, today: date
+) -> None:
+    """
+    Lease the same berths for the same customers on every past season, and renew
+    the leases for the next season, except for ``renewable_leases`` of them.
+    """
+    products = _get_berth_products()
+    leased_berths = berths[: int(len(berths) * scale.lease_ratio)]
+    next_season_start = calculate_season_start_date()
+    orders = _LeaseOrders(today)
+
+    leases = []
+    renewable_leases = []
+    for years_ago in range(scale.seasons, -1, -1):
+        start_date = next_season_start.replace(year=next_season_start.year - years_ago)
+        end_date = calculate_season_end_date(start_date)
+        for index, berth in enumerate(leased_berths):
+            is_next_season = years_ago == 0
+            if is_next_season and index < scale.renewable_leases:
+                continue
+
+            customer, boat = customers[index % len(customers)]
+            status, due_date = (
+                orders.get_next_season_status(index - scale.renewable_leases, scale)
+                if is_next_season
+                else (OrderStatus.PAID, start_date - timedelta(days=60))
+            )
+            lease = BerthLeaseFactory.build(
+                customer=customer,
+                boat=boat,
+                berth=berth,
+                status=LeaseStatus(status),
+                start_date=start_date,
+                end_date=end_date,
+                contract=None,
+                create_product=False,
+            )
+            leases.append(lease)
+            if years_ago == 1 and index < scale.renewable_leases:
+                renewable_leases.append(lease)
+
+            orders.add(
+                lease,
+                products[(berth.berth_type.width, PricingCategory.DEFAULT)],
+                status,
+                due_date,
+            )
+
+    _bulk_create(BerthLease, leases)
+    orders.save()
+
+    # Only the leases with a contract are renewed
+    for lease in renewable_leases:
+        contract = BerthContractFactory(lease=None)
+        contract.lease = lease
+        contract.save()
+
+
+def _create_winter_storage_leases(
+    scale: DatasetScale, places: List[WinterStoragePlace], customers: list, today: date
+) -> None:
+    """Lease the same places for the same customers on every season until the current one"""
+    products = {
+        product.winter_storage_area_id: product
+        for product in WinterStorageProduct.objects.all()
+    }
+    leased_places = places[: int(len(places) * scale.lease_ratio)]
+    season_start = calculate_winter_season_start_date()
+    orders = _LeaseOrders(today)
+
+    leases = []
+    for years_ago in range(scale.seasons - 1, -1, -1):
+        start_date = season_start.replace(year=season_start.year - years_ago)
+        end_date = calculate_winter_season_end_date(start_date)
+        for index, place in enumerate(leased_places):
+            # The customers with a berth lease are the first ones
+            customer, boat = customers[-(index % len(customers)) - 1]
+            lease = WinterStorageLeaseFactory.build(
+                customer=customer,
+                boat=boat,
+                place=place,
+                status=LeaseStatus.PAID,
+                start_date=start_date,
+                end_date=end_date,
+                contract=None,
+                create_product=False,
+            )
+            leases.append(lease)
+            orders.add(
+                lease,
+                products[place.winter_storage_section.area_id],
+                OrderStatus.PAID,
+                start_date - timedelta(days=30),
+            )
+
+    _bulk_create(WinterStorageLease, leases)
+    orders.save()
+
+
+def _create_applications(
+    scale: DatasetScale, harbors: list, areas: list, customers: list
+) -> List[BerthApplication]:
+    berth_applications = []
+    harbor_choices = []
+    for customer, boat in random.sample(customers, scale.berth_applications):
+        application = BerthApplicationFactory.build(
+            customer=customer, boat=boat, status=ApplicationStatus.PENDING
+        )
+        berth_applications.append(application)
+        harbor_choices += [
+            HarborChoiceFactory.build(
+                application=application, harbor=harbor, priority=priority
+            )
+            for priority, harbor in enumerate(random.sample(harbors, 3), start=1)
+        ]
+    _bulk_create(BerthApplication, berth_applications)
+    _bulk_create(HarborChoice, harbor_choices)
+
+    winter_storage_applications = []
+    area_choices = []
+    for customer, boat in random.sample(customers, scale.winter_storage_applications):
+        application = WinterStorageApplicationFactory.build(
+            customer=customer, boat=boat, status=ApplicationStatus.PENDING
+        )
+        winter_storage_applications.append(application)
+        area_choices += [
+            WinterAreaChoiceFactory.build(
+                application=application, winter_storage_area=area, priority=priority
+            )
+            for priority, area in enumerate(random.sample(areas, 2), start=1)
+        ]
+    _bulk_create(WinterStorageApplication, winter_storage_applications)
+    _bulk_create(WinterStorageAreaChoice, area_choices)
+
+    return berth_applications
+
+
+def generate_dataset(scale: DatasetScale) -> Dataset:
+    """
+    Generate the dataset of the given scale, today is expected to be ``BENCHMARK_DATE``.
+
+    The random generators are seeded, so the same dataset is generated every time.
+    """
+    random.seed(BENCHMARK_SEED)
+    factory.random.reseed_random(BENCHMARK_SEED)
+    today = date.today()
+
+    boat_types = BoatTypeFactory.create_batch(5)
+    harbors, berths = _create_harbors(scale, boat_types)
+    areas, places = _create_winter_storage_areas(scale)
+    customers = _create_customers(scale, boat_types)
+
+    _create_berth_leases(scale, berths, customers, today)
+    _create_winter_storage_leases(scale, places, customers, today)
+    berth_applications = _create_applications(scale, harbors, areas, customers)
+
+    # The counters are not updated on bulk_create
+    update_winter_storage_counters()
+
+    return Dataset(
+        scale=scale,
+        admin_user=UserFactory(is_superuser=True),
+        harbor_ids=[harbor.id for harbor in harbors],
+        berth_application_ids=[application.id for application in berth_applications],
+    )
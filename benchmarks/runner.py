@@ -0,0 +1,108 @@
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .dataset import Dataset
+from .scenarios import Scenario
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    queries: int
+    median_ms: float
+    max_ms: float
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.queries} queries, "
+            f"median {self.median_ms:.1f} ms, max {self.max_ms:.1f} ms"
+        )
+
+
+def run_scenario(
+    scenario: Scenario, dataset: Dataset, rounds: int = None
+) -> BenchmarkResult:
+    """
+    Run the scenario the given number of rounds (by default the scenario's own),
+    each one on a cold cache and rolled back afterwards.
+    """
+    timings = []
+    queries = 0
+    for _i in range(rounds or scenario.rounds):
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                scenario.run(dataset)
+                timings.append((time.perf_counter() - start) * 1000)
+            transaction.set_rollback(True)
+        queries = max(queries, len(context.captured_queries))
+
+    return BenchmarkResult(
+        name=scenario.name,
+        queries=queries,
+        median_ms=round(statistics.median(timings), 1),
+        max_ms=round(max(timings), 1),
+    )
+
+
+class Baselines:
+    """
+    The stored results of each scenario for a dataset scale, the new results are
+    compared against them and (optionally) stored as the new baselines.
+    """
+
+    def __init__(self, scale_name: str, tolerance: float):
+        self.path = BASELINES_DIR / f"{scale_name}.json"
+        self.tolerance = tolerance
+        self.baselines: Dict[str, dict] = (
+            json.loads(self.path.read_text()) if self.path.exists() else {}
+        )
+        self.results: List[BenchmarkResult] = []
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.baselines.get(name)
+
+    def compare(self, result: BenchmarkResult) -> List[str]:
+        """Return the regressions of the result, compared to its baseline"""
+        self.results.append(result)
+        if not (baseline := self.get(result.name)):
+            return []
+
+        regressions = []
+        # The query counts are deterministic, any new query is a regression
+        if result.queries > baseline["queries"]:
+            regressions.append(
+                f"{result.queries} queries, the baseline is {baseline['queries']}"
+            )
+        # The latencies depend on the machine, so they are given some slack
+        max_median_ms = baseline["median_ms"] * (1 + self.tolerance)
+        if result.median_ms > max_median_ms:
+            regressions.append(
+                f"median of {result.median_ms} ms, the baseline is "
+                f"{baseline['median_ms']} ms (+{self.tolerance:.0%})"
+            )
+        return regressions
+
+    def save(self) -> None:
+        baselines = {
+            **self.baselines,
+            **{
+                result.name: {
+                    key: value for key, value in asdict(result).items() if key != "name"
+                }
+                for result in self.results
+            },
+        }
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,286 @@
+"""
+The benchmarked scenarios: the heaviest GraphQL queries and the periodic jobs.
+
+Each scenario is a function receiving the ``Dataset``, registered on ``SCENARIOS``
+with the ``scenario`` decorator. Any change done by a scenario is rolled back after
+each round by the runner, so the scenarios can be repeated over the same data.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict
+from unittest import mock
+
+from django.conf import settings
+from django.test import RequestFactory
+
+from applications.schema import BerthApplicationNode
+from berth_reservations.tests.query_budgets import (
+    BERTHS_QUERY,
+    HARBORS_QUERY,
+    ORDERS_QUERY,
+)
+from berth_reservations.tests.utils import create_api_client
+from customers.services import HelsinkiProfileUser, ProfileService
+from customers.services.sms_notification_service import SMSNotificationService
+from leases.services import BerthInvoicingService
+from payments.models import Order
+from resources.schema import HarborNode
+from utils.relay import to_global_id
+
+from .dataset import Dataset
+
+# The queries are repeated to smooth out the noise, the jobs are too slow for that
+QUERY_ROUNDS = 5
+JOB_ROUNDS = 1
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    run: Callable[[Dataset], None]
+    rounds: int = QUERY_ROUNDS
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, rounds: int = QUERY_ROUNDS):
+    def decorator(func: Callable[[Dataset], None]):
+        SCENARIOS[name] = Scenario(name, func, rounds)
+        return func
+
+    return decorator
+
+
+def _execute(dataset: Dataset, query: str, **variables) -> dict:
+    # A new client for each execution, so the data loaders don't cache across rounds
+    executed = create_api_client(user=dataset.admin_user).execute(
+        query, variables=variables
+    )
+    assert "errors" not in executed, executed["errors"]
+    return executed["data"]
+
+
+@scenario("harbors")
+def harbors(dataset: Dataset) -> None:
+    _execute(dataset, HARBORS_QUERY)
+
+
+PIERS_FOR_APPLICATION_QUERY = """
+    query PIERS_FOR_APPLICATION($application: ID!) {
+        piers(forApplication: $application) {
+            edges {
+                node {
+                    id
+                    properties {
+                        identifier
+                        berths {
+                            edges {
+                                node {
+                                    id
+                                    number
+                                    width
+                                    length
+                                    isAvailable
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@scenario("piers_for_application")
+def piers_for_application(dataset: Dataset) -> None:
+    _execute(
+        dataset,
+        PIERS_FOR_APPLICATION_QUERY,
+        application=to_global_id(
+            BerthApplicationNode, dataset.berth_application_ids[0]
+        ),
+    )
+
+
+@scenario("berths")
+def berths(dataset: Dataset) -> None:
+    _execute(
+        dataset, BERTHS_QUERY, harbor=to_global_id(HarborNode, dataset.harbor_ids[0])
+    )
+
+
+BERTH_PROFILES_QUERY = """
+    query BERTH_PROFILES {
+        berthProfiles(first: 100) {
+            count
+            edges {
+                node {
+                    id
+                    invoicingType
+                    boats {
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                    }
+                    berthApplications {
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                    }
+                    berthLeases {
+                        edges {
+                            node {
+                                id
+                                status
+                            }
+                        }
+                    }
+                    winterStorageLeases {
+                        edges {
+                            node {
+                                id
+                                status
+                            }
+                        }
+                    }
+                    orders {
+                        edges {
+                            node {
+                                id
+                                status
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@scenario("berth_profiles")
+def berth_profiles(dataset: Dataset) -> None:
+    _execute(dataset, BERTH_PROFILES_QUERY)
+
+
+BERTH_PROFILES_SEARCH_QUERY = """
+    query BERTH_PROFILES_SEARCH($harbors: [String]) {
+        berthProfiles(
+            first: 50
+            harbors: $harbors
+            leaseStatuses: [PAID]
+            leaseStart: "2019-01-01"
+            leaseCount: true
+            boatRegistrationNumber: "e"
+        ) {
+            count
+            totalCount
+            edges {
+                node {
+                    id
+                }
+            }
+        }
+    }
+"""
+
+
+@scenario("berth_profiles_search")
+def berth_profiles_search(dataset: Dataset) -> None:
+    # The admin customer search, filtering through the leases and the boats
+    _execute(
+        dataset,
+        BERTH_PROFILES_SEARCH_QUERY,
+        harbors=[to_global_id(HarborNode, dataset.harbor_ids[0])],
+    )
+
+
+@scenario("orders")
+def orders(dataset: Dataset) -> None:
+    _execute(dataset, ORDERS_QUERY)
+
+
+WINTER_STORAGE_AREAS_QUERY = """
+    query WINTER_STORAGE_AREAS {
+        winterStorageAreas {
+            edges {
+                node {
+                    id
+                    properties {
+                        name
+                        maxWidth
+                        maxLength
+                        numberOfPlaces
+                        numberOfFreePlaces
+                        numberOfInactivePlaces
+                        product {
+                            priceValue
+                        }
+                        sections {
+                            edges {
+                                node {
+                                    id
+                                    properties {
+                                        identifier
+                                        numberOfFreePlaces
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@scenario("winter_storage_areas")
+def winter_storage_areas(dataset: Dataset) -> None:
+    _execute(dataset, WINTER_STORAGE_AREAS_QUERY)
+
+
+def _get_profiles(profile_ids=None, **kwargs):
+    """Replace the Helsinki profile lookups of the jobs"""
+    return {
+        profile_id: HelsinkiProfileUser(
+            profile_id,
+            first_name="Benchmark",
+            last_name="Customer",
+            email=f"{profile_id}@example.org",
+            phone="+358501234567",
+        )
+        for profile_id in profile_ids
+    }
+
+
+@scenario("berth_invoicing", rounds=JOB_ROUNDS)
+def berth_invoicing(dataset: Dataset) -> None:
+    service = BerthInvoicingService(
+        request=RequestFactory().request(), profile_token="token"
+    )
+    with mock.patch.object(
+        ProfileService, "get_all_profiles", side_effect=_get_profiles
+    ), mock.patch.object(SMSNotificationService, "send", return_value=None):
+        service.send_invoices()
+
+    assert service.successful_orders, service.failed_leases
+
+
+@scenario("payment_reminders", rounds=JOB_ROUNDS)
+def payment_reminders(dataset: Dataset) -> None:
+    with mock.patch.object(SMSNotificationService, "send", return_value=None):
+        assert Order.objects.send_payment_reminders_for_unpaid_orders()
+
+
+@scenario("order_expiration", rounds=JOB_ROUNDS)
+def order_expiration(dataset: Dataset) -> None:
+    assert Order.objects.expire_too_old_unpaid_orders(
+        settings.EXPIRE_WAITING_ORDERS_OLDER_THAN_DAYS
+    )
@@ -0,0 +1,21 @@
+import pytest
+
+from .runner import run_scenario
+from .scenarios import SCENARIOS
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS.values()), ids=list(SCENARIOS))
+def test_benchmark(
+    scenario,
+    benchmark_dataset,
+    benchmark_baselines,
+    notification_template_orders_approved,
+    request,
+):
+    result = run_scenario(
+        scenario, benchmark_dataset, rounds=request.config.getoption("benchmark_rounds")
+    )
+
+    regressions = benchmark_baselines.compare(result)
+    if not request.config.getoption("benchmark_update_baselines"):
+        assert not regressions, f"{scenario.name} regressed: {', '.join(regressions)}"
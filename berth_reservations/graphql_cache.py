@@ -0,0 +1,152 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import parse, validate
+from graphql.backend import GraphQLBackend, GraphQLDocument
+from graphql.execution import execute, ExecutionResult
+
+__all__ = [
+    "PersistedQueryError",
+    "ValidatedDocumentCacheBackend",
+    "get_document_cache_backend",
+    "get_graphql_cache_stats",
+    "get_persisted_query",
+]
+
+PERSISTED_QUERY_CACHE_KEY_PREFIX = "persisted_query"
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_HASH_MISMATCH = "provided sha does not match query"
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _execute_validated(schema, document_ast, validation_errors, *args, **kwargs):
+    if validation_errors:
+        return ExecutionResult(errors=validation_errors, invalid=True)
+    return execute(schema, document_ast, *args, **kwargs)
+
+
+class ValidatedDocumentCacheBackend(GraphQLBackend):
+    """
+    Parses and validates each query document only once.
+
+    The documents (and their validation errors) are kept in a LRU cache keyed by the
+    schema and the hash of the query, so the operations sent over and over again
+    by the UIs are executed without re-parsing or re-validating them.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.documents = OrderedDict()
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def document_from_string(self, schema, document_string: str) -> GraphQLDocument:
+        key = (schema, hashlib.sha256(document_string.encode()).hexdigest())
+
+        with self._lock:
+            if (document := self.documents.get(key)) is not None:
+                self.documents.move_to_end(key)
+                self.stats.hits += 1
+                return document
+            self.stats.misses += 1
+
+        # Syntax errors are raised without caching the document
+        document_ast = parse(document_string)
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(
+                _execute_validated,
+                schema,
+                document_ast,
+                validate(schema, document_ast),
+            ),
+        )
+
+        with self._lock:
+            self.documents[key] = document
+            while len(self.documents) > self.maxsize:
+                self.documents.popitem(last=False)
+
+        return document
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats.as_dict(),
+            "size": len(self.documents),
+            "maxsize": self.maxsize,
+        }
+
+
+_document_cache_backend = None
+_persisted_query_stats = CacheStats()
+
+
+def get_document_cache_backend() -> ValidatedDocumentCacheBackend:
+    global _document_cache_backend
+
+    if _document_cache_backend is None:
+        _document_cache_backend = ValidatedDocumentCacheBackend(
+            maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE
+        )
+    return _document_cache_backend
+
+
+class PersistedQueryError(Exception):
+    pass
+
+
+def get_persisted_query(query: Optional[str], extensions: Optional[dict]) -> str:
+    """
+    Resolve the query of an Apollo-style persisted query request.
+
+    The clients send only the sha256 hash of the query on
+    extensions.persistedQuery.sha256Hash, and if the hash is not known,
+    they retry with both the hash and the query to register it.
+    """
+    persisted_query = (extensions or {}).get("persistedQuery")
+    if not persisted_query:
+        return query
+
+    query_hash = persisted_query.get("sha256Hash")
+    cache_key = f"{PERSISTED_QUERY_CACHE_KEY_PREFIX}:{query_hash}"
+
+    if not query:
+        if (query := cache.get(cache_key)) is None:
+            _persisted_query_stats.misses += 1
+            raise PersistedQueryError(PERSISTED_QUERY_NOT_FOUND)
+        _persisted_query_stats.hits += 1
+        return query
+
+    if hashlib.sha256(query.encode()).hexdigest() != query_hash:
+        raise PersistedQueryError(PERSISTED_QUERY_HASH_MISMATCH)
+
+    cache.set(cache_key, query, settings.GRAPHQL_PERSISTED_QUERY_CACHE_TIMEOUT)
+    return query
+
+
+def get_graphql_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Cache statistics of the current process"""
+    return {
+        "documents": get_document_cache_backend().get_stats(),
+        "persisted_queries": _persisted_query_stats.as_dict(),
+    }
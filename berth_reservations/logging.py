@@ -1,13 +1,19 @@
+import atexit
 import json
 import logging
+import queue
+import random
 import time
+from logging.handlers import QueueHandler, QueueListener
 
 from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
 
 logger = logging.getLogger("requests")
 
 
-__all__ = ["LogRequestFilter", "RequestLogger"]
+__all__ = ["LogRequestFilter", "QueueLogHandler", "RequestLogger"]
 
 
 class LogRequestFilter(logging.Filter):
@@ -18,46 +24,120 @@ class LogRequestFilter(logging.Filter):
         return record.name != "django.server"
 
 
+class QueueLogHandler(QueueHandler):
+    """Non-blocking log handler.
+
+    The records are put on a bounded queue and written to the stream by a background
+    thread, so the request does not wait for the I/O. If the queue is full,
+    the records are dropped instead of blocking.
+    """
+
+    def __init__(self, target_formatter: str = None, queue_size: int = 10000):
+        super().__init__(queue.Queue(queue_size))
+
+        target = logging.StreamHandler()
+        if target_formatter:
+            target.setFormatter(import_string(target_formatter)())
+
+        self.listener = QueueListener(self.queue, target)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class QueryTimer:
+    """Execute wrapper collecting the amount and the duration of the DB queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def _get_sample_rate(path: str) -> float:
+    for prefix, rate in settings.REQUEST_LOGGER_SAMPLE_RATES.items():
+        if path.startswith(prefix):
+            return rate
+    return settings.REQUEST_LOGGER_SAMPLE_RATE
+
+
+def _get_body(request):
+    if request.content_type == "multipart/form-data":
+        # The file uploads have already been consumed from the stream
+        return None
+
+    body = request.body
+    if len(body) > settings.REQUEST_LOGGER_BODY_MAX_LENGTH:
+        return body[: settings.REQUEST_LOGGER_BODY_MAX_LENGTH].decode(
+            request.encoding or "utf-8", errors="replace"
+        )
+
+    body = body.decode(request.encoding or "utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError:
+        return body
+
+
 class RequestLogger:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        query_timer = QueryTimer()
         exec_time = time.time()
-        response = self.get_response(request)
+        with connection.execute_wrapper(query_timer):
+            response = self.get_response(request)
         exec_time = int((time.time() - exec_time) * 1000)
 
         try:
             path = request.get_full_path()
             status = response.status_code
-            method = request.method
-            body = request.body.decode(request.encoding or "utf-8")
-            try:
-                body = json.loads(body)
-            except json.JSONDecodeError:
-                pass
 
+            level = logging.INFO
+            if path in settings.REQUEST_LOGGER_IGNORE_PATHS:
+                level = logging.DEBUG
+            elif 400 <= status < 500:
+                level = logging.WARNING
+            elif status >= 500:
+                level = logging.ERROR
+
+            if not logger.isEnabledFor(level):
+                return response
+
+            # The errors are always logged, the rest of the requests are sampled
+            if status < 400 and random.random() >= _get_sample_rate(request.path):
+                return response
+
+            method = request.method
             message = f"{method} {path} {status}"
             context = {
                 "host": request.get_host(),
                 "method": method,
-                "agent": request.headers.get("USER_AGENT", ""),
-                "referrer": request.headers.get("HTTP_REFERER", ""),
-                "language": request.headers.get("HTTP_ACCEPT_LANGUAGE", ""),
-                "content_length": request.headers.get("HTTP_CONTENT_LENGTH", ""),
-                "body": body,
+                "agent": request.headers.get("User-Agent", ""),
+                "referrer": request.headers.get("Referer", ""),
+                "language": request.headers.get("Accept-Language", ""),
+                "content_length": request.headers.get("Content-Length", ""),
+                "body": _get_body(request),
                 "path": path,
                 "status": status,
                 "exec_time": exec_time,
+                "db_time": int(query_timer.duration * 1000),
+                "db_queries": query_timer.count,
+                "graphql_operation": getattr(request, "graphql_operation_name", None),
             }
-            level = logging.INFO
-            if path in settings.REQUEST_LOGGER_IGNORE_PATHS:
-                level = logging.DEBUG
-            elif 400 >= status > 500:
-                level = logging.WARNING
-            elif status >= 500:
-                level = logging.ERROR
-
             logger.log(level, message, extra=context)
         except Exception as e:
             logger.exception("Failed logging", exc_info=e)
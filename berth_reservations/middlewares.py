@@ -1,7 +1,7 @@
 from django.conf import settings
 
 from customers.schema import CustomerProfileLoader
-from leases.schema import BerthLeaseForBerthLoader
+from leases.schema import BerthLeaseForBerthLoader, PrevSeasonBerthLeaseForBerthLoader
 from payments.schema.loaders import (
     BerthSwichOffersForLeasesLoader,
     OfferedBerthSwichOffersForBerthLoader,
@@ -9,17 +9,20 @@ from payments.schema.loaders import (
 from resources.schema import (
     BerthLoader,
     BerthTypeLoader,
+    BoatTypesForHarborLoader,
     HarborLoader,
     PierLoader,
     PiersForHarborLoader,
     SuitableBoatTypeLoader,
     WSAreaLoader,
 )
+from users.utils import reset_authorization_context
 
-__all__ = ["HostFixupMiddleware", "GQLDataLoaders"]
+__all__ = ["HostFixupMiddleware", "GQLAuthorizationContext", "GQLDataLoaders"]
 
 LOADERS = {
     "leases_for_berth_loader": BerthLeaseForBerthLoader,
+    "prev_season_lease_for_berth_loader": PrevSeasonBerthLeaseForBerthLoader,
     "switch_offers_for_leases_loader": BerthSwichOffersForLeasesLoader,
     "piers_for_harbor_loader": PiersForHarborLoader,
     "offered_switch_offer_for_berth_loader": OfferedBerthSwichOffersForBerthLoader,
@@ -30,6 +33,7 @@ LOADERS = {
     "berth_loader": BerthLoader,
     "suitable_boat_type_loader": SuitableBoatTypeLoader,
     "berth_type_loader": BerthTypeLoader,
+    "boat_types_for_harbor_loader": BoatTypesForHarborLoader,
 }
 
 
@@ -60,3 +64,21 @@ class GQLDataLoaders:
                 setattr(context, loader_name, loader)
 
         return next(root, info, **kwargs)
+
+
+class GQLAuthorizationContext:
+    """
+    Starts a new authorization context for the user of each execution,
+    so the permission checks are memoized for the lifetime of the execution.
+    """
+
+    def __init__(self):
+        self.user = None
+
+    def resolve(self, next, root, info, **kwargs):
+        # The user may still change on the first resolve (JSONWebTokenMiddleware)
+        if (user := info.context.user) is not self.user:
+            reset_authorization_context(user)
+            self.user = user
+
+        return next(root, info, **kwargs)
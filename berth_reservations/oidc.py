@@ -1,12 +1,182 @@
-from helusers.oidc import ApiTokenAuthentication
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from helusers.authz import UserAuthorization
+from helusers.models import OIDCBackChannelLogoutEvent
+from helusers.oidc import ApiTokenAuthentication, OIDCConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ValidatedTokenCache:
+    """
+    Bounded LRU cache of the successfully validated API tokens.
+
+    The entries are keyed by the hash of the token, hold the validated claims and
+    the id of the user, and expire together with the token (exp claim).
+    """
+
+    def __init__(self):
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(jwt_value) -> str:
+        if isinstance(jwt_value, str):
+            jwt_value = jwt_value.encode()
+        return hashlib.sha256(jwt_value).hexdigest()
+
+    def get(self, jwt_value) -> Optional[Tuple[dict, object]]:
+        key = self._get_key(jwt_value)
+        with self._lock:
+            if (entry := self._tokens.get(key)) is None:
+                return None
+            claims, _user_id = entry
+            if claims["exp"] <= time.time():
+                del self._tokens[key]
+                return None
+            self._tokens.move_to_end(key)
+            return entry
+
+    def set(self, jwt_value, claims: dict, user_id) -> None:
+        if not claims.get("exp"):
+            return
+        key = self._get_key(jwt_value)
+        with self._lock:
+            self._tokens[key] = (claims, user_id)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > settings.API_TOKEN_CACHE_SIZE:
+                self._tokens.popitem(last=False)
+
+    def delete(self, jwt_value) -> None:
+        with self._lock:
+            self._tokens.pop(self._get_key(jwt_value), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+validated_tokens = ValidatedTokenCache()
+
+
+class BackgroundRefreshOIDCConfig(OIDCConfig):
+    """
+    Keeps the key set of the issuer in memory.
+
+    Only the first fetch blocks the request, afterwards the keys that are older
+    than max_age are refreshed in a background thread while the old ones are served.
+    """
+
+    def __init__(self, issuer, max_age: int):
+        super().__init__(issuer)
+        self.max_age = max_age
+        self._keys = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def keys(self):
+        if self._keys is None:
+            with self._lock:
+                if self._keys is None:
+                    self._refresh()
+        elif time.monotonic() - self._fetched_at > self.max_age:
+            self._refresh_in_background()
+        return self._keys
+
+    def _fetch_keys(self):
+        config_url = self._issuer + "/.well-known/openid-configuration"
+        config = requests.get(config_url).json()
+
+        keys_url = config["jwks_uri"]
+        return requests.get(keys_url).json()
+
+    def _refresh(self):
+        self._keys = self._fetch_keys()
+        self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self._refresh()
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.warning(f"Refreshing the keys of {self._issuer} failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+_oidc_configs = {}
+_oidc_configs_lock = threading.Lock()
 
 
 class BerthApiTokenAuthentication(ApiTokenAuthentication):
     """
     Custom wrapper for the helusers.oidc.ApiTokenAuthentication backend.
     Implemented to fix Tunnistamo AMR-issue, when needed.
+
+    The validated tokens are cached until they expire, so the requests repeating
+    the same token skip the signature and claim validation.
     """
 
+    def authenticate(self, request):
+        jwt_value = self.get_jwt_value(request)
+        if jwt_value is None:
+            return None
+
+        if cached := validated_tokens.get(jwt_value):
+            claims, user_id = cached
+            user = (
+                None
+                if self._is_session_terminated(claims)
+                else get_user_model().objects.filter(pk=user_id).first()
+            )
+            if user:
+                return user, UserAuthorization(user, claims, self.settings)
+            # Let the full validation raise the relevant error
+            validated_tokens.delete(jwt_value)
+
+        user_auth_tuple = super().authenticate(request)
+        if user_auth_tuple:
+            user, auth = user_auth_tuple
+            validated_tokens.set(jwt_value, auth.data, user.pk)
+        return user_auth_tuple
+
+    @staticmethod
+    def _is_session_terminated(claims: dict) -> bool:
+        # Same check as helusers.jwt.JWT.validate_session, the sessions
+        # can be terminated before the token expires (back-channel logout)
+        if sid := claims.get("sid"):
+            return OIDCBackChannelLogoutEvent.objects.filter(
+                iss=claims["iss"], sid=sid
+            ).exists()
+        return False
+
+    def get_oidc_config(self, issuer):
+        if (config := _oidc_configs.get(issuer)) is None:
+            with _oidc_configs_lock:
+                config = _oidc_configs.setdefault(
+                    issuer,
+                    BackgroundRefreshOIDCConfig(
+                        issuer, max_age=self.settings.OIDC_CONFIG_EXPIRATION_TIME
+                    ),
+                )
+        return config
+
     def _convert_amr_to_list(self, id_token):
         """
         OIDC's amr validation fails, since Tunnistamo sends the amr as a string
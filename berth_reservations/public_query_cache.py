@@ -0,0 +1,111 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+from graphql.language import ast
+
+__all__ = [
+    "PUBLIC_QUERY_CACHE_ROOT_FIELDS",
+    "bump_public_query_cache_version",
+    "get_public_query_cache_key",
+    "get_public_query_cache_version",
+]
+
+PUBLIC_QUERY_CACHE_VERSION_KEY = "public_query_cache_version"
+PUBLIC_QUERY_CACHE_KEY_PREFIX = "public_query"
+
+# Only the queries selecting exclusively these root fields are cached,
+# since the cache is invalidated only on changes affecting them.
+PUBLIC_QUERY_CACHE_ROOT_FIELDS = {
+    "__typename",
+    "harbor",
+    "harbors",
+    "harborByServicemapId",
+    "pier",
+    "piers",
+    "berth",
+    "berths",
+    "winterStorageArea",
+    "winterStorageAreas",
+    "winterStorageSection",
+    "winterStorageSections",
+    "winterStoragePlace",
+    "winterStoragePlaces",
+}
+
+
+def get_public_query_cache_version() -> int:
+    version = cache.get(PUBLIC_QUERY_CACHE_VERSION_KEY)
+    if version is None:
+        # Start from a fresh value, so the keys cached before the version
+        # was evicted are not reused
+        version = time.time_ns()
+        cache.add(PUBLIC_QUERY_CACHE_VERSION_KEY, version, None)
+    return version
+
+
+def bump_public_query_cache_version(*args, **kwargs) -> None:
+    """Invalidate all the cached public query responses
+
+    Can be connected directly as a signal receiver.
+    """
+    try:
+        cache.incr(PUBLIC_QUERY_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(PUBLIC_QUERY_CACHE_VERSION_KEY, time.time_ns(), None)
+
+
+def _is_public_query(document_ast: ast.Document, operation_name: str = None) -> bool:
+    operations = [
+        definition
+        for definition in document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+    ]
+    if operation_name:
+        operations = [
+            operation
+            for operation in operations
+            if operation.name and operation.name.value == operation_name
+        ]
+    if len(operations) != 1 or operations[0].operation != "query":
+        return False
+
+    return all(
+        isinstance(selection, ast.Field)
+        and selection.name.value in PUBLIC_QUERY_CACHE_ROOT_FIELDS
+        for selection in operations[0].selection_set.selections
+    )
+
+
+def get_public_query_cache_key(
+    request, document_ast: ast.Document, query: str, variables, operation_name: str
+) -> Optional[str]:
+    """Return the cache key for the response of an anonymous public query
+
+    Returns None if the response should not be cached.
+    """
+    if not settings.PUBLIC_QUERY_CACHE_ENABLED:
+        return None
+
+    if "HTTP_AUTHORIZATION" in request.META or request.user.is_authenticated:
+        return None
+
+    if not _is_public_query(document_ast, operation_name):
+        return None
+
+    key = json.dumps(
+        [
+            get_public_query_cache_version(),
+            " ".join(query.split()),
+            variables,
+            operation_name,
+            get_language(),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return f"{PUBLIC_QUERY_CACHE_KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}"
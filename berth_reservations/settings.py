@@ -75,6 +75,20 @@ env = environ.Env(
     ENABLE_PROFILING_TOOLS=(bool, False),
     GDPR_API_QUERY_SCOPE=(str, "berths.gdprquery"),
     GDPR_API_DELETE_SCOPE=(str, "berths.gdprdelete"),
+    PROFILE_IDS_CACHE_TIMEOUT=(int, 60 * 5),  # 5 min
+    PUBLIC_QUERY_CACHE_ENABLED=(bool, False),
+    PUBLIC_QUERY_CACHE_TIMEOUT=(int, 60 * 60),  # 60 min
+    GRAPHQL_DOCUMENT_CACHE_SIZE=(int, 500),
+    GRAPHQL_PERSISTED_QUERY_CACHE_TIMEOUT=(int, 60 * 60 * 24),  # 24 h
+    API_TOKEN_CACHE_SIZE=(int, 1000),
+    TRANSLATED_NAME_CACHE_TIMEOUT=(int, 60 * 5),  # 5 min
+    REQUEST_LOGGER_SAMPLE_RATE=(float, 1.0),
+    REQUEST_LOGGER_SAMPLE_RATES=(dict, {}),
+    REQUEST_LOGGER_BODY_MAX_LENGTH=(int, 4096),
+    SERVICEMAP_API_URL=(str, "https://api.hel.fi/servicemap/v2/"),
+    SERVICEMAP_MAX_WORKERS=(int, 10),
+    NOTIFICATION_MAX_WORKERS=(int, 10),
+    PROFILE_API_MAX_WORKERS=(int, 5),
 )
 if os.path.exists(env_file):
     env.read_env(env_file)
@@ -96,6 +110,16 @@ REQUEST_LOGGER_IGNORE_PATHS = (
     "/static",
 )
 
+# Share of the successful requests logged, either for all the paths
+# or by path prefix (e.g. REQUEST_LOGGER_SAMPLE_RATES=/graphql/=0.1,/payments/=1).
+# The failed requests are always logged.
+REQUEST_LOGGER_SAMPLE_RATE = env.float("REQUEST_LOGGER_SAMPLE_RATE")
+REQUEST_LOGGER_SAMPLE_RATES = env.dict(
+    "REQUEST_LOGGER_SAMPLE_RATES", cast={"value": float}
+)
+# Longer request bodies are logged truncated (and not parsed)
+REQUEST_LOGGER_BODY_MAX_LENGTH = env.int("REQUEST_LOGGER_BODY_MAX_LENGTH")
+
 if env("CSRF_TRUSTED_ORIGINS"):
     CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS")
 
@@ -113,6 +137,36 @@ DATABASES["default"]["CONN_MAX_AGE"] = env.int("DATABASE_CONN_MAX_AGE")
 
 CACHES = {"default": env.cache()}
 
+# How long the ids matching the Helsinki Profile filters of berthProfiles are cached
+PROFILE_IDS_CACHE_TIMEOUT = env.int("PROFILE_IDS_CACHE_TIMEOUT")
+
+# Cache the responses of the anonymous harbor / winter storage queries (public map).
+# The cached responses are invalidated on resource, lease and offer changes,
+# so the cache backend has to be shared between the processes (i.e. not locmem).
+PUBLIC_QUERY_CACHE_ENABLED = env.bool("PUBLIC_QUERY_CACHE_ENABLED")
+PUBLIC_QUERY_CACHE_TIMEOUT = env.int("PUBLIC_QUERY_CACHE_TIMEOUT")
+
+# Number of parsed and validated GraphQL documents kept in memory per process
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int("GRAPHQL_DOCUMENT_CACHE_SIZE")
+# How long the queries registered by the clients as persisted queries are stored
+GRAPHQL_PERSISTED_QUERY_CACHE_TIMEOUT = env.int("GRAPHQL_PERSISTED_QUERY_CACHE_TIMEOUT")
+
+# How long the translated names of the reference models (harbors, boat types, etc.)
+# are kept in memory per process. The changes made by the other processes are seen
+# after this, the ones made by the same process right away.
+TRANSLATED_NAME_CACHE_TIMEOUT = env.int("TRANSLATED_NAME_CACHE_TIMEOUT")
+
+# Servicemap API used to update the harbor and winter storage area details
+SERVICEMAP_API_URL = env.str("SERVICEMAP_API_URL")
+# Number of concurrent requests to the Servicemap API
+SERVICEMAP_MAX_WORKERS = env.int("SERVICEMAP_MAX_WORKERS")
+
+# Number of concurrent requests when sending batches of SMS notifications
+NOTIFICATION_MAX_WORKERS = env.int("NOTIFICATION_MAX_WORKERS")
+
+# Number of concurrent requests when fetching batches of profiles from the Profile API
+PROFILE_API_MAX_WORKERS = env.int("PROFILE_API_MAX_WORKERS")
+
 DEFAULT_FROM_EMAIL = env.str("DEFAULT_FROM_EMAIL")
 if env("MAIL_MAILGUN_KEY"):
     ANYMAIL = {
@@ -257,6 +311,9 @@ OIDC_API_TOKEN_AUTH = {
 
 OIDC_AUTH = {"OIDC_LEEWAY": 60 * 60}
 
+# Number of validated API tokens kept in memory (per process) until they expire
+API_TOKEN_CACHE_SIZE = env.int("API_TOKEN_CACHE_SIZE")
+
 HELUSERS_USER_MIGRATE_ENABLED = env.bool("HELUSERS_USER_MIGRATE_ENABLED")
 HELUSERS_USER_MIGRATE_EMAIL_DOMAINS = env.list("HELUSERS_USER_MIGRATE_EMAIL_DOMAINS")
 HELUSERS_USER_MIGRATE_AMRS = env.list("HELUSERS_USER_MIGRATE_AMRS")
@@ -265,6 +322,7 @@ GRAPHENE = {
     "SCHEMA": "berth_reservations.schema.schema",
     "MIDDLEWARE": [
         "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "berth_reservations.middlewares.GQLAuthorizationContext",
         "berth_reservations.middlewares.GQLDataLoaders",
     ],
     "RELAY_CONNECTION_MAX_LIMIT": 5000,
@@ -283,6 +341,10 @@ LOGGING = {
             "filters": ["django_server"],
         },
         "json": {"class": "logging.StreamHandler", "formatter": "json"},
+        "queued_json": {
+            "()": "berth_reservations.logging.QueueLogHandler",
+            "target_formatter": "json_log_formatter.JSONFormatter",
+        },
     },
     "formatters": {
         "json": {"()": "json_log_formatter.JSONFormatter"},
@@ -293,7 +355,7 @@ LOGGING = {
         },
     },
     "loggers": {
-        "requests": {"handlers": ["json"], "level": "INFO"},
+        "requests": {"handlers": ["queued_json"], "level": "INFO"},
         "django": {"handlers": ["console"], "level": "INFO"},
     },
 }
@@ -348,6 +410,8 @@ EXPIRE_WAITING_OFFERS_OLDER_THAN_DAYS = 3
 GDPR_API_QUERY_SCOPE = env("GDPR_API_QUERY_SCOPE")
 GDPR_API_DELETE_SCOPE = env("GDPR_API_DELETE_SCOPE")
 GDPR_API_MODEL = "customers.CustomerProfile"
+# Fetches the profile with all the serialized relations prefetched
+GDPR_API_MODEL_LOOKUP = "customers.gdpr.get_customer_profile_for_gdpr"
 
 # local_settings.py can be used to override environment-specific settings
 # like database and email that differ between development and production.
@@ -4,15 +4,19 @@ from os.path import devnull
 import pytest
 from django.conf import settings
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.core.management import call_command
+from django.db import transaction
 from django_ilmoitin.models import NotificationTemplate
 
+from berth_reservations.translated_names import translated_names
 from contracts.tests.utils import TestContractService
 from customers.enums import OrganizationType
 from customers.tests.factories import OrganizationFactory
 
 from .factories import CustomerProfileFactory, MunicipalityFactory, UserFactory
-from .utils import create_api_client
+from .query_budgets import QUERY_BUDGET_SIZES
+from .utils import create_api_client, execute_and_count_queries
 
 
 @pytest.fixture(autouse=True)
@@ -28,6 +32,16 @@ def autouse_django_db(db, django_db_setup, django_db_blocker):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Don't let cached values leak between tests."""
+    cache.clear()
+    translated_names.clear()
+    yield
+    cache.clear()
+    translated_names.clear()
+
+
 @pytest.fixture(scope="session")
 def django_db_setup(django_db_setup, django_db_blocker):
     with django_db_blocker.unblock():
@@ -41,6 +55,15 @@ def django_db_modify_db_settings():
     pass
 
 
+@pytest.fixture(autouse=True)
+def run_on_commit_callbacks(monkeypatch):
+    """The tests run in a transaction that is never committed, so the on commit
+    callbacks (e.g. the winter storage counter updates) are run right away."""
+    monkeypatch.setattr(
+        transaction, "on_commit", lambda func, using=None, robust=False: func()
+    )
+
+
 @pytest.fixture(autouse=True)
 def force_settings(settings):
     settings.MAILER_EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
@@ -50,6 +73,37 @@ def force_settings(settings):
     settings.NOTIFICATION_SERVICE_TOKEN = "fake_token"
 
 
+@pytest.fixture
+def assert_query_budget():
+    """
+    Assert the queries of a QueryBudget operation don't grow with the size
+    of the result and stay within the budget.
+    """
+    user = UserFactory(is_superuser=True)
+
+    def _assert_query_budget(budget):
+        query_counts = {}
+        for size in QUERY_BUDGET_SIZES:
+            # The data of each size is rolled back after the execution
+            with transaction.atomic():
+                variables = budget.setup(size)
+                executed, query_counts[size] = execute_and_count_queries(
+                    user, budget.query, variables
+                )
+                transaction.set_rollback(True)
+            assert "errors" not in executed, executed["errors"]
+
+        assert (
+            len(set(query_counts.values())) == 1
+        ), f"The queries of {budget.name} grow with the result size: {query_counts}"
+        assert max(query_counts.values()) <= budget.max_queries, (
+            f"{budget.name} runs {max(query_counts.values())} queries, "
+            f"the budget is {budget.max_queries}"
+        )
+
+    return _assert_query_budget
+
+
 @pytest.fixture
 def user_api_client():
     return create_api_client(user=UserFactory())
@@ -0,0 +1,256 @@
+"""
+The SQL query budgets of the GraphQL operations.
+
+Each operation is registered on ``QUERY_BUDGETS`` with the ``query_budget`` decorator,
+which wraps a function creating the data for ``size`` nodes on the result of the
+operation and returning the variables for it. The operations are executed with
+each of the ``QUERY_BUDGET_SIZES``: the number of queries must be the same for all
+of them (i.e. no resolver runs queries for each node) and within the budget.
+
+The benchmarks run the same queries over a city-scale dataset, so the operations
+are defined here only once.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict
+
+from leases.tests.factories import BerthLeaseFactory
+from leases.utils import calculate_season_end_date, calculate_season_start_date
+from payments.tests.factories import (
+    OrderFactory,
+    OrderLineFactory,
+    OrderLogEntryFactory,
+)
+from resources.schema import HarborNode
+from resources.tests.factories import BerthFactory, HarborFactory, PierFactory
+from utils.relay import to_global_id
+
+from .factories import CustomerProfileFactory
+
+QUERY_BUDGET_SIZES = (2, 5)
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    name: str
+    query: str
+    setup: Callable[[int], dict]
+    max_queries: int
+
+
+QUERY_BUDGETS: Dict[str, QueryBudget] = {}
+
+
+def query_budget(name: str, query: str, max_queries: int):
+    def decorator(setup: Callable[[int], dict]):
+        QUERY_BUDGETS[name] = QueryBudget(name, query, setup, max_queries)
+        return setup
+
+    return decorator
+
+
+HARBORS_QUERY = """
+    query HARBORS {
+        harbors {
+            edges {
+                node {
+                    id
+                    properties {
+                        name
+                        maxWidth
+                        maxLength
+                        numberOfPlaces
+                        numberOfFreePlaces
+                        numberOfInactivePlaces
+                        suitableBoatTypes {
+                            name
+                        }
+                        piers {
+                            edges {
+                                node {
+                                    id
+                                    properties {
+                                        identifier
+                                        numberOfPlaces
+                                        numberOfFreePlaces
+                                        suitableBoatTypes {
+                                            name
+                                        }
+                                        berths {
+                                            edges {
+                                                node {
+                                                    id
+                                                    width
+                                                    isAvailable
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@query_budget("harbors", HARBORS_QUERY, max_queries=12)
+def harbors(size: int) -> dict:
+    for _i in range(size):
+        pier = PierFactory(harbor=HarborFactory(), suitable_boat_types__count=2)
+        BerthFactory.create_batch(size, pier=pier)
+    return {}
+
+
+PIERS_QUERY = """
+    query PIERS {
+        piers {
+            edges {
+                node {
+                    id
+                    properties {
+                        identifier
+                        harbor {
+                            id
+                        }
+                        suitableBoatTypes {
+                            name
+                        }
+                        berths(isAvailable: true) {
+                            edges {
+                                node {
+                                    id
+                                    width
+                                    length
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@query_budget("piers", PIERS_QUERY, max_queries=12)
+def piers(size: int) -> dict:
+    for pier in PierFactory.create_batch(size, suitable_boat_types__count=2):
+        BerthFactory.create_batch(size, pier=pier)
+    return {}
+
+
+BERTHS_QUERY = """
+    query BERTHS($harbor: ID) {
+        berths(harbor: $harbor) {
+            edges {
+                node {
+                    id
+                    number
+                    width
+                    length
+                    depth
+                    mooringType
+                    isAvailable
+                    pier {
+                        id
+                    }
+                    prevSeasonLease {
+                        id
+                    }
+                    pendingSwitchOffer {
+                        id
+                    }
+                    leases {
+                        edges {
+                            node {
+                                id
+                                status
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@query_budget("berths", BERTHS_QUERY, max_queries=12)
+def berths(size: int) -> dict:
+    today = date.today()
+    prev_season = today.replace(year=today.year - 1)
+    pier = PierFactory()
+    for berth in BerthFactory.create_batch(size, pier=pier):
+        BerthLeaseFactory(
+            berth=berth,
+            start_date=calculate_season_start_date(prev_season),
+            end_date=calculate_season_end_date(prev_season),
+        )
+    return {"harbor": to_global_id(HarborNode, pier.harbor_id)}
+
+
+ORDERS_QUERY = """
+    query ORDERS {
+        orders(first: 100) {
+            count
+            edges {
+                node {
+                    id
+                    orderNumber
+                    status
+                    price
+                    totalPrice
+                    dueDate
+                    paidAt
+                    customer {
+                        id
+                    }
+                    product {
+                        __typename
+                    }
+                    lease {
+                        ... on BerthLeaseNode {
+                            id
+                        }
+                        ... on WinterStorageLeaseNode {
+                            id
+                        }
+                    }
+                    orderLines {
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                    }
+                    logEntries {
+                        edges {
+                            node {
+                                id
+                                toStatus
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@query_budget("orders", ORDERS_QUERY, max_queries=12)
+def orders(size: int) -> dict:
+    for _i in range(size):
+        customer_profile = CustomerProfileFactory()
+        order = OrderFactory(
+            customer=customer_profile,
+            lease=BerthLeaseFactory(customer=customer_profile),
+        )
+        OrderLineFactory(order=order)
+        OrderLogEntryFactory(order=order)
+    return {}
@@ -0,0 +1,127 @@
+import hashlib
+import json
+
+from berth_reservations.graphql_cache import (
+    get_graphql_cache_stats,
+    PERSISTED_QUERY_HASH_MISMATCH,
+    PERSISTED_QUERY_NOT_FOUND,
+    ValidatedDocumentCacheBackend,
+)
+from berth_reservations.schema import schema
+from resources.tests.factories import BoatTypeFactory
+
+from .factories import UserFactory
+
+BOAT_TYPES_QUERY = "{ boatTypes { name } }"
+
+
+def _post_query(client, **data):
+    return json.loads(
+        client.post(
+            "/graphql/", json.dumps(data), content_type="application/json"
+        ).content
+    )
+
+
+def _persisted_query_extensions(query):
+    return {
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": hashlib.sha256(query.encode()).hexdigest(),
+        }
+    }
+
+
+def test_document_cache_backend_reuses_documents():
+    backend = ValidatedDocumentCacheBackend(maxsize=2)
+
+    document = backend.document_from_string(schema, BOAT_TYPES_QUERY)
+
+    assert backend.document_from_string(schema, BOAT_TYPES_QUERY) is document
+    assert backend.get_stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "size": 1,
+        "maxsize": 2,
+    }
+
+
+def test_document_cache_backend_evicts_least_recently_used():
+    backend = ValidatedDocumentCacheBackend(maxsize=2)
+    queries = [
+        BOAT_TYPES_QUERY,
+        "{ availabilityLevels { id } }",
+        "{ harbors { edges { node { id } } } }",
+    ]
+
+    for query in queries:
+        backend.document_from_string(schema, query)
+    backend.document_from_string(schema, queries[0])
+
+    assert backend.get_stats()["size"] == 2
+    assert backend.get_stats()["hits"] == 0
+
+
+def test_document_cache_backend_caches_validation_errors():
+    backend = ValidatedDocumentCacheBackend(maxsize=2)
+
+    document = backend.document_from_string(schema, "{ notAField }")
+    result = document.execute()
+
+    assert result.invalid
+    assert "notAField" in str(result.errors[0])
+
+
+def test_persisted_query_not_found(client):
+    executed = _post_query(
+        client, extensions=_persisted_query_extensions(BOAT_TYPES_QUERY)
+    )
+
+    assert executed["errors"][0]["message"] == PERSISTED_QUERY_NOT_FOUND
+
+
+def test_persisted_query_registered_and_used(client):
+    boat_type = BoatTypeFactory()
+    extensions = _persisted_query_extensions(BOAT_TYPES_QUERY)
+
+    registered = _post_query(client, query=BOAT_TYPES_QUERY, extensions=extensions)
+    executed = _post_query(client, extensions=extensions)
+
+    assert registered == executed == {"data": {"boatTypes": [{"name": boat_type.name}]}}
+
+
+def test_persisted_query_hash_mismatch(client):
+    executed = _post_query(
+        client,
+        query=BOAT_TYPES_QUERY,
+        extensions=_persisted_query_extensions("{ harbors { edges { node { id } } } }"),
+    )
+
+    assert executed["errors"][0]["message"] == PERSISTED_QUERY_HASH_MISMATCH
+
+
+def test_persisted_query_resolved_once_with_public_query_cache(client, settings):
+    settings.PUBLIC_QUERY_CACHE_ENABLED = True
+    extensions = _persisted_query_extensions(BOAT_TYPES_QUERY)
+    _post_query(client, query=BOAT_TYPES_QUERY, extensions=extensions)
+    hits = get_graphql_cache_stats()["persisted_queries"]["hits"]
+
+    _post_query(client, extensions=extensions)
+
+    assert get_graphql_cache_stats()["persisted_queries"]["hits"] == hits + 1
+
+
+def test_graphql_cache_stats_view(client):
+    client.force_login(UserFactory(is_superuser=True))
+
+    response = client.get("/graphql/cache-stats/")
+
+    assert response.status_code == 200
+    assert set(json.loads(response.content)) == {"documents", "persisted_queries"}
+
+
+def test_graphql_cache_stats_view_requires_superuser(client):
+    client.force_login(UserFactory())
+
+    assert client.get("/graphql/cache-stats/").status_code == 403
@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+from django.contrib.auth.models import Group
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from berth_reservations.logging import RequestLogger
+
+
+def _log_request(request, status=200):
+    RequestLogger(lambda r: HttpResponse(status=status))(request)
+
+
+def _graphql_request(query="{ harbors { edges { node { id } } } }"):
+    return RequestFactory().post(
+        "/graphql/",
+        json.dumps({"query": query}),
+        content_type="application/json",
+        HTTP_USER_AGENT="test-agent",
+    )
+
+
+@pytest.mark.parametrize(
+    "status,level",
+    [(200, logging.INFO), (404, logging.WARNING), (500, logging.ERROR)],
+)
+def test_request_logger_level(caplog, status, level):
+    with caplog.at_level(logging.INFO, logger="requests"):
+        _log_request(_graphql_request(), status)
+
+    record = caplog.records[0]
+    assert record.levelno == level
+    assert record.status == status
+    assert record.agent == "test-agent"
+    assert record.body == {"query": "{ harbors { edges { node { id } } } }"}
+    assert record.db_queries == 0
+
+
+def test_request_logger_sampling(caplog, settings):
+    settings.REQUEST_LOGGER_SAMPLE_RATES = {"/graphql/": 0}
+
+    with caplog.at_level(logging.INFO, logger="requests"):
+        _log_request(_graphql_request())
+        _log_request(_graphql_request(), status=400)
+        _log_request(RequestFactory().get("/payments/success/"))
+
+    # The errors are logged even if the path is not sampled
+    assert [record.status for record in caplog.records] == [400, 200]
+
+
+def test_request_logger_truncates_body(caplog, settings):
+    settings.REQUEST_LOGGER_BODY_MAX_LENGTH = 10
+
+    with caplog.at_level(logging.INFO, logger="requests"):
+        _log_request(_graphql_request())
+
+    assert caplog.records[0].body == '{"query": '
+
+
+def test_request_logger_counts_queries(caplog):
+    def get_response(request):
+        list(Group.objects.all())
+        return HttpResponse()
+
+    with caplog.at_level(logging.INFO, logger="requests"):
+        RequestLogger(get_response)(_graphql_request())
+
+    assert caplog.records[0].db_queries == 1
@@ -0,0 +1,90 @@
+import time
+from unittest import mock
+
+import pytest
+from django.test import RequestFactory
+from helusers.authz import UserAuthorization
+from helusers.models import OIDCBackChannelLogoutEvent
+from helusers.oidc import ApiTokenAuthentication
+
+from berth_reservations.oidc import (
+    BackgroundRefreshOIDCConfig,
+    BerthApiTokenAuthentication,
+    validated_tokens,
+)
+from berth_reservations.tests.factories import UserFactory
+
+ISSUER = "https://tunnistamo.example.com"
+
+
+@pytest.fixture(autouse=True)
+def clear_validated_tokens():
+    validated_tokens.clear()
+    yield
+    validated_tokens.clear()
+
+
+def _token_request(token="token"):
+    return RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+def _authenticate(user, **claims):
+    claims = {"iss": ISSUER, "exp": time.time() + 60, **claims}
+    with mock.patch.object(
+        ApiTokenAuthentication,
+        "authenticate",
+        return_value=(user, UserAuthorization(user, claims)),
+    ) as mock_authenticate:
+        result = BerthApiTokenAuthentication().authenticate(_token_request())
+    return result, mock_authenticate
+
+
+def test_validated_token_is_cached():
+    user = UserFactory()
+
+    (first_user, _auth), mock_authenticate = _authenticate(user)
+    assert mock_authenticate.call_count == 1
+
+    (cached_user, auth), mock_authenticate = _authenticate(user)
+    assert mock_authenticate.call_count == 0
+    assert cached_user == first_user == user
+    assert auth.data["iss"] == ISSUER
+
+
+def test_expired_token_is_validated_again():
+    user = UserFactory()
+
+    _authenticate(user, exp=time.time() - 1)
+    _result, mock_authenticate = _authenticate(user)
+
+    assert mock_authenticate.call_count == 1
+
+
+def test_terminated_session_token_is_validated_again():
+    user = UserFactory()
+
+    _authenticate(user, sid="session")
+    OIDCBackChannelLogoutEvent.objects.create(iss=ISSUER, sid="session")
+    _result, mock_authenticate = _authenticate(user, sid="session")
+
+    assert mock_authenticate.call_count == 1
+
+
+def test_oidc_config_keys_refreshed_in_background():
+    config = BackgroundRefreshOIDCConfig(ISSUER, max_age=60)
+
+    with mock.patch.object(
+        config, "_fetch_keys", side_effect=[{"keys": [1]}, {"keys": [2]}]
+    ) as mock_fetch_keys, mock.patch(
+        "berth_reservations.oidc.threading.Thread"
+    ) as mock_thread:
+        assert config.keys() == {"keys": [1]}
+        assert config.keys() == {"keys": [1]}
+        assert mock_fetch_keys.call_count == 1
+
+        # The stale keys are served while the refresh is started in the background
+        config._fetched_at -= 61
+        assert config.keys() == {"keys": [1]}
+        mock_thread.assert_called_once()
+        mock_thread.call_args.kwargs["target"]()
+        assert config.keys() == {"keys": [2]}
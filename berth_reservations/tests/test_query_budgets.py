@@ -0,0 +1,8 @@
+import pytest
+
+from .query_budgets import QUERY_BUDGETS
+
+
+@pytest.mark.parametrize("budget", QUERY_BUDGETS.values(), ids=QUERY_BUDGETS.keys())
+def test_query_budget(budget, assert_query_budget):
+    assert_query_budget(budget)
@@ -0,0 +1,46 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import override
+
+from berth_reservations.translated_names import translated_names
+from resources.models import BoatType, Harbor
+from resources.tests.factories import BoatTypeFactory, HarborFactory
+
+
+def test_translated_names_are_loaded_once():
+    boat_types = BoatTypeFactory.create_batch(3)
+
+    with CaptureQueriesContext(connection) as queries:
+        names = [translated_names.get(BoatType, bt.id) for bt in boat_types]
+        names += [translated_names.get(BoatType, bt.id) for bt in boat_types]
+
+    assert len(queries) == 1
+    assert names == [bt.name for bt in boat_types] * 2
+
+
+def test_translated_name_falls_back_to_other_languages():
+    harbor = HarborFactory()
+    harbor.set_current_language("fi")
+    harbor.name = "Satama"
+    harbor.save()
+
+    with override("fi"):
+        assert translated_names.get(Harbor, harbor.id) == "Satama"
+    with override("sv"):
+        # There's no swedish translation
+        assert translated_names.get(Harbor, harbor.id) in ("Satama", harbor.name)
+
+
+def test_translated_names_unknown_or_empty_pk():
+    assert translated_names.get(BoatType, None) == ""
+    assert translated_names.get(BoatType, -1) == ""
+
+
+def test_translated_names_are_invalidated_on_save():
+    boat_type = BoatTypeFactory(name="Old")
+    assert translated_names.get(BoatType, boat_type.id) == "Old"
+
+    boat_type.name = "New"
+    boat_type.save()
+
+    assert translated_names.get(BoatType, boat_type.id) == "New"
@@ -1,9 +1,12 @@
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from graphene.test import Client as GrapheneClient
 from requests import RequestException
 
-from ..middlewares import GQLDataLoaders
+from ..middlewares import GQLAuthorizationContext, GQLDataLoaders
 from ..schema import schema
 
 
@@ -22,7 +25,9 @@ class ApiClient(GrapheneClient):
                 "variables" not in kwargs
             ), 'Do not pass both "variables" and "input" at the same time'
             kwargs["variables"] = {"input": input}
-        return super().execute(*args, middleware=[GQLDataLoaders()], **kwargs)
+        return super().execute(
+            *args, middleware=[GQLAuthorizationContext(), GQLDataLoaders()], **kwargs
+        )
 
 
 def create_api_client(user=None):
@@ -40,6 +45,18 @@ def create_api_client(user=None):
     return client
 
 
+def execute_and_count_queries(user, query, variables=None):
+    """
+    Execute the query on a new client with a cold cache, so nothing is reused from
+    previous executions, and return the result along with the number of SQL queries.
+    """
+    cache.clear()
+    api_client = create_api_client(user=user)
+    with CaptureQueriesContext(connection) as context:
+        executed = api_client.execute(query, variables=variables)
+    return executed, len(context.captured_queries)
+
+
 class MockResponseBase:
     def __init__(self, status_code):
         self.status_code = status_code
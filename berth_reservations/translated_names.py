@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Dict, Tuple, Type
+
+from django.conf import settings
+from django.db.models import Model
+from django.utils.translation import get_language
+from parler.utils import get_active_language_choices
+
+__all__ = [
+    "invalidate_translated_names",
+    "translated_names",
+]
+
+# pk -> language -> value
+_Values = Dict[object, Dict[str, str]]
+
+
+class TranslatedNameCache:
+    """
+    Process-level cache of the translated names of the low-cardinality reference
+    models (harbors, winter storage areas, boat types, etc.), so they are not
+    fetched for each object on the exports, the admin lists and the order details.
+
+    All the translations of a model field are loaded with a single query when the
+    first one is needed. They are dropped when an instance or a translation of the
+    model is saved or deleted in this process, and reloaded after
+    TRANSLATED_NAME_CACHE_TIMEOUT seconds to pick up the changes made by the
+    other processes.
+    """
+
+    def __init__(self):
+        self._values: Dict[Tuple[Type[Model], str], Tuple[float, _Values]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, model: Type[Model], field: str) -> _Values:
+        values = {}
+        for master_id, language_code, value in (
+            model._parler_meta.root_model.objects.order_by()
+            .values_list("master_id", "language_code", field)
+            .iterator()
+        ):
+            values.setdefault(master_id, {})[language_code] = value
+        return values
+
+    def _get_values(self, model: Type[Model], field: str) -> _Values:
+        key = (model, field)
+        entry = self._values.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            with self._lock:
+                entry = self._values.get(key)
+                if entry is None or entry[0] <= time.monotonic():
+                    entry = (
+                        time.monotonic() + settings.TRANSLATED_NAME_CACHE_TIMEOUT,
+                        self._load(model, field),
+                    )
+                    self._values[key] = entry
+        return entry[1]
+
+    def get(
+        self, model: Type[Model], pk, field: str = "name", language: str = None
+    ) -> str:
+        """
+        Return the translation of the field in the given language (the active one
+        by default), falling back to the other languages like parler does.
+        """
+        if pk is None:
+            return ""
+        translations = self._get_values(model, field).get(pk, {})
+        for language_code in get_active_language_choices(language or get_language()):
+            if value := translations.get(language_code):
+                return value
+        return next(iter(translations.values()), "")
+
+    def invalidate(self, model: Type[Model]) -> None:
+        with self._lock:
+            for key in [key for key in self._values if key[0] is model]:
+                del self._values[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+translated_names = TranslatedNameCache()
+
+
+def invalidate_translated_names(sender, **kwargs) -> None:
+    """Drop the cached names of the model (or of the model of the translation)
+
+    Can be connected directly as a signal receiver.
+    """
+    if hasattr(sender, "master"):
+        # The translation model of a TranslatableModel
+        sender = sender._meta.get_field("master").related_model
+    translated_names.invalidate(sender)
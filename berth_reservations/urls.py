@@ -9,11 +9,12 @@ from contracts.services import get_contract_service
 from payments import urls as payment_urls
 from payments.models import Order
 
-from .views import SentryGraphQLView
+from .views import graphql_cache_stats, SentryGraphQLView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("graphql/", csrf_exempt(SentryGraphQLView.as_view(graphiql=True))),
+    path("graphql/cache-stats/", graphql_cache_stats),
     path("payments/", include(payment_urls)),
     path("exports/", include("exports.urls")),
     path("gdpr-api/", include("helsinki_gdpr.urls")),
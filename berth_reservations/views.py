@@ -1,9 +1,31 @@
+import hashlib
+import json
+
 import sentry_sdk
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseNotModified,
+    JsonResponse,
+)
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from graphene_django.views import HttpError
 from graphene_file_upload.django import FileUploadGraphQLView
 from graphql_jwt.exceptions import PermissionDenied as JwtPermissionDenied
 
 from .exceptions import VenepaikkaGraphQLError, VenepaikkaGraphQLWarning
+from .graphql_cache import (
+    get_document_cache_backend,
+    get_graphql_cache_stats,
+    get_persisted_query,
+    PersistedQueryError,
+)
+from .public_query_cache import get_public_query_cache_key
 
 sentry_ignored_errors = (
     VenepaikkaGraphQLError,
@@ -15,6 +37,91 @@ sentry_ignored_errors = (
 
 
 class SentryGraphQLView(FileUploadGraphQLView):
+    def get_backend(self, request):
+        # Parse and validate the (mostly fixed set of) queries only once
+        return get_document_cache_backend()
+
+    def get_graphql_params(self, request, data):
+        """
+        Resolve the query of the Apollo-style persisted queries.
+
+        The params are kept on the request, as get_response needs them before
+        the query is executed and the persisted query must be resolved only once.
+        """
+        parsed = getattr(request, "graphql_params", None)
+        if parsed and parsed[0] is data:
+            return parsed[1]
+
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+        # Logged by the RequestLogger
+        request.graphql_operation_name = operation_name
+
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+
+        try:
+            query = get_persisted_query(query, extensions)
+        except PersistedQueryError as e:
+            # The clients expect the error in a successful response to retry with the query
+            raise HttpError(HttpResponse(), str(e))
+
+        request.graphql_params = (data, (query, variables, operation_name, id))
+        return query, variables, operation_name, id
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+
+        # Set by get_response when the response of a public query is cached
+        etag = getattr(request, "public_query_etag", None)
+        if etag and response.status_code == 200:
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+            response["ETag"] = etag
+            patch_vary_headers(response, ("Accept-Language",))
+        return response
+
+    def get_response(self, request, data, show_graphiql=False):
+        """
+        Serve the anonymous public queries (e.g. the harbors on the map) from the cache.
+        The cached responses are invalidated when the underlying data changes,
+        see berth_reservations.public_query_cache.
+        """
+        cache_key = None
+        if settings.PUBLIC_QUERY_CACHE_ENABLED and not self.batch and not show_graphiql:
+            query, variables, operation_name, _id = self.get_graphql_params(
+                request, data
+            )
+            document = None
+            if query:
+                try:
+                    document = self.get_backend(request).document_from_string(
+                        self.schema, query
+                    )
+                except Exception:
+                    pass
+            if document:
+                cache_key = get_public_query_cache_key(
+                    request, document.document_ast, query, variables, operation_name
+                )
+
+        if not cache_key:
+            return super().get_response(request, data, show_graphiql)
+
+        if (result := cache.get(cache_key)) is None:
+            result, status_code = super().get_response(request, data, show_graphiql)
+            if status_code != 200 or not result or json.loads(result).get("errors"):
+                return result, status_code
+            cache.set(cache_key, result, settings.PUBLIC_QUERY_CACHE_TIMEOUT)
+
+        request.public_query_etag = quote_etag(
+            hashlib.sha256(result.encode()).hexdigest()
+        )
+        return result, 200
+
     def execute_graphql_request(self, request, data, query, *args, **kwargs):
         """
         Extract any exceptions and send some of them to Sentry.
@@ -41,3 +148,10 @@ class SentryGraphQLView(FileUploadGraphQLView):
                 if hasattr(error, "original_error"):
                     error = error.original_error
                 sentry_sdk.capture_exception(error)
+
+
+def graphql_cache_stats(request):
+    """Hit rates of the GraphQL document and persisted query caches of the process"""
+    if not request.user.is_superuser:
+        return HttpResponseForbidden()
+    return JsonResponse(get_graphql_cache_stats())
@@ -16,6 +16,9 @@ from .models import Boat, BoatCertificate, CustomerProfile, Organization
 
 class ImportProfilesFromJsonForm(forms.Form):
     json_file = forms.FileField(required=True, label="Please select a json file")
+    dry_run = forms.BooleanField(
+        required=False, label="Only validate the data, without importing it"
+    )
 
 
 class CustomerProfileInline(admin.StackedInline):
@@ -110,7 +113,19 @@ class CustomerProfileAdmin(admin.ModelAdmin):
         try:
             if request.method == "POST":
                 data = json.loads(request.FILES["json_file"].read())
-                result = CustomerProfile.objects.import_customer_data(data)
+                dry_run = bool(request.POST.get("dry_run"))
+                result = CustomerProfile.objects.import_customer_data(
+                    data, dry_run=dry_run
+                )
+                if dry_run:
+                    messages.success(
+                        request, f"The data of {len(result)} customers is valid"
+                    )
+                    return render(
+                        request,
+                        "admin/customers/upload_json.html",
+                        {"form": ImportProfilesFromJsonForm()},
+                    )
                 response = JsonResponse(result)
                 response["Content-Disposition"] = "attachment; filename=export.json"
                 return response
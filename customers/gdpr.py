@@ -0,0 +1,93 @@
+from django.db.models import Prefetch, prefetch_related_objects
+
+from applications.models import BerthApplication, WinterStorageApplication
+from leases.models import BerthLease, WinterStorageLease
+from payments.models import BerthSwitchOffer, Order, WinterStorageProduct
+
+from .models import Boat, CustomerProfile
+
+
+def _get_customer_profile_prefetches():
+    """
+    The relations walked by CustomerProfile.serialize_fields (and the nested ones),
+    so the whole profile is serialized with a fixed number of queries.
+    """
+    return [
+        Prefetch(
+            "berth_applications",
+            queryset=BerthApplication.objects.select_related(
+                "boat",
+                "berth_switch__berth__pier",
+                "berth_switch__reason",
+            ).prefetch_related(
+                "berth_switch__reason__translations",
+                "harborchoice_set__harbor__translations",
+            ),
+        ),
+        Prefetch(
+            "berth_leases",
+            queryset=BerthLease.objects.select_related(
+                "boat", "application", "berth__pier"
+            ).prefetch_related("orders"),
+        ),
+        Prefetch(
+            "boats",
+            queryset=Boat.objects.select_related("boat_type").prefetch_related(
+                "boat_type__translations", "certificates"
+            ),
+        ),
+        Prefetch(
+            "offers",
+            queryset=BerthSwitchOffer.objects.select_related(
+                "application", "lease", "berth"
+            ),
+        ),
+        Prefetch(
+            "orders",
+            # The generic product and lease are fetched with a query per content type
+            queryset=Order.objects.prefetch_related(
+                "product", "lease", "order_lines__product", "log_entries"
+            ),
+        ),
+        Prefetch(
+            "winter_storage_applications",
+            queryset=WinterStorageApplication.objects.select_related(
+                "boat"
+            ).prefetch_related(
+                "winterstorageareachoice_set__winter_storage_area__translations"
+            ),
+        ),
+        Prefetch(
+            "winter_storage_leases",
+            queryset=WinterStorageLease.objects.select_related(
+                "boat",
+                "application",
+                "place__winter_storage_section",
+                "section",
+            ).prefetch_related("orders"),
+        ),
+    ]
+
+
+def get_customer_profile_for_gdpr(model, instance_id) -> CustomerProfile:
+    """
+    Used as the GDPR_API_MODEL_LOOKUP, to fetch the customer profile
+    with all the data serialized for the GDPR API prefetched.
+    """
+    profile = (
+        model.objects.select_related("user", "organization")
+        .prefetch_related(*_get_customer_profile_prefetches())
+        .get(pk=instance_id)
+    )
+
+    # The related objects of the generic products depend on their type
+    winter_storage_products = [
+        order.product
+        for order in profile.orders.all()
+        if isinstance(order.product, WinterStorageProduct)
+    ]
+    prefetch_related_objects(
+        winter_storage_products, "winter_storage_area__translations"
+    )
+
+    return profile
@@ -0,0 +1,410 @@
+import uuid
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from dateutil.parser import parse
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from leases.consts import ACTIVE_LEASE_STATUSES
+from leases.enums import LeaseStatus
+from leases.models import BerthLease
+from payments.enums import OrderStatus
+from payments.models import Order
+from resources.models import Berth, BoatType, Harbor
+
+from .enums import OrganizationType
+from .models import Boat, CustomerProfile, Organization
+from .utils import calculate_lease_start_and_end_dates
+
+CUSTOMER_IMPORT_BATCH_SIZE = 1000
+
+# (harbor servicemap id, pier identifier, berth number)
+BerthKey = Tuple[str, str, str]
+
+
+class CustomerImportError(Exception):
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n\n".join(errors))
+
+
+class ImportedCustomer:
+    def __init__(self, customer_id: str, customer: CustomerProfile):
+        self.customer_id = customer_id
+        self.customer = customer
+        self.organization: Optional[Organization] = None
+        self.boats: List[Boat] = []
+        self.leases: List[BerthLease] = []
+        self.orders: List[Order] = []
+
+
+def _clean_fields(instance: models.Model) -> None:
+    """Validate the field values without querying the related objects"""
+    instance.clean_fields(
+        exclude=[field.name for field in instance._meta.fields if field.is_relation]
+    )
+
+
+class CustomerDataImporter:
+    """
+    Bulk importer for the customer data exported from the old Timmi system.
+
+    See CustomerProfileManager.import_customer_data for the shape of the data.
+
+    All the harbors, berths, boat types and the existing leases of the berths are
+    loaded in memory before building the objects, and the objects are inserted
+    with chunked bulk_creates once all the rows have been validated.
+    """
+
+    def __init__(self, data: List[dict], batch_size: int = CUSTOMER_IMPORT_BATCH_SIZE):
+        self.data = data
+        self.batch_size = batch_size
+        self.errors: List[str] = []
+        self.customers: List[ImportedCustomer] = []
+
+        self._harbors: Dict[str, List[str]] = {}
+        self._berths: Dict[BerthKey, List[uuid.UUID]] = {}
+        self._active_berths = set()
+        self._boat_types: Dict[str, List[int]] = {}
+        self._existing_customer_ids = set()
+        # Periods of the active leases of each berth, to check the overlaps in memory
+        self._berth_lease_periods: Dict[uuid.UUID, List[Tuple[date, date]]] = {}
+
+    def _get_referenced_ids(self) -> Tuple[Set[str], Set[uuid.UUID]]:
+        servicemap_ids = set()
+        customer_ids = set()
+        for customer_data in self.data:
+            for lease in customer_data.get("leases", []):
+                servicemap_ids.add(lease.get("harbor_servicemap_id"))
+            for order in customer_data.get("orders", []):
+                if berth_data := order.get("berth"):
+                    servicemap_ids.add(berth_data.get("harbor_servicemap_id"))
+            try:
+                customer_ids.add(uuid.UUID(str(customer_data.get("id"))))
+            except ValueError:
+                pass
+        return servicemap_ids, customer_ids
+
+    def _load_lookups(self) -> None:
+        servicemap_ids, customer_ids = self._get_referenced_ids()
+
+        harbors = defaultdict(list)
+        for harbor_id, servicemap_id in Harbor.objects.filter(
+            servicemap_id__in=servicemap_ids
+        ).values_list("id", "servicemap_id"):
+            harbors[servicemap_id].append(harbor_id)
+        self._harbors = dict(harbors)
+
+        berths = defaultdict(list)
+        for berth_id, is_active, *key in Berth.objects.filter(
+            pier__harbor__servicemap_id__in=servicemap_ids
+        ).values_list(
+            "id",
+            "is_active",
+            "pier__harbor__servicemap_id",
+            "pier__identifier",
+            "number",
+        ):
+            berths[tuple(key)].append(berth_id)
+            if is_active:
+                self._active_berths.add(berth_id)
+        self._berths = dict(berths)
+
+        berth_lease_periods = defaultdict(list)
+        for berth_id, start_date, end_date in BerthLease.objects.filter(
+            berth__pier__harbor__servicemap_id__in=servicemap_ids,
+            status__in=ACTIVE_LEASE_STATUSES,
+        ).values_list("berth_id", "start_date", "end_date"):
+            berth_lease_periods[berth_id].append((start_date, end_date))
+        self._berth_lease_periods = berth_lease_periods
+
+        boat_types = defaultdict(list)
+        for boat_type_id, name in (
+            BoatType.objects.values_list("id", "translations__name")
+            .order_by()
+            .distinct()
+        ):
+            boat_types[name].append(boat_type_id)
+        self._boat_types = dict(boat_types)
+
+        self._existing_customer_ids = set(
+            CustomerProfile.objects.filter(id__in=customer_ids).values_list(
+                "id", flat=True
+            )
+        )
+
+    def _get_berth(
+        self, harbor_servicemap_id: str, berth_number, pier_id: str
+    ) -> Optional[uuid.UUID]:
+        """
+        Find the berth based on the pier identifier and berth number.
+        If no berth (or more than one) is found, returns None.
+        (since we can identify specific berths with number and pier id)
+        """
+        harbors = self._harbors.get(harbor_servicemap_id, [])
+        if len(harbors) != 1:
+            raise Exception(
+                _("Harbor not found: {servicemap_id}").format(
+                    servicemap_id=harbor_servicemap_id
+                )
+            )
+
+        berths = self._berths.get((harbor_servicemap_id, pier_id, str(berth_number)))
+        if not berths or len(berths) != 1:
+            return None
+        return berths[0]
+
+    def _get_boat_type(self, name: str) -> int:
+        boat_types = self._boat_types.get(name, [])
+        if len(boat_types) != 1:
+            raise Exception(_("Boat type not found: {name}").format(name=name))
+        return boat_types[0]
+
+    def _build_lease(
+        self,
+        imported: ImportedCustomer,
+        berth_id: Optional[uuid.UUID],
+        start_date,
+        end_date,
+        boat: Optional[Boat] = None,
+    ) -> Optional[BerthLease]:
+        """
+        Build a paid lease for the berth, applying the same rules as BerthLease.clean.
+        Returns None if the lease could not be created.
+        """
+        if berth_id not in self._active_berths:
+            return None
+
+        try:
+            start_date = BerthLease._meta.get_field("start_date").to_python(start_date)
+            end_date = BerthLease._meta.get_field("end_date").to_python(end_date)
+        except ValidationError:
+            return None
+
+        if (
+            not start_date
+            or not end_date
+            or start_date > end_date
+            or start_date.year != end_date.year
+        ):
+            return None
+
+        pending_periods = [
+            (lease.start_date, lease.end_date)
+            for lease in imported.leases
+            if lease.berth_id == berth_id
+        ]
+        if any(
+            other_start <= end_date and other_end > start_date
+            for other_start, other_end in (
+                self._berth_lease_periods[berth_id] + pending_periods
+            )
+        ):
+            return None
+
+        lease = BerthLease(
+            customer=imported.customer,
+            berth_id=berth_id,
+            boat=boat,
+            start_date=start_date,
+            end_date=end_date,
+            status=LeaseStatus.PAID,
+        )
+        imported.leases.append(lease)
+        return lease
+
+    def _build_customer(self, customer_data: dict) -> ImportedCustomer:
+        if not customer_data.get("id"):
+            raise Exception(_("No customer ID provided"))
+
+        customer = CustomerProfile(
+            id=customer_data.get("id"), comment=customer_data.get("comment") or ""
+        )
+        _clean_fields(customer)
+        if customer.id in self._existing_customer_ids:
+            raise Exception(_("Customer with this ID already exists"))
+
+        imported = ImportedCustomer(customer_data["customer_id"], customer)
+
+        if organization := customer_data.get("organization"):
+            organization_type = OrganizationType(organization.get("type"))
+            imported.organization = Organization(
+                customer=customer,
+                organization_type=organization_type,
+                name=organization.get("name"),
+                address=organization.get("address"),
+                postal_code=organization.get("postal_code"),
+                city=organization.get("city"),
+                business_id=(
+                    "-" if organization_type == OrganizationType.COMPANY else ""
+                ),
+            )
+            imported.organization.full_clean(
+                exclude=["customer"], validate_unique=False, validate_constraints=False
+            )
+
+        for boat_data in customer_data.get("boats", []):
+            boat = Boat(
+                owner=customer,
+                name=boat_data.get("name"),
+                boat_type_id=self._get_boat_type(boat_data.get("boat_type")),
+                registration_number=boat_data.get("registration_number"),
+                width=Decimal(boat_data.get("width")),
+                length=Decimal(boat_data.get("length")),
+                draught=(
+                    Decimal(boat_data.get("draught"))
+                    if boat_data.get("draught")
+                    else None
+                ),
+                weight=(
+                    Decimal(boat_data.get("weight"))
+                    if boat_data.get("weight")
+                    else None
+                ),
+            )
+            boat.strip_text_fields()
+            _clean_fields(boat)
+            imported.boats.append(boat)
+
+        for lease_data in customer_data.get("leases", []):
+            boat_index = lease_data.get("boat_index")
+            self._build_lease(
+                imported,
+                self._get_berth(
+                    lease_data.get("harbor_servicemap_id"),
+                    lease_data.get("berth_number"),
+                    lease_data.get("pier_id", "-"),
+                ),
+                lease_data.get("start_date"),
+                lease_data.get("end_date"),
+                boat=imported.boats[boat_index] if boat_index is not None else None,
+            )
+
+        for order_data in customer_data.get("orders", []):
+            lease = None
+            # Only add leases for paid orders
+            if (berth_data := order_data.get("berth")) and order_data.get(
+                "is_paid", False
+            ):
+                berth_id = self._get_berth(
+                    berth_data.get("harbor_servicemap_id"),
+                    berth_data.get("berth_number"),
+                    berth_data.get("pier_id", "-"),
+                )
+                start_date, end_date = calculate_lease_start_and_end_dates(
+                    parse(order_data.get("created_at")).date()
+                )
+                # Reuse the customer's lease for the same berth and season
+                lease = next(
+                    (
+                        lease
+                        for lease in imported.leases
+                        if lease.berth_id == berth_id
+                        and lease.start_date == start_date
+                        and lease.end_date == end_date
+                    ),
+                    None,
+                ) or self._build_lease(imported, berth_id, start_date, end_date)
+
+            order = Order(
+                customer=customer,
+                lease=lease,
+                status=(
+                    OrderStatus.PAID
+                    if order_data.get("is_paid")
+                    else OrderStatus.EXPIRED
+                ),
+                price=Decimal(order_data.get("order_sum")),
+                tax_percentage=Decimal(order_data.get("vat_percentage")),
+                comment=order_data.get("comment"),
+            )
+            _clean_fields(order)
+            imported.orders.append(order)
+
+        return imported
+
+    def validate(self) -> List[str]:
+        """Build all the objects in memory and return the errors of each row"""
+        self._load_lookups()
+        self.errors = []
+        self.customers = []
+
+        seen_customer_ids = set()
+        for index, customer_data in enumerate(self.data):
+            try:
+                imported = self._build_customer(customer_data)
+                if imported.customer.id in seen_customer_ids:
+                    raise Exception(_("Duplicate customer ID"))
+            except Exception as err:
+                msg = (
+                    "Could not import customer_id: {}, index: {}".format(
+                        customer_data["customer_id"], index
+                    )
+                    if "customer_id" in customer_data
+                    else "Could not import unknown customer, index: {}".format(index)
+                )
+                self.errors.append(f"{msg}\n{err}")
+                continue
+
+            seen_customer_ids.add(imported.customer.id)
+            # Only the leases of the valid rows reserve the berths
+            for lease in imported.leases:
+                self._berth_lease_periods[lease.berth_id].append(
+                    (lease.start_date, lease.end_date)
+                )
+            self.customers.append(imported)
+
+        return self.errors
+
+    def _bulk_create(self, model, objects: list) -> None:
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def run(self, dry_run: bool = False) -> Dict[str, uuid.UUID]:
+        """
+        Validate and import the customers, returns dict where key is the customer_id
+        and value is the UUID of created profile object.
+
+        If any of the rows is not valid, nothing is imported and
+        CustomerImportError listing the errors of each row is raised.
+        """
+        if self.validate():
+            raise CustomerImportError(self.errors)
+
+        if not dry_run:
+            with transaction.atomic():
+                self._bulk_create(
+                    CustomerProfile, [imported.customer for imported in self.customers]
+                )
+                self._bulk_create(
+                    Organization,
+                    [
+                        imported.organization
+                        for imported in self.customers
+                        if imported.organization
+                    ],
+                )
+                for model, attr in (
+                    (Boat, "boats"),
+                    (BerthLease, "leases"),
+                    (Order, "orders"),
+                ):
+                    self._bulk_create(
+                        model,
+                        [
+                            obj
+                            for imported in self.customers
+                            for obj in getattr(imported, attr)
+                        ],
+                    )
+
+            # bulk_create doesn't send the signals invalidating the cached queries
+            bump_public_query_cache_version()
+
+        return {
+            imported.customer_id: imported.customer.pk for imported in self.customers
+        }
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.18 on 2026-10-19 09:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0018_alter_customerprofile_invoicing_type"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="boat",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("registration_number"),
+                    name="gin_trgm_ops",
+                ),
+                name="boat_registration_number_trgm",
+            ),
+        ),
+    ]
@@ -1,23 +1,22 @@
 import uuid
 from decimal import Decimal
 
-from dateutil.parser import parse
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.core.files.storage import FileSystemStorage
 from django.core.validators import MinValueValidator
-from django.db import models, transaction
+from django.db import models
 from django.db.models import Case, UniqueConstraint, Value, When
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from helsinki_gdpr.models import SerializableMixin
 
-from leases.enums import LeaseStatus
 from resources.models import BoatType
-from utils.models import TimeStampedModel, UUIDModel
+from utils.models import SerializableManager, TimeStampedModel, UUIDModel
 
 from .enums import BoatCertificateType, InvoicingType, OrganizationType
-from .utils import calculate_lease_start_and_end_dates
 
 User = get_user_model()
 
@@ -39,8 +38,7 @@ class CustomerProfileManager(models.Manager):
             )
         )
 
-    @transaction.atomic
-    def import_customer_data(self, data):  # noqa: C901
+    def import_customer_data(self, data, dry_run=False):
         """
         Imports list of customers of the following shape:
         {
@@ -92,162 +90,14 @@ class CustomerProfileManager(models.Manager):
         }
 
         And returns dict where key is the customer_id and value is the UUID of created profile object
-        """
-        from leases.models import BerthLease
-        from payments.enums import OrderStatus
-        from payments.models import Order
-        from resources.models import Berth, Harbor
-
-        def _get_berth(harbor_servicemap_id: str, berth_number: str, pier_id: str):
-            """
-            Filter the berths based on the pier identifier and berth number.
-            If no berth is found, an error is raised.
-            (since we can identify specific berths with number and pier id)
-            """
-            return Berth.objects.get(
-                pier__harbor=Harbor.objects.get(servicemap_id=harbor_servicemap_id),
-                number=berth_number,
-                pier__identifier=pier_id,
-            )
 
-        result = {}
-        for index, customer_data in enumerate(data):
-            try:
-                if not customer_data.get("id"):
-                    raise Exception(_("No customer ID provided"))
+        All the rows are validated before importing anything. If any of them is not valid,
+        CustomerImportError listing the errors of each row is raised. With dry_run,
+        the data is only validated.
+        """
+        from .importer import CustomerDataImporter
 
-                customer = self.create(
-                    id=customer_data.get("id"),
-                    comment=customer_data.get("comment"),
-                )
-                customer.refresh_from_db()
-
-                if organization := customer_data.get("organization"):
-                    organization_type = OrganizationType(organization.get("type"))
-                    Organization.objects.create(
-                        customer=customer,
-                        organization_type=organization_type,
-                        name=organization.get("name"),
-                        address=organization.get("address"),
-                        postal_code=organization.get("postal_code"),
-                        city=organization.get("city"),
-                        business_id=(
-                            "-" if organization_type == OrganizationType.COMPANY else ""
-                        ),
-                    )
-
-                boats = []
-                for boat in customer_data.get("boats", []):
-                    boat_type = BoatType.objects.language("fi").get(
-                        translations__name=boat.get("boat_type")
-                    )
-                    boats.append(
-                        Boat.objects.create(
-                            owner=customer,
-                            name=boat.get("name"),
-                            boat_type=boat_type,
-                            registration_number=boat.get("registration_number"),
-                            width=Decimal(boat.get("width")),
-                            length=Decimal(boat.get("length")),
-                            draught=(
-                                Decimal(boat.get("draught"))
-                                if boat.get("draught")
-                                else None
-                            ),
-                            weight=(
-                                Decimal(boat.get("weight"))
-                                if boat.get("weight")
-                                else None
-                            ),
-                        )
-                    )
-
-                for lease in customer_data.get("leases", []):
-                    try:
-                        berth = _get_berth(
-                            lease.get("harbor_servicemap_id"),
-                            lease.get("berth_number"),
-                            lease.get("pier_id", "-"),
-                        )
-
-                        # Only create a lease if the berth exists
-                        BerthLease.objects.create(
-                            customer=customer,
-                            berth=berth,
-                            boat=(
-                                boats[lease.get("boat_index")]
-                                if lease.get("boat_index")
-                                else None
-                            ),
-                            start_date=lease.get("start_date"),
-                            end_date=lease.get("end_date"),
-                            status=LeaseStatus.PAID,
-                        )
-                    except (
-                        Berth.DoesNotExist,
-                        Berth.MultipleObjectsReturned,
-                        # Catch ValidationError to ignore errors creating leases
-                        ValidationError,
-                    ):
-                        pass
-
-                for order in customer_data.get("orders", []):
-                    lease = None
-                    # Only add leases for paid orders
-                    if (berth_data := order.get("berth")) and order.get(
-                        "is_paid", False
-                    ):
-                        try:
-                            berth = _get_berth(
-                                berth_data.get("harbor_servicemap_id"),
-                                berth_data.get("berth_number"),
-                                berth_data.get("pier_id", "-"),
-                            )
-                            start_date, end_date = calculate_lease_start_and_end_dates(
-                                parse(order.get("created_at")).date()
-                            )
-
-                            # Only create a lease if the berth exists
-                            lease, _created = BerthLease.objects.get_or_create(
-                                customer=customer,
-                                berth=berth,
-                                start_date=start_date,
-                                end_date=end_date,
-                                status=LeaseStatus.PAID,
-                            )
-                        except (
-                            Berth.DoesNotExist,
-                            Berth.MultipleObjectsReturned,
-                            # Catch ValidationError to ignore errors creating leases
-                            ValidationError,
-                        ):
-                            pass
-
-                    Order.objects.create(
-                        customer=customer,
-                        lease=lease,
-                        created_at=order.get("created_at"),
-                        status=(
-                            OrderStatus.PAID
-                            if order.get("is_paid")
-                            else OrderStatus.EXPIRED
-                        ),
-                        price=Decimal(order.get("order_sum")),
-                        tax_percentage=Decimal(order.get("vat_percentage")),
-                        comment=order.get("comment"),
-                    )
-                result[customer_data["customer_id"]] = customer.pk
-            except Exception as err:
-                msg = (
-                    "Could not import customer_id: {}, index: {}".format(
-                        customer_data["customer_id"], index
-                    )
-                    if "customer_id" in customer_data
-                    else "Could not import unknown customer, index: {}".format(index)
-                )
-                msg += f"\n{err}"
-                raise Exception(msg) from err
-        return result
+        return CustomerDataImporter(data).run(dry_run=dry_run)
 
 
 class CustomerProfile(TimeStampedModel, SerializableMixin):
@@ -420,10 +270,20 @@ class Boat(TimeStampedModel, UUIDModel, SerializableMixin):
         verbose_name=_("is insured"), null=True, blank=True
     )
 
+    objects = SerializableManager()
+
     class Meta:
         verbose_name = _("boat")
         verbose_name_plural = _("boats")
         ordering = ("owner",)
+        indexes = [
+            # Trigram index for the `icontains` search used by the admin UI,
+            # which Django translates into `UPPER(...) LIKE UPPER(%s)`
+            GinIndex(
+                OpClass(Upper("registration_number"), name="gin_trgm_ops"),
+                name="boat_registration_number_trgm",
+            ),
+        ]
 
     def __str__(self):
         return "{} ({})".format(self.registration_number, self.pk)
@@ -446,7 +306,7 @@ class Boat(TimeStampedModel, UUIDModel, SerializableMixin):
         {"name": "is_insured"},
     )
 
-    def save(self, *args, **kwargs):
+    def strip_text_fields(self):
         fields_to_strip = [
             "registration_number",
             "name",
@@ -459,7 +319,21 @@ class Boat(TimeStampedModel, UUIDModel, SerializableMixin):
             if field_value := getattr(self, field):
                 setattr(self, field, field_value.strip())
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The allocated area of the unmarked winter storage sections only has to
+        # be updated when the dimensions change (see leases.signals)
+        instance._loaded_dimensions = (
+            instance.__dict__.get("width"),
+            instance.__dict__.get("length"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.strip_text_fields()
         super().save(*args, **kwargs)
+        self._loaded_dimensions = (self.width, self.length)
 
 
 def get_boat_media_folder(instance, filename):
@@ -495,6 +369,8 @@ class BoatCertificate(UUIDModel, SerializableMixin):
         verbose_name=_("checked by"), max_length=100, blank=True, null=True
     )
 
+    objects = SerializableManager()
+
     class Meta:
         constraints = [
             UniqueConstraint(
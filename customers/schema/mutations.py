@@ -12,7 +12,7 @@ from users.decorators import (
     change_permission_required,
     delete_permission_required,
 )
-from users.utils import get_berth_customers_group
+from users.utils import get_berth_customers_group, reset_authorization_context
 from utils.relay import from_global_id, get_node_from_global_id
 from utils.schema import update_object
 
@@ -239,6 +239,7 @@ class CreateMyBerthProfileMutation(graphene.ClientIDMutation):
         if not user.groups.exists():
             # customers need to belong to the berth customers group, and no other groups
             user.groups.add(get_berth_customers_group())
+            reset_authorization_context(user)
 
         try:
             return CreateMyBerthProfileMutation(
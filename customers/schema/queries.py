@@ -1,12 +1,18 @@
+import hashlib
+import json
+
 import graphene
 import graphene_django_optimizer as gql_optimizer
-from django.db.models import Case, Count, Q, When
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, F, Func, IntegerField, OuterRef, Q
+from django.db.models.expressions import RawSQL
 from graphene_django.filter import DjangoFilterConnectionField
 
 from applications.enums import ApplicationAreaType
 from applications.models import BerthApplication
 from berth_reservations.exceptions import VenepaikkaGraphQLError
-from customers.models import CustomerProfile
+from customers.models import Boat, CustomerProfile
 from customers.schema.types import (
     CustomerGroupEnum,
     InvoicingTypeEnum,
@@ -14,8 +20,9 @@ from customers.schema.types import (
     ProfileNode,
 )
 from customers.utils import from_global_ids
-from leases.models import BerthLease
+from leases.models import BerthLease, WinterStorageLease
 from leases.schema import LeaseStatusEnum
+from leases.utils import calculate_year_date_range
 from resources.schema import (
     BerthNode,
     HarborNode,
@@ -26,25 +33,61 @@ from resources.schema import (
 from users.decorators import view_permission_required
 
 HELSINKI_PROFILES_FILTERS = ["first_name", "last_name", "email", "address", "sort_by"]
+PROFILE_IDS_CACHE_KEY_PREFIX = "berth_profiles:profile_ids"
+
+
+class ArrayPosition(Func):
+    """Position (1-based) of an element inside an array, NULL when it's missing"""
+
+    function = "array_position"
+    output_field = IntegerField()
+
+
+def _customer_has(model, *args, **kwargs) -> Exists:
+    """
+    Check if the customer has any related object matching the filters.
+
+    Filtering through Exists instead of joining the multi-valued relations
+    avoids multiplying the customer rows (and having to use distinct()),
+    and lets the planner stop on the first matching row.
+    """
+    return Exists(model.objects.filter(*args, customer=OuterRef("pk"), **kwargs))
+
+
+def _customer_has_many(model) -> Exists:
+    """Check if the customer has more than one object of the given model"""
+    other_objects = model.objects.filter(customer=OuterRef("customer")).exclude(
+        pk=OuterRef("pk")
+    )
+    return _customer_has(model, Exists(other_objects))
+
+
+def _customer_has_boat(**kwargs) -> Exists:
+    return Exists(Boat.objects.filter(owner=OuterRef("pk"), **kwargs))
+
+
+def _in_winter_storage_areas(area_ids) -> Q:
+    return Q(place__winter_storage_section__area__id__in=area_ids) | Q(
+        section__area__id__in=area_ids
+    )
 
 
 def _filter_winter_storage_leases(
     marked_winter_storage_areas, marked_winter_storage_places, qs
 ):
     qs = qs.filter(
-        winter_storage_leases__isnull=False,
-        winter_storage_leases__application__area_type=ApplicationAreaType.MARKED,
+        _customer_has(
+            WinterStorageLease, application__area_type=ApplicationAreaType.MARKED
+        )
     )
     if marked_winter_storage_areas:
         marked_winter_storage_area_ids = from_global_ids(
             marked_winter_storage_areas, WinterStorageAreaNode
         )
         qs = qs.filter(
-            Q(
-                winter_storage_leases__place__winter_storage_section__area__id__in=marked_winter_storage_area_ids
-            )
-            | Q(
-                winter_storage_leases__section__area__id__in=marked_winter_storage_area_ids
+            _customer_has(
+                WinterStorageLease,
+                _in_winter_storage_areas(marked_winter_storage_area_ids),
             )
         )
     if marked_winter_storage_places:
@@ -52,45 +95,53 @@ def _filter_winter_storage_leases(
             marked_winter_storage_places, WinterStoragePlaceNode
         )
         qs = qs.filter(
-            winter_storage_leases__place__id__in=marked_winter_storage_place_ids
+            _customer_has(
+                WinterStorageLease, place__id__in=marked_winter_storage_place_ids
+            )
         )
     return qs
 
 
 def _filter_unmarked_winter_storage_leases(qs, unmarked_winter_storage_areas):
     qs = qs.filter(
-        winter_storage_leases__isnull=False,
-        winter_storage_leases__application__area_type=ApplicationAreaType.UNMARKED,
+        _customer_has(
+            WinterStorageLease, application__area_type=ApplicationAreaType.UNMARKED
+        )
     )
     if unmarked_winter_storage_areas:
         unmarked_winter_storage_area_ids = from_global_ids(
             unmarked_winter_storage_areas, WinterStorageAreaNode
         )
         qs = qs.filter(
-            Q(
-                winter_storage_leases__place__winter_storage_section__area__id__in=unmarked_winter_storage_area_ids
-            )
-            | Q(
-                winter_storage_leases__section__area__id__in=unmarked_winter_storage_area_ids
+            _customer_has(
+                WinterStorageLease,
+                _in_winter_storage_areas(unmarked_winter_storage_area_ids),
             )
         )
     return qs
 
 
 def _filter_berth_leases(berths, harbors, piers, qs):
-    qs = qs.filter(berth_leases__isnull=False)
+    qs = qs.filter(_customer_has(BerthLease))
     if harbors:
         harbor_ids = from_global_ids(harbors, HarborNode)
-        qs = qs.filter(berth_leases__berth__pier__harbor_id__in=harbor_ids)
+        qs = qs.filter(_customer_has(BerthLease, berth__pier__harbor_id__in=harbor_ids))
     if piers:
         pier_ids = from_global_ids(piers, PierNode)
-        qs = qs.filter(berth_leases__berth__pier__id__in=pier_ids)
+        qs = qs.filter(_customer_has(BerthLease, berth__pier__id__in=pier_ids))
     if berths:
         berth_ids = from_global_ids(berths, BerthNode)
-        qs = qs.filter(berth_leases__berth_id__in=berth_ids)
+        qs = qs.filter(_customer_has(BerthLease, berth_id__in=berth_ids))
     return qs
 
 
+def _filter_any_lease(qs, **kwargs):
+    return qs.filter(
+        _customer_has(BerthLease, **kwargs)
+        | _customer_has(WinterStorageLease, **kwargs)
+    )
+
+
 def _general_filters(params, qs):
     invoicing_types = params.pop("invoicing_types", [])
     customer_groups = params.pop("customer_groups", [])
@@ -105,33 +156,40 @@ def _general_filters(params, qs):
     if customer_groups:
         qs = qs.filter(customer_group__in=customer_groups)
     if boat_types:
-        qs = qs.filter(boats__boat_type__in=boat_types)
+        qs = qs.filter(_customer_has_boat(boat_type__in=boat_types))
     if lease_count:
-        qs = qs.annotate(
-            sum_leases_count=Count("berth_leases"),
-            winter_storage_leases_count=Count("winter_storage_leases"),
-        ).filter(Q(sum_leases_count__gt=1) | Q(winter_storage_leases_count__gt=1))
-    if boat_registration_number:
-        qs = qs.filter(boats__registration_number__icontains=boat_registration_number)
-    if lease_start:
         qs = qs.filter(
-            Q(berth_leases__start_date__gte=lease_start)
-            | Q(winter_storage_leases__start_date__gte=lease_start)
+            _customer_has_many(BerthLease) | _customer_has_many(WinterStorageLease)
         )
-    if lease_end:
+    if boat_registration_number:
         qs = qs.filter(
-            Q(berth_leases__end_date__lte=lease_end)
-            | Q(winter_storage_leases__end_date__lte=lease_end)
+            _customer_has_boat(registration_number__icontains=boat_registration_number)
         )
+    if lease_start:
+        qs = _filter_any_lease(qs, start_date__gte=lease_start)
+    if lease_end:
+        qs = _filter_any_lease(qs, end_date__lte=lease_end)
     if lease_statuses:
-        qs = qs.filter(
-            Q(berth_leases__status__in=lease_statuses)
-            | Q(winter_storage_leases__status__in=lease_statuses)
-        )
+        qs = _filter_any_lease(qs, status__in=lease_statuses)
     return qs
 
 
+def _get_profile_ids_cache_key(params: dict, profile_token: str) -> str:
+    # The token is part of the key since the results depend on the permissions
+    # of the token owner, but it's hashed so it never ends up in the cache backend
+    raw_key = json.dumps([params, profile_token], sort_keys=True)
+    digest = hashlib.sha256(raw_key.encode()).hexdigest()
+    return f"{PROFILE_IDS_CACHE_KEY_PREFIX}:{digest}"
+
+
 def _get_ids_from_profile_service(kwargs: dict, profile_token: str):
+    """
+    Fetch the ordered ids of the profiles matching the Helsinki Profile filters.
+
+    Crawling all the pages from the Profile service is slow, and paginating the
+    customer list would do it again for every page, so the result is cached
+    per filters and token for PROFILE_IDS_CACHE_TIMEOUT seconds.
+    """
     from customers.services import ProfileService
     from customers.services.profile import BATCH_SIZE
 
@@ -144,12 +202,19 @@ def _get_ids_from_profile_service(kwargs: dict, profile_token: str):
         "first": BATCH_SIZE,  # fixed limit for recusrively fetch all -feature
     }
 
+    cache_key = _get_profile_ids_cache_key(params, profile_token)
+    profile_ids = cache.get(cache_key)
+    if profile_ids is not None:
+        return profile_ids
+
     profile_service = ProfileService(profile_token=profile_token)
 
     users = profile_service.find_profile(
         **params, force_only_one=False, recursively_fetch_all=True, ids_only=True
     )
-    return [user.id for user in users]
+    profile_ids = [user.id for user in users]
+    cache.set(cache_key, profile_ids, settings.PROFILE_IDS_CACHE_TIMEOUT)
+    return profile_ids
 
 
 class Query:
@@ -233,12 +298,19 @@ class Query:
                     "Cannot filter by Helsinki Profile fields without API Token"
                 )
             profile_ids = _get_ids_from_profile_service(kwargs, profile_token)
-            profile_preserved = Case(
-                *[When(pk=pk, then=pos) for pos, pk in enumerate(profile_ids)]
-            )
-            # New query of CustomerProfiles, filtered and ordered by ids from the profile query
-            qs = CustomerProfile.objects.filter(id__in=profile_ids).order_by(
-                profile_preserved
+            # The ids are sent as a single array parameter, unnested for the filter and
+            # used to preserve the order returned by the profile service, so the relay
+            # cursors page consistently over the cached result
+            qs = (
+                CustomerProfile.objects.filter(
+                    id__in=RawSQL("SELECT unnest(%s::uuid[])", (profile_ids,))
+                )
+                .annotate(
+                    profile_position=ArrayPosition(
+                        RawSQL("%s::uuid[]", (profile_ids,)), F("id")
+                    )
+                )
+                .order_by("profile_position")
             )
         # General filters
         qs = _general_filters(kwargs, qs)
@@ -256,16 +328,26 @@ class Query:
                 qs, unmarked_winter_storage_areas
             )
         if sticker_number:
-            qs = qs.filter(winter_storage_leases__sticker_number=sticker_number)
+            qs = qs.filter(
+                _customer_has(WinterStorageLease, sticker_number=sticker_number)
+            )
         if sticker_season:
             # Support both the official format of YYYY/YYYY but also just the start year
             if len(sticker_season.split("/")) > 1:
                 start, end = sticker_season.split("/")
                 qs = qs.filter(
-                    winter_storage_leases__start_date__year=start,
-                    winter_storage_leases__end_date__year=end,
+                    _customer_has(
+                        WinterStorageLease,
+                        start_date__range=calculate_year_date_range(start),
+                        end_date__range=calculate_year_date_range(end),
+                    )
                 )
             else:
-                qs = qs.filter(winter_storage_leases__start_date__year=sticker_season)
+                qs = qs.filter(
+                    _customer_has(
+                        WinterStorageLease,
+                        start_date__range=calculate_year_date_range(sticker_season),
+                    )
+                )
 
         return gql_optimizer.query(qs, info)
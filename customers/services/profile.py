@@ -1,9 +1,11 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Union
 from uuid import UUID
 
 import requests
+from django.conf import settings
 from django.db import transaction
 from requests.adapters import HTTPAdapter, Retry
 
@@ -17,6 +19,35 @@ from utils.relay import from_global_id, to_global_id
 PROFILE_API_URL = "PROFILE_API_URL"
 BATCH_SIZE = 100
 
+PROFILES_QUERY = """
+    query GetProfiles {{
+        profiles(serviceType: BERTH, first: {first}, after: "{after}", id: {ids}) {{
+            pageInfo {{
+                endCursor
+                hasNextPage
+            }}
+            edges {{
+                node {{
+                    id
+                    first_name: firstName
+                    last_name: lastName
+                    primary_email: primaryEmail {{
+                        email
+                    }}
+                    primary_phone: primaryPhone {{
+                        phone
+                    }}
+                    primary_address: primaryAddress {{
+                        address
+                        postal_code: postalCode
+                        city
+                    }}
+                }}
+            }}
+        }}
+    }}
+"""
+
 
 @dataclass
 class HelsinkiProfileUser:
@@ -50,35 +81,6 @@ class ProfileService:
     def get_all_profiles(
         self, profile_ids: List[Union[str, UUID]] = None
     ) -> Dict[UUID, HelsinkiProfileUser]:
-        query = """
-            query GetProfiles {{
-                profiles(serviceType: BERTH, first: {first}, after: "{after}", id: {ids}) {{
-                    pageInfo {{
-                        endCursor
-                        hasNextPage
-                    }}
-                    edges {{
-                        node {{
-                            id
-                            first_name: firstName
-                            last_name: lastName
-                            primary_email: primaryEmail {{
-                                email
-                            }}
-                            primary_phone: primaryPhone {{
-                                phone
-                            }}
-                            primary_address: primaryAddress {{
-                                address
-                                postal_code: postalCode
-                                city
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        """
-
         def _exec_query(after="", ids: List[Union[str, UUID]] = None):
             if ids is not None:
                 # json.dumps forces the converted strings to use double quotes
@@ -91,7 +93,9 @@ class ProfileService:
                 ids = []
                 first = BATCH_SIZE
 
-            parsed_query = query.format(first=first, after=after, ids=json.dumps(ids))
+            parsed_query = PROFILES_QUERY.format(
+                first=first, after=after, ids=json.dumps(ids)
+            )
             response = self.query(parsed_query)
             response_edges = response.get("profiles", {}).get("edges", [])
 
@@ -136,6 +140,37 @@ class ProfileService:
 
         return users
 
+    def get_profiles(
+        self, profile_ids: List[Union[str, UUID]], max_workers: int = None
+    ) -> Dict[UUID, HelsinkiProfileUser]:
+        """
+        Fetch the given profiles with concurrent requests of BATCH_SIZE profiles.
+
+        Unlike get_all_profiles, the errors are not ignored: the first failed request
+        raises its error, so the caller never gets a partial result.
+        """
+        ids = [str(profile_id) for profile_id in profile_ids if profile_id is not None]
+        batches = [ids[x : x + BATCH_SIZE] for x in range(0, len(ids), BATCH_SIZE)]
+
+        def _exec_query(batch_ids: List[str]) -> List[dict]:
+            parsed_query = PROFILES_QUERY.format(
+                first=len(batch_ids), after="", ids=json.dumps(batch_ids)
+            )
+            return self.query(parsed_query).get("profiles", {}).get("edges", [])
+
+        users = {}
+        if not batches:
+            return users
+
+        max_workers = max_workers or settings.PROFILE_API_MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            for edges in executor.map(_exec_query, batches):
+                for edge in edges:
+                    user = self.parse_user_edge(edge)
+                    users[user.id] = user
+
+        return users
+
     def get_profile(self, id: UUID) -> HelsinkiProfileUser:
         from ..schema import ProfileNode
 
@@ -1,3 +1,6 @@
+from datetime import date
+from decimal import Decimal
+
 import pytest
 from django_ilmoitin.models import NotificationTemplate
 from faker import Faker
@@ -7,11 +10,22 @@ from berth_reservations.tests.conftest import *  # noqa
 from berth_reservations.tests.factories import CustomerProfileFactory
 from berth_reservations.tests.utils import MockJsonResponse
 from customers.schema import ProfileNode
+from leases.enums import LeaseStatus
+from leases.models import BerthLease, WinterStorageLease
 from payments.notifications import NotificationType
+from resources.models import Berth, WinterStoragePlace
 from resources.tests.conftest import berth, boat_type  # noqa
+from resources.tests.factories import (
+    BerthTypeFactory,
+    BoatTypeFactory,
+    PierFactory,
+    WinterStoragePlaceTypeFactory,
+    WinterStorageSectionFactory,
+)
 from users.tests.conftest import user  # noqa
 from utils.relay import to_global_id
 
+from ..models import Boat, CustomerProfile
 from .factories import BoatCertificateFactory, BoatFactory, OrganizationFactory
 
 MOCK_HKI_PROFILE_ADDRESS: dict = {
@@ -111,3 +125,85 @@ def notification_template_sms_invoice_notice():
         body_html="Remember to pay your invoice {{ product_name }} by {{ order.due_date }}",
         body_text="Remember to pay your invoice {{ product_name }} by {{ order.due_date }}",
     )
+
+
+CUSTOMER_SEARCH_DATASET_SIZE = 1000
+CUSTOMER_SEARCH_SEASONS = (2019, 2020, 2021)
+
+
+@pytest.fixture
+def customer_search_dataset():
+    """
+    Customers with several seasons of berth and winter storage leases and boats,
+    resembling the volumes the admin customer search runs against.
+
+    The rows are bulk created (skipping the model validations) to keep the fixture fast.
+    """
+    piers = PierFactory.create_batch(4)
+    berth_type = BerthTypeFactory()
+    berths = Berth.objects.bulk_create(
+        [
+            Berth(pier=pier, number=str(number), berth_type=berth_type)
+            for pier in piers
+            for number in range(1, 51)
+        ]
+    )
+    sections = WinterStorageSectionFactory.create_batch(2)
+    place_type = WinterStoragePlaceTypeFactory()
+    places = WinterStoragePlace.objects.bulk_create(
+        [
+            WinterStoragePlace(
+                winter_storage_section=section, number=number, place_type=place_type
+            )
+            for section in sections
+            for number in range(1, 51)
+        ]
+    )
+    boat_types = BoatTypeFactory.create_batch(3)
+
+    customers = CustomerProfile.objects.bulk_create(
+        [CustomerProfile() for _i in range(CUSTOMER_SEARCH_DATASET_SIZE)]
+    )
+    boats = Boat.objects.bulk_create(
+        [
+            Boat(
+                owner=customer,
+                boat_type=boat_types[index % len(boat_types)],
+                registration_number=f"{index:05d}{suffix}",
+                length=Decimal("6.00"),
+                width=Decimal("2.50"),
+            )
+            for index, customer in enumerate(customers)
+            for suffix in ("A", "B")
+        ]
+    )
+    BerthLease.objects.bulk_create(
+        [
+            BerthLease(
+                customer=customer,
+                boat=boats[index * 2],
+                berth=berths[index % len(berths)],
+                status=LeaseStatus.PAID,
+                start_date=date(year, 6, 10),
+                end_date=date(year, 9, 14),
+            )
+            for index, customer in enumerate(customers)
+            for year in CUSTOMER_SEARCH_SEASONS
+        ]
+    )
+    WinterStorageLease.objects.bulk_create(
+        [
+            WinterStorageLease(
+                customer=customer,
+                boat=boats[index * 2 + 1],
+                place=places[index % len(places)],
+                status=LeaseStatus.PAID,
+                start_date=date(year, 9, 15),
+                end_date=date(year + 1, 5, 10),
+            )
+            for index, customer in enumerate(customers)
+            for year in CUSTOMER_SEARCH_SEASONS
+            if index % 2 == 0
+        ]
+    )
+    return {"customers": customers, "piers": piers, "sections": sections}
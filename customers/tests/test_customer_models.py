@@ -2,7 +2,7 @@ import os
 import random
 from decimal import Decimal
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import pytest
 from django.core.exceptions import ValidationError
@@ -16,6 +16,7 @@ from leases.models import BerthLease
 from resources.tests.factories import BerthFactory, BoatTypeFactory, PierFactory
 
 from ..enums import BoatCertificateType, OrganizationType
+from ..importer import CustomerImportError
 from ..models import BoatCertificate, CustomerProfile, Organization
 from .factories import BoatCertificateFactory, OrganizationFactory
 
@@ -366,3 +367,101 @@ def test_import_customer_data_order_many_piers_no_berth_found(berth, boat_type):
 
     assert CustomerProfile.objects.count() == 1
     assert BerthLease.objects.count() == 0
+
+
+def _get_customer_import_data(berth, boat_type, customer_id="313432", **kwargs):
+    return {
+        "customer_id": customer_id,
+        "leases": [
+            {
+                "harbor_servicemap_id": berth.pier.harbor.servicemap_id,
+                "pier_id": berth.pier.identifier,
+                "berth_number": berth.number,
+                "start_date": "2019-06-10",
+                "end_date": "2019-09-14",
+                "boat_index": 0,
+            }
+        ],
+        "boats": [
+            {
+                "boat_type": boat_type.name,
+                "name": " My Boaty ",
+                "registration_number": "",
+                "width": "1.40",
+                "length": "3.30",
+                "draught": None,
+                "weight": 500,
+            }
+        ],
+        "orders": [],
+        "comment": "",
+        "id": str(uuid4()),
+        **kwargs,
+    }
+
+
+def test_import_customer_data_bulk_creates_objects(berth, boat_type):
+    data = [_get_customer_import_data(berth, boat_type)]
+
+    result = CustomerProfile.objects.import_customer_data(data)
+
+    customer = CustomerProfile.objects.get(id=data[0]["id"])
+    assert result == {"313432": customer.id}
+    boat = customer.boats.get()
+    assert boat.name == "My Boaty"
+    assert boat.weight == 500
+    lease = customer.berth_leases.get()
+    assert lease.berth == berth
+    assert lease.boat == boat
+    assert lease.status == LeaseStatus.PAID
+
+
+def test_import_customer_data_dry_run(berth, boat_type):
+    data = [_get_customer_import_data(berth, boat_type)]
+
+    result = CustomerProfile.objects.import_customer_data(data, dry_run=True)
+
+    assert result == {"313432": UUID(data[0]["id"])}
+    assert CustomerProfile.objects.count() == 0
+    assert BerthLease.objects.count() == 0
+
+
+def test_import_customer_data_reports_all_row_errors(berth, boat_type):
+    data = [
+        _get_customer_import_data(berth, boat_type, customer_id="1", id=None),
+        _get_customer_import_data(berth, boat_type, customer_id="2"),
+        _get_customer_import_data(berth, boat_type, customer_id="3"),
+    ]
+    data[2]["boats"][0]["boat_type"] = "Unknown boat type"
+
+    with pytest.raises(CustomerImportError) as e:
+        CustomerProfile.objects.import_customer_data(data)
+
+    assert len(e.value.errors) == 2
+    assert "customer_id: 1, index: 0" in e.value.errors[0]
+    assert "No customer ID provided" in e.value.errors[0]
+    assert "customer_id: 3, index: 2" in e.value.errors[1]
+    assert CustomerProfile.objects.count() == 0
+
+
+def test_import_customer_data_existing_customer_id(berth, boat_type, customer_profile):
+    data = [
+        _get_customer_import_data(berth, boat_type, id=str(customer_profile.id)),
+    ]
+
+    with pytest.raises(CustomerImportError) as e:
+        CustomerProfile.objects.import_customer_data(data)
+
+    assert "Customer with this ID already exists" in str(e.value)
+
+
+def test_import_customer_data_berth_already_leased(berth, boat_type):
+    data = [
+        _get_customer_import_data(berth, boat_type, customer_id="1"),
+        _get_customer_import_data(berth, boat_type, customer_id="2"),
+    ]
+
+    result = CustomerProfile.objects.import_customer_data(data)
+
+    assert len(result) == 2
+    assert BerthLease.objects.get().customer_id == UUID(data[0]["id"])
@@ -1563,3 +1563,74 @@ def test_filter_by_hki_profile_order_by(mock_find_profile, names, superuser_api_
             edge["node"] for edge in executed["data"]["berthProfiles"]["edges"]
         ]
     ]
+
+
+@patch("customers.services.profile.ProfileService.find_profile")
+def test_filter_by_hki_profile_ids_are_cached(mock_find_profile, superuser_api_client):
+    profiles = [CustomerProfileFactory() for _i in range(3)]
+    mock_find_profile.return_value = [
+        HelsinkiProfileUser(profile.id, last_name="Last Name") for profile in profiles
+    ]
+    query = """
+        {
+            berthProfiles(lastName: "Last Name", apiToken: "%s", first: %d) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    executed = superuser_api_client.execute(query % ("Sample token", 2))
+    assert len(executed["data"]["berthProfiles"]["edges"]) == 2
+    executed = superuser_api_client.execute(query % ("Sample token", 3))
+    assert [
+        edge["node"]["id"] for edge in executed["data"]["berthProfiles"]["edges"]
+    ] == [to_global_id(ProfileNode, profile.id) for profile in profiles]
+    # Paginating over the same filters reuses the ids from the first query
+    assert mock_find_profile.call_count == 1
+
+    # Another token might not see the same profiles
+    superuser_api_client.execute(query % ("Another token", 3))
+    assert mock_find_profile.call_count == 2
+
+
+def test_filter_berth_profiles_through_leases_and_boats(
+    superuser_api_client, customer_search_dataset, django_assert_max_num_queries
+):
+    pier = customer_search_dataset["piers"][0]
+    query = """
+        {
+            berthProfiles(
+                first: 50
+                piers: ["%s"]
+                leaseStatuses: [PAID]
+                leaseStart: "2019-01-01"
+                leaseCount: true
+                boatRegistrationNumber: "1a"
+            ) {
+                count
+                totalCount
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """ % to_global_id(
+        PierNode, pier.id
+    )
+
+    with django_assert_max_num_queries(10):
+        executed = superuser_api_client.execute(query)
+
+    assert "errors" not in executed
+    ids = [edge["node"]["id"] for edge in executed["data"]["berthProfiles"]["edges"]]
+    # Filtering through the leases and boats should not multiply the customers
+    assert len(ids) == len(set(ids))
+    # A quarter of the customers lease a berth on the first pier, and a tenth
+    # of them have a boat with a registration number ending with "1A"
+    assert executed["data"]["berthProfiles"]["count"] == 25
@@ -3,7 +3,9 @@ import json
 from unittest import TestCase
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from helusers.settings import api_token_auth_settings
 from jose import jwt
@@ -11,16 +13,29 @@ from jose import jwt
 from applications.enums import ApplicationStatus, WinterStorageMethod
 from applications.tests.factories import (
     BerthApplicationFactory,
+    BerthSwitchFactory,
+    HarborChoiceFactory,
+    WinterAreaChoiceFactory,
     WinterStorageApplicationFactory,
 )
 from berth_reservations.tests.factories import CustomerProfileFactory
 from customers.enums import InvoicingType
+from customers.gdpr import get_customer_profile_for_gdpr
 from customers.models import CustomerProfile
-from customers.tests.factories import BoatFactory, OrganizationFactory
+from customers.tests.factories import (
+    BoatCertificateFactory,
+    BoatFactory,
+    OrganizationFactory,
+)
 from leases.enums import LeaseStatus
 from leases.tests.factories import BerthLeaseFactory, WinterStorageLeaseFactory
 from payments.enums import OfferStatus, OrderStatus
-from payments.tests.factories import BerthSwitchOfferFactory, OrderFactory
+from payments.tests.factories import (
+    BerthSwitchOfferFactory,
+    OrderFactory,
+    OrderLineFactory,
+    OrderLogEntryFactory,
+)
 
 from .keys import rsa_key
 
@@ -709,3 +724,55 @@ def test_delete_profile_with_lease(rest_api_client, requests_mock, settings):
     assert response.status_code == 403
     assert CustomerProfile.objects.count() == 1
     assert User.objects.count() == 1
+
+
+def _create_customer_data(customer_profile, count):
+    for _i in range(count):
+        boat = BoatFactory(owner=customer_profile)
+        BoatCertificateFactory(boat=boat)
+
+        berth_application = BerthApplicationFactory(
+            customer=customer_profile,
+            boat=boat,
+            berth_switch=BerthSwitchFactory(),
+        )
+        HarborChoiceFactory(application=berth_application, priority=1)
+        berth_lease = BerthLeaseFactory(
+            customer=customer_profile, boat=boat, status=LeaseStatus.PAID
+        )
+        order = OrderFactory(lease=berth_lease)
+        OrderLineFactory(order=order)
+        OrderLogEntryFactory(order=order)
+        BerthSwitchOfferFactory(customer=customer_profile, lease=berth_lease)
+
+        winter_storage_application = WinterStorageApplicationFactory(
+            customer=customer_profile, boat=boat
+        )
+        WinterAreaChoiceFactory(application=winter_storage_application, priority=1)
+        winter_storage_lease = WinterStorageLeaseFactory(
+            customer=customer_profile, boat=boat
+        )
+        OrderFactory(lease=winter_storage_lease)
+
+
+def test_gdpr_serialization_query_count(django_assert_num_queries):
+    customer_profile = CustomerProfileFactory()
+    OrganizationFactory(customer=customer_profile)
+    _create_customer_data(customer_profile, 1)
+    heavy_customer_profile = CustomerProfileFactory()
+    OrganizationFactory(customer=heavy_customer_profile)
+    _create_customer_data(heavy_customer_profile, 5)
+
+    with CaptureQueriesContext(connection) as context:
+        get_customer_profile_for_gdpr(CustomerProfile, customer_profile.id).serialize()
+
+    # The number of queries doesn't depend on the amount of data of the customer
+    with django_assert_num_queries(len(context.captured_queries)):
+        heavy_data = get_customer_profile_for_gdpr(
+            CustomerProfile, heavy_customer_profile.id
+        ).serialize()
+
+    # The prefetched data is serialized the same way as without prefetching
+    assert heavy_data == (
+        CustomerProfile.objects.get(id=heavy_customer_profile.id).serialize()
+    )
@@ -1,6 +1,8 @@
 from unittest import mock
 from uuid import UUID, uuid4
 
+import pytest
+import requests
 from faker import Faker
 from requests import Session
 
@@ -55,6 +57,29 @@ def test_get_all_profiles_id_list():
         assert user_profile.phone is not None
 
 
+def test_get_profiles_in_batches():
+    profiles = [get_customer_profile_dict() for _i in range(0, 3)]
+    profile_ids = [UUID(from_global_id(profile["id"])) for profile in profiles]
+
+    with mock.patch("customers.services.profile.BATCH_SIZE", 2), mock.patch.object(
+        Session,
+        "post",
+        side_effect=mocked_response_profile(data=profiles, count=0),
+    ) as mock_post:
+        users = ProfileService(profile_token="token").get_profiles(profile_ids)
+
+    assert mock_post.call_count == 2
+    assert set(users.keys()) == set(profile_ids)
+
+
+def test_get_profiles_raises_network_errors():
+    with mock.patch.object(
+        Session, "post", side_effect=requests.exceptions.ConnectionError()
+    ):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            ProfileService(profile_token="token").get_profiles([uuid4()])
+
+
 def test_get_profile(customer_profile, user, hki_profile_address):
     faker = Faker()
     phone = faker.phone_number()
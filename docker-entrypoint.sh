@@ -16,6 +16,7 @@ fi
 if [[ "$APPLY_MIGRATIONS" = "1" ]]; then
     echo "Applying database migrations..."
     python ./manage.py migrate --noinput
+    python ./manage.py update_winter_storage_counters
 fi
 
 # Check that there are no pending migrations to generate
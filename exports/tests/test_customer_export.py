@@ -3,6 +3,7 @@ import io
 from unittest.mock import patch
 
 import pytest
+import requests
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
@@ -39,10 +40,10 @@ def get_mock_data_for_profiles(profiles):
     return users
 
 
-@patch("customers.services.profile.ProfileService.get_all_profiles")
+@patch("customers.services.profile.ProfileService.get_profiles")
 @pytest.mark.parametrize("has_permission", [True, False])
 def test_admin_credentials_are_required(
-    mock_get_all_profiles, user_api_client, has_permission
+    mock_get_profiles, user_api_client, has_permission
 ):
     if has_permission:
         permission = Permission.objects.get(
@@ -51,7 +52,7 @@ def test_admin_credentials_are_required(
         )
         user_api_client.user.user_permissions.add(permission)
     profile = CustomerProfileFactory()
-    mock_get_all_profiles.return_value = get_mock_data_for_profiles([profile])
+    mock_get_profiles.return_value = get_mock_data_for_profiles([profile])
     ids = CustomerProfile.objects.all().values_list("id", flat=True)
     global_ids = to_global_ids(ids, ProfileNode)
 
@@ -65,13 +66,13 @@ def test_admin_credentials_are_required(
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-@patch("customers.services.profile.ProfileService.get_all_profiles")
+@patch("customers.services.profile.ProfileService.get_profiles")
 def test_amount_of_queries(
-    mock_get_all_profiles, superuser_api_client, django_assert_max_num_queries
+    mock_get_profiles, superuser_api_client, django_assert_max_num_queries
 ):
     c1, c2, c3, c4 = CustomerProfileFactory.create_batch(4)
     c5, c6, c7, c8 = CustomerProfileFactory.create_batch(4, user=None)
-    mock_get_all_profiles.return_value = get_mock_data_for_profiles([c1, c2, c5, c6])
+    mock_get_profiles.return_value = get_mock_data_for_profiles([c1, c2, c5, c6])
     ids = CustomerProfile.objects.all().values_list("id", flat=True)
     global_ids = to_global_ids(ids, ProfileNode)
 
@@ -83,10 +84,10 @@ def test_amount_of_queries(
     assert response.status_code == status.HTTP_200_OK
 
 
-@patch("customers.services.profile.ProfileService.get_all_profiles")
-def test_export_view_produces_an_excel(mock_get_all_profiles, superuser_api_client):
+@patch("customers.services.profile.ProfileService.get_profiles")
+def test_export_view_produces_an_excel(mock_get_profiles, superuser_api_client):
     CustomerProfileFactory.create_batch(2)
-    mock_get_all_profiles.return_value = get_mock_data_for_profiles(
+    mock_get_profiles.return_value = get_mock_data_for_profiles(
         CustomerProfile.objects.all()
     )
     ids = CustomerProfile.objects.all().values_list("id", flat=True)
@@ -107,8 +108,8 @@ def test_export_view_produces_an_excel(mock_get_all_profiles, superuser_api_clie
 
 
 @freeze_time("2022-01-01T10:00:00+02:00")
-@patch("customers.services.profile.ProfileService.get_all_profiles")
-def test_customer_excel_fields(mock_get_all_profiles):
+@patch("customers.services.profile.ProfileService.get_profiles")
+def test_customer_excel_fields(mock_get_profiles):
 
     with freeze_time("2020-01-01T10:00:00+02:00") as frozen_datetime:
         profile_1 = CustomerProfileFactory()
@@ -117,7 +118,7 @@ def test_customer_excel_fields(mock_get_all_profiles):
         frozen_datetime.tick()
         CustomerProfileFactory(user=None)
 
-    mock_get_all_profiles.return_value = get_mock_data_for_profiles([profile_1])
+    mock_get_profiles.return_value = get_mock_data_for_profiles([profile_1])
 
     expected_datetime_format = "YYYY-MM-DD HH:MM:SS"
     exporter = CustomerXlsx(
@@ -158,3 +159,67 @@ def test_customer_excel_fields(mock_get_all_profiles):
     assert xl_sheet.cell(4, 14).value == "Local"
 
     assert exporter.filename == "customers-2022-01-01_10-00-00"
+
+
+@patch("customers.services.profile.ProfileService.get_profiles")
+def test_customer_export_fetches_profiles_in_chunks(mock_get_profiles):
+    profiles = CustomerProfileFactory.create_batch(5)
+    mock_get_profiles.side_effect = lambda ids: get_mock_data_for_profiles(
+        [profile for profile in profiles if profile.id in ids]
+    )
+    progress = []
+
+    exporter = CustomerXlsx(
+        CustomerProfile.objects.all().order_by("created_at"),
+        profile_token="token",
+        progress_callback=progress.append,
+    )
+    exporter.chunk_size = 2
+    xlsx_bytes = exporter.serialize()
+
+    assert [len(call.args[0]) for call in mock_get_profiles.call_args_list] == [
+        2,
+        2,
+        1,
+    ]
+    assert progress == [2, 4, 5]
+    assert exporter.helsinki_profile_values == {}
+
+    xl_sheet = load_workbook(filename=io.BytesIO(xlsx_bytes), read_only=True)[
+        "Customers"
+    ]
+    for row_number in range(2, 7):
+        assert xl_sheet.cell(row_number, 14).value == "Helsinki profile"
+
+
+@patch("customers.services.profile.ProfileService.get_profiles")
+def test_customer_export_retries_failed_profile_chunk(mock_get_profiles):
+    profile = CustomerProfileFactory()
+    mock_get_profiles.side_effect = [
+        requests.exceptions.ConnectionError(),
+        get_mock_data_for_profiles([profile]),
+    ]
+
+    exporter = CustomerXlsx(CustomerProfile.objects.all(), profile_token="token")
+    exporter.profile_fetch_backoff = 0
+    xlsx_bytes = exporter.serialize()
+
+    assert mock_get_profiles.call_count == 2
+    xl_sheet = load_workbook(filename=io.BytesIO(xlsx_bytes), read_only=True)[
+        "Customers"
+    ]
+    assert xl_sheet.cell(2, 14).value == "Helsinki profile"
+
+
+@patch("customers.services.profile.ProfileService.get_profiles")
+def test_customer_export_fails_when_profiles_cannot_be_fetched(mock_get_profiles):
+    CustomerProfileFactory()
+    mock_get_profiles.side_effect = requests.exceptions.ConnectionError()
+
+    exporter = CustomerXlsx(CustomerProfile.objects.all(), profile_token="token")
+    exporter.profile_fetch_backoff = 0
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        exporter.serialize()
+
+    assert mock_get_profiles.call_count == exporter.profile_fetch_attempts
@@ -5,6 +5,8 @@ from graphql_relay import from_global_id
 from rest_framework import serializers
 
 from applications.models import HarborChoice, WinterStorageAreaChoice
+from berth_reservations.translated_names import translated_names
+from resources.models import Harbor, WinterStorageArea
 
 
 def from_global_ids(global_ids: [str], node_type: Type[DjangoObjectType]) -> [str]:
@@ -39,10 +41,13 @@ def parse_choices_to_multiline_string(choices):
     choices_str = ""
     for choice in choices:
         if isinstance(choice, HarborChoice):
-            single_choice_line = "{}: {}".format(choice.priority, choice.harbor.name)
+            single_choice_line = "{}: {}".format(
+                choice.priority, translated_names.get(Harbor, choice.harbor_id)
+            )
         elif isinstance(choice, WinterStorageAreaChoice):
             single_choice_line = "{}: {}".format(
-                choice.priority, choice.winter_storage_area.name
+                choice.priority,
+                translated_names.get(WinterStorageArea, choice.winter_storage_area_id),
             )
         else:
             single_choice_line = ""
@@ -68,7 +73,7 @@ def parse_berth_switch_str(berth_switch):
     """
 
     berth_switch_str = "{} ({}): {}".format(
-        berth_switch.berth.pier.harbor.name,
+        translated_names.get(Harbor, berth_switch.berth.pier.harbor_id),
         berth_switch.berth.pier.identifier,
         berth_switch.berth.number,
     )
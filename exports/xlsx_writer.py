@@ -1,5 +1,10 @@
 import io
+import logging
+import time
+from itertools import islice
+from typing import Callable, Iterator
 
+import requests
 from django.db.models import Prefetch, QuerySet
 from django.utils import timezone
 from django.utils.timezone import localtime
@@ -9,14 +14,20 @@ from xlsxwriter import Workbook
 from applications.enums import WinterStorageMethod
 from applications.models import (
     BerthApplication,
+    BerthSwitchReason,
     HarborChoice,
     WinterStorageApplication,
     WinterStorageAreaChoice,
 )
+from berth_reservations.translated_names import translated_names
 from customers.enums import InvoicingType
+from customers.exceptions import ProfileServiceException
 from customers.models import CustomerProfile
 from customers.services import ProfileService
 from exports.utils import parse_berth_switch_str, parse_choices_to_multiline_string
+from resources.models import BoatType
+
+logger = logging.getLogger(__name__)
 
 
 class BaseExportXlsxWriter:
@@ -61,7 +72,7 @@ class BaseExportXlsxWriter:
             for index, (field_name, verbose_name, width) in enumerate(self.fields)
         ]
 
-        for row_index, item in enumerate(self.queryset, self.content_start_index):
+        for row_index, item in enumerate(self.iter_items(), self.content_start_index):
             for col_index, field_name in column_index:
                 value = self.get_value(field_name, item)
                 if field_name in self.wrapped_fields:
@@ -69,6 +80,10 @@ class BaseExportXlsxWriter:
                 else:
                     sheet.write(row_index, col_index, value)
 
+    def iter_items(self) -> Iterator:
+        """Iterate the items to be written on the rows"""
+        return iter(self.queryset)
+
     def get_value(self, field_name, item):
         """Get value for a specific field in Excel."""
         raise NotImplementedError
@@ -119,7 +134,6 @@ class CustomerXlsx(BaseExportXlsxWriter):
         ("user_source", _("user source"), 19),
     )
 
-    helsinki_profile_values = {}
     helsinki_profile_field = {
         "first_name",
         "last_name",
@@ -130,17 +144,58 @@ class CustomerXlsx(BaseExportXlsxWriter):
         "city",
     }
 
-    def __init__(self, queryset, profile_token: str = None, **kwargs):
+    # The customers are written in chunks: the profiles of a chunk are fetched,
+    # its rows written and the profiles released before moving to the next one
+    chunk_size = 500
+    profile_fetch_attempts = 3
+    profile_fetch_backoff = 2  # seconds, doubled after each failed attempt
+
+    def __init__(
+        self,
+        queryset,
+        profile_token: str = None,
+        progress_callback: Callable[[int], None] = None,
+        **kwargs,
+    ):
         super().__init__(queryset, **kwargs)
         self.profile_service = ProfileService(profile_token) if profile_token else None
-
-    def serialize(self):
-        if self.profile_service:
-            profile_ids = self.queryset.values_list("id", flat=True)
-            self.helsinki_profile_values = self.profile_service.get_all_profiles(
-                profile_ids
-            )
-        return super().serialize()
+        self.progress_callback = progress_callback
+        # The Helsinki profiles of the current chunk
+        self.helsinki_profile_values = {}
+
+    def _fetch_profiles(self, profile_ids) -> dict:
+        """Fetch the profiles of a chunk, retrying the whole chunk on failures"""
+        for attempt in range(1, self.profile_fetch_attempts + 1):
+            try:
+                return self.profile_service.get_profiles(profile_ids)
+            except (requests.exceptions.RequestException, ProfileServiceException):
+                if attempt == self.profile_fetch_attempts:
+                    raise
+                logger.warning(
+                    "Fetching %d profiles for the customer export failed "
+                    "(attempt %d/%d), retrying",
+                    len(profile_ids),
+                    attempt,
+                    self.profile_fetch_attempts,
+                    exc_info=True,
+                )
+                time.sleep(self.profile_fetch_backoff * 2 ** (attempt - 1))
+
+    def iter_items(self) -> Iterator[CustomerProfile]:
+        items = self.queryset.iterator(chunk_size=self.chunk_size)
+        exported = 0
+        while chunk := list(islice(items, self.chunk_size)):
+            if self.profile_service:
+                self.helsinki_profile_values = self._fetch_profiles(
+                    [item.id for item in chunk]
+                )
+            yield from chunk
+
+            exported += len(chunk)
+            logger.info("Exported %d customers", exported)
+            if self.progress_callback:
+                self.progress_callback(exported)
+        self.helsinki_profile_values = {}
 
     def get_value(self, field_name, item: CustomerProfile):  # noqa: C901
         """Return the value for the given field name."""
@@ -246,9 +301,15 @@ class BerthApplicationXlsx(BaseExportXlsxWriter):
             return parse_berth_switch_str(item.berth_switch)
 
         elif field_name == "berth_switch_reason" and item.berth_switch:
-            return item.berth_switch.reason.title if item.berth_switch.reason else "---"
+            return (
+                translated_names.get(
+                    BerthSwitchReason, item.berth_switch.reason_id, field="title"
+                )
+                if item.berth_switch.reason_id
+                else "---"
+            )
         elif field_name == "boat_type":
-            return item.boat_type.name
+            return translated_names.get(BoatType, item.boat.boat_type_id)
 
         if isinstance(fallback_value, bool):
             return "Yes" if fallback_value else ""
@@ -259,18 +320,9 @@ class BerthApplicationXlsx(BaseExportXlsxWriter):
         return qs.prefetch_related(
             Prefetch(
                 "harborchoice_set",
-                queryset=HarborChoice.objects.order_by("priority").select_related(
-                    "harbor"
-                ),
+                queryset=HarborChoice.objects.order_by("priority"),
             ),
-            "berth_switch__reason__translations",
-        ).select_related(
-            "boat",
-            "boat__boat_type",
-            "berth_switch",
-            "berth_switch__reason",
-            "berth_switch__berth__pier__harbor",
-        )
+        ).select_related("boat", "berth_switch", "berth_switch__berth__pier")
 
 
 class WinterStorageApplicationXlsx(BaseExportXlsxWriter):
@@ -314,7 +366,7 @@ class WinterStorageApplicationXlsx(BaseExportXlsxWriter):
                 item.winterstorageareachoice_set.all()
             )
         elif field_name == "boat_type":
-            return item.boat_type.name
+            return translated_names.get(BoatType, item.boat.boat_type_id)
         elif field_name == "storage_method":
             storage_method = WinterStorageMethod(fallback_value)
             return str(getattr(storage_method, "label", str(storage_method)))
@@ -328,8 +380,6 @@ class WinterStorageApplicationXlsx(BaseExportXlsxWriter):
         return qs.prefetch_related(
             Prefetch(
                 "winterstorageareachoice_set",
-                queryset=WinterStorageAreaChoice.objects.order_by(
-                    "priority"
-                ).select_related("winter_storage_area"),
+                queryset=WinterStorageAreaChoice.objects.order_by("priority"),
             ),
-        ).select_related("boat", "boat__boat_type")
+        ).select_related("boat")
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class LeasesConfig(AppConfig):
     name = "leases"
+
+    def ready(self):
+        import leases.signals  # noqa
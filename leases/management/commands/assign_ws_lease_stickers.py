@@ -3,7 +3,7 @@ from django.core.management import BaseCommand
 from applications.enums import ApplicationAreaType
 from leases.enums import LeaseStatus
 from leases.models import WinterStorageLease
-from leases.stickers import get_next_sticker_number
+from leases.stickers import assign_sticker_numbers
 
 
 class Command(BaseCommand):
@@ -17,12 +17,11 @@ class Command(BaseCommand):
             application__area_type=ApplicationAreaType.UNMARKED,
             status=LeaseStatus.PAID,
             sticker_number=None,
-        )
+        ).order_by("start_date", "created_at")
 
-        for lease in paid_ws_leases_without_sticker:
-            self.stdout.write("Assigning sticker for lease {}".format(lease.id))
-            lease.sticker_number = get_next_sticker_number(lease.start_date)
-            lease.save()
+        leases = assign_sticker_numbers(paid_ws_leases_without_sticker)
+        for lease in leases:
+            self.stdout.write("Assigned sticker for lease {}".format(lease.id))
 
         self.stdout.write(
             self.style.SUCCESS("Assigning stickers for existing paid WS leases done!")
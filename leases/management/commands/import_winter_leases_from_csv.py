@@ -1,22 +1,40 @@
 import csv
 import logging
 from collections import namedtuple
+from concurrent.futures import as_completed, ThreadPoolExecutor
 from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
 
+import requests
 from dateutil.utils import today
 from django.core.exceptions import ValidationError
 from django.core.management import BaseCommand
 from django.db import transaction
 
-from customers.exceptions import MultipleProfilesException, NoProfilesException
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from customers.exceptions import (
+    MultipleProfilesException,
+    NoProfilesException,
+    ProfileServiceException,
+)
 from customers.models import Boat, CustomerProfile
 from customers.services import ProfileService
+from leases.consts import ACTIVE_LEASE_STATUSES
 from leases.enums import LeaseStatus
 from leases.models import WinterStorageLease
-from resources.models import BoatType, WinterStoragePlace
+from resources.counters import update_winter_storage_counters
+from resources.models import BoatType, WinterStoragePlace, WinterStorageSection
 
 logger = logging.getLogger(__name__)
 
+LEASE_IMPORT_BATCH_SIZE = 500
+PROGRESS_INTERVAL = 100
+
+LEASE_START_DATE = date(day=15, month=9, year=2020)
+LEASE_END_DATE = date(day=10, month=6, year=2021)
+
 LeaseInput = namedtuple(
     "LeaseInput",
     (
@@ -32,8 +50,34 @@ LeaseInput = namedtuple(
     ),
 )
 
+# (first name, last name, email, phone)
+CustomerKey = Tuple[str, str, str, str]
+
+
+def get_customer_key(lease_input: LeaseInput) -> CustomerKey:
+    names = lease_input.name.split(" ")
+    first_name = names.pop().capitalize()
+    last_name = " ".join([name.capitalize() for name in names])
+    return (
+        first_name,
+        last_name,
+        lease_input.email.strip().lower(),
+        lease_input.phone.strip(),
+    )
+
 
 class Command(BaseCommand):
+    """
+    Imports the winter storage leases in two phases:
+
+    1. The whole file is parsed and each unique customer is resolved
+       against the Profile service with concurrent requests.
+    2. The boats and leases are created in bulk, using the places and
+       boats preloaded for all the rows.
+
+    The results are written to the report files as the import goes.
+    """
+
     profile_service: ProfileService
 
     def add_arguments(self, parser):
@@ -49,137 +93,320 @@ class Command(BaseCommand):
             type=str,
             help="[Required] The file to parse",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=10,
+            help="Number of concurrent requests to the Profile service",
+        )
 
-    def get_or_create_customer_profile(
-        self, name: str, email: str = None, phone: str = None
-    ) -> CustomerProfile:
-        names = name.split(" ")
-        first_name = names.pop().capitalize()
-        last_name = " ".join([name.capitalize() for name in names])
-
+    def find_profile_id(self, customer_key: CustomerKey) -> Optional[UUID]:
+        first_name, last_name, email, phone = customer_key
         try:
             helsinki_profile = self.profile_service.find_profile(
                 first_name, last_name, email, phone, force_only_one=True
             )
-            profile = CustomerProfile.objects.get(id=helsinki_profile.id)
-        except (NoProfilesException, CustomerProfile.DoesNotExist):
+        except NoProfilesException:
+            return None
+        return helsinki_profile.id
+
+    def resolve_customer_profiles(
+        self, customer_keys: List[CustomerKey], workers: int
+    ) -> Tuple[Dict[CustomerKey, CustomerProfile], Dict[CustomerKey, BaseException]]:
+        """Find or create the profile of each unique customer"""
+        profile_ids = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.find_profile_id, key): key for key in customer_keys
+            }
+            for count, future in enumerate(as_completed(futures), start=1):
+                key = futures[future]
+                try:
+                    profile_ids[key] = future.result()
+                except (
+                    ProfileServiceException,
+                    requests.exceptions.RequestException,
+                ) as e:
+                    errors[key] = e
+
+                if count % PROGRESS_INTERVAL == 0 or count == len(futures):
+                    self.stdout.write(f"Customers resolved: {count}/{len(futures)}")
+
+        existing_profiles = CustomerProfile.objects.in_bulk(
+            [profile_id for profile_id in profile_ids.values() if profile_id]
+        )
+
+        profiles = {}
+        for key, profile_id in profile_ids.items():
+            if profile := existing_profiles.get(profile_id):
+                profiles[key] = profile
+                continue
+
+            first_name, last_name, email, phone = key
             logger.debug(f"Creating profile for {last_name}, {first_name} ({email})")
-            profile = self.profile_service.create_profile(
-                first_name, last_name, email, phone
+            try:
+                profiles[key] = self.profile_service.create_profile(
+                    first_name, last_name, email, phone
+                )
+            except (ProfileServiceException, requests.exceptions.RequestException) as e:
+                errors[key] = e
+
+        return profiles, errors
+
+    def load_places(
+        self, lease_inputs: List[LeaseInput]
+    ) -> Tuple[Dict[Tuple[str, int], Tuple[UUID, bool]], set]:
+        """Preload the places of the sections in the file and the ones already leased"""
+        section_ids = set()
+        for lease_input in lease_inputs:
+            try:
+                section_ids.add(UUID(lease_input.section_id))
+            except ValueError:
+                pass
+
+        places = {
+            (str(section_id), number): (place_id, is_active)
+            for place_id, section_id, number, is_active in WinterStoragePlace.objects.filter(
+                winter_storage_section_id__in=section_ids
+            ).values_list(
+                "id", "winter_storage_section_id", "number", "is_active"
             )
-        return profile
+        }
+        leased_place_ids = set(
+            WinterStorageLease.objects.filter(
+                place_id__in=[place_id for place_id, _is_active in places.values()],
+                end_date__gt=LEASE_START_DATE,
+                status__in=ACTIVE_LEASE_STATUSES,
+            ).values_list("place_id", flat=True)
+        )
+        return places, leased_place_ids
 
-    def get_or_create_boat(
+    def load_boats(self, profiles: List[CustomerProfile]) -> None:
+        self.boats_by_register = {}
+        self.boats_by_dimensions = {}
+        for boat in Boat.objects.filter(owner__in=profiles):
+            self.boats_by_register.setdefault(
+                (boat.owner_id, boat.registration_number), boat
+            )
+            self.boats_by_dimensions.setdefault(
+                (boat.owner_id, boat.boat_type_id, boat.width, boat.length), boat
+            )
+
+    def get_or_build_boat(
         self, lease_input: LeaseInput, customer_profile: CustomerProfile
-    ):
+    ) -> Tuple[Optional[Boat], bool]:
         """First try to match a boat belonging to the customer with the given
         registration number. If it's not found, then it tries finding or creating one
         based on the dimensions."""
-        boat = Boat.objects.filter(
-            owner=customer_profile, registration_number=lease_input.boat_register
-        ).first()
-
-        if boat is None and lease_input.boat_width and lease_input.boat_length:
-            boat, _created = Boat.objects.get_or_create(
-                owner=customer_profile,
-                boat_type=self.OTHER_BOAT_TYPE,
-                width=lease_input.boat_width.replace(",", "."),
-                length=lease_input.boat_length.replace(",", "."),
-                defaults={"registration_number": lease_input.boat_register},
+        boat = self.boats_by_register.get(
+            (customer_profile.id, lease_input.boat_register)
+        )
+        if (
+            boat is not None
+            or not lease_input.boat_width
+            or not lease_input.boat_length
+        ):
+            return boat, False
+
+        width = Decimal(lease_input.boat_width.replace(",", "."))
+        length = Decimal(lease_input.boat_length.replace(",", "."))
+        key = (customer_profile.id, self.OTHER_BOAT_TYPE.id, width, length)
+        if boat := self.boats_by_dimensions.get(key):
+            return boat, False
+
+        boat = Boat(
+            owner=customer_profile,
+            boat_type=self.OTHER_BOAT_TYPE,
+            width=width,
+            length=length,
+            registration_number=lease_input.boat_register,
+        )
+        boat.strip_text_fields()
+        boat.clean_fields(exclude=["owner", "boat_type"])
+        self.boats_by_dimensions[key] = boat
+        self.boats_by_register.setdefault(
+            (customer_profile.id, boat.registration_number), boat
+        )
+        return boat, True
+
+    def create_leases(self, leases: List[WinterStorageLease], boats: List[Boat]):
+        with transaction.atomic():
+            Boat.objects.bulk_create(boats)
+            WinterStorageLease.objects.bulk_create(leases)
+            # No signals are sent by bulk_create
+            WinterStorageLease.objects.update_renewal_candidates(
+                WinterStorageLease.objects.filter(
+                    place__in={lease.place_id for lease in leases},
+                    customer__in={lease.customer_id for lease in leases},
+                )
             )
-        return boat
 
-    def handle(self, *args, profile_token=None, lease_file_path=None, **options):
+    def handle(  # noqa: C901
+        self,
+        *args,
+        profile_token=None,
+        lease_file_path=None,
+        workers=10,
+        **options,
+    ):
         self.profile_service = ProfileService(profile_token=profile_token)
         self.OTHER_BOAT_TYPE = BoatType.objects.get(id=9)
 
-        multiple_profiles = []
-        successful = []
-        failed = []
-
+        # Phase 1: parse the file and resolve the customers
         with open(lease_file_path, "r", encoding="utf-8-sig") as cf:
-            rd = csv.reader(cf, delimiter=";")
-            for line in rd:
-                with transaction.atomic():
-                    lease_input = LeaseInput(*line)
+            lease_inputs = [LeaseInput(*line) for line in csv.reader(cf, delimiter=";")]
+        customer_keys = [get_customer_key(lease_input) for lease_input in lease_inputs]
+        unique_customer_keys = list(dict.fromkeys(customer_keys))
+        self.stdout.write(
+            f"Rows: {len(lease_inputs)}, unique customers: {len(unique_customer_keys)}"
+        )
+        profiles, customer_errors = self.resolve_customer_profiles(
+            unique_customer_keys, workers
+        )
+
+        # Phase 2: create the boats and leases
+        places, leased_place_ids = self.load_places(lease_inputs)
+        self.load_boats(list(profiles.values()))
+
+        successful_count = 0
+        failed_count = 0
+        multiple_profiles_count = 0
+
+        with open(
+            "./successful_leases.csv", "w+", encoding="utf-8"
+        ) as successful_file, open(
+            "./multiple_profiles.csv", "w+", encoding="utf-8"
+        ) as multiple_file, open(
+            "./failed_leases.csv", "w+", encoding="utf-8"
+        ) as failed_file:
+            successful_writer = csv.writer(successful_file, delimiter=",")
+            successful_writer.writerow(
+                ["Lease id", "Section id", "Place number", "Customer name"]
+            )
+            multiple_writer = csv.writer(multiple_file, delimiter=",")
+            multiple_writer.writerow(
+                ["Section id", "Place number", "Customer name", "Returned ids"]
+            )
+            failed_writer = csv.writer(failed_file, delimiter=",")
+            failed_writer.writerow(
+                ["Section id", "Place number", "Customer name", "Error"]
+            )
+
+            def fail(lease_input: LeaseInput, error: str):
+                nonlocal failed_count
+                failed_count += 1
+                failed_writer.writerow(
+                    (
+                        lease_input.section_id,
+                        lease_input.place_number,
+                        lease_input.name,
+                        error,
+                    )
+                )
+
+            for start in range(0, len(lease_inputs), LEASE_IMPORT_BATCH_SIZE):
+                batch = []
+                new_boats = []
+                for lease_input, customer_key in zip(
+                    lease_inputs[start : start + LEASE_IMPORT_BATCH_SIZE],
+                    customer_keys[start : start + LEASE_IMPORT_BATCH_SIZE],
+                ):
+                    if error := customer_errors.get(customer_key):
+                        if isinstance(error, MultipleProfilesException):
+                            multiple_profiles_count += 1
+                            multiple_writer.writerow(
+                                (
+                                    lease_input.section_id,
+                                    lease_input.place_number,
+                                    lease_input.name,
+                                    ";".join(error.ids),
+                                )
+                            )
+                        else:
+                            fail(lease_input, str(error))
+                        continue
+
                     try:
-                        customer_profile = self.get_or_create_customer_profile(
-                            lease_input.name,
-                            email=lease_input.email,
-                            phone=lease_input.phone,
-                        )
-                    except MultipleProfilesException as e:
-                        multiple_profiles.append(
+                        place_id, is_active = places[
                             (
-                                lease_input.section_id,
-                                lease_input.place_number,
-                                lease_input.name,
-                                ";".join(e.ids),
+                                str(UUID(lease_input.section_id)),
+                                int(lease_input.place_number),
                             )
-                        )
+                        ]
+                    except (KeyError, ValueError):
+                        fail(lease_input, "WinterStoragePlace does not exist")
+                        continue
+                    if place_id in leased_place_ids:
+                        fail(lease_input, "WinterStoragePlace already has a lease")
+                        continue
+                    if not is_active:
+                        fail(lease_input, "Selected place is not active")
                         continue
 
+                    customer_profile = profiles[customer_key]
                     try:
-                        place = WinterStoragePlace.objects.get(
-                            winter_storage_section_id=lease_input.section_id,
-                            number=lease_input.place_number,
+                        boat, created = self.get_or_build_boat(
+                            lease_input, customer_profile
                         )
+                    except (InvalidOperation, ValidationError) as e:
+                        fail(lease_input, str(e) or "Invalid boat dimensions")
+                        continue
+                    if created:
+                        new_boats.append(boat)
 
-                        boat = self.get_or_create_boat(lease_input, customer_profile)
-                        comment = ""
-                        if lease_input.comment:
-                            comment = f"{lease_input.comment}\n"
-                        comment += f"Lease imported on {today().date()}"
-
-                        lease = WinterStorageLease.objects.create(
-                            customer=customer_profile,
-                            place=place,
-                            boat=boat,
-                            start_date=date(day=15, month=9, year=2020),
-                            end_date=date(day=10, month=6, year=2021),
-                            status=LeaseStatus.PAID,
-                            comment=comment,
-                        )
-                        successful.append(
-                            (
-                                str(lease.id),
-                                lease_input.section_id,
-                                lease_input.place_number,
-                                lease_input.name,
-                            )
+                    comment = ""
+                    if lease_input.comment:
+                        comment = f"{lease_input.comment}\n"
+                    comment += f"Lease imported on {today().date()}"
+
+                    leased_place_ids.add(place_id)
+                    batch.append(
+                        (
+                            lease_input,
+                            WinterStorageLease(
+                                customer=customer_profile,
+                                place_id=place_id,
+                                boat=boat,
+                                start_date=LEASE_START_DATE,
+                                end_date=LEASE_END_DATE,
+                                status=LeaseStatus.PAID,
+                                comment=comment,
+                            ),
                         )
-                    except (WinterStoragePlace.DoesNotExist, ValidationError) as e:
-                        failed.append(
-                            (
-                                lease_input.section_id,
-                                lease_input.place_number,
-                                lease_input.name,
-                                str(e),
-                            )
+                    )
+
+                self.create_leases([lease for _input, lease in batch], new_boats)
+                for lease_input, lease in batch:
+                    successful_writer.writerow(
+                        (
+                            str(lease.id),
+                            lease_input.section_id,
+                            lease_input.place_number,
+                            lease_input.name,
                         )
+                    )
+                successful_count += len(batch)
+                self.stdout.write(
+                    f"Rows processed: {min(start + LEASE_IMPORT_BATCH_SIZE, len(lease_inputs))}"
+                    f"/{len(lease_inputs)}"
+                )
+
+        # bulk_create doesn't send the signals invalidating the cached queries
+        # and updating the place counters
+        bump_public_query_cache_version()
+        update_winter_storage_counters(
+            WinterStorageSection.objects.filter(
+                id__in={section_id for section_id, _number in places}
+            )
+        )
 
         self.stdout.write(
-            self.style.SUCCESS(f"Leases imported correctly: {len(successful)}")
+            self.style.SUCCESS(f"Leases imported correctly: {successful_count}")
         )
-        self.stdout.write(self.style.ERROR(f"Leases failed to import: {len(failed)}"))
+        self.stdout.write(self.style.ERROR(f"Leases failed to import: {failed_count}"))
         self.stdout.write(
             self.style.ERROR(
-                f"Customers with multiple profiles: {len(multiple_profiles)}"
+                f"Customers with multiple profiles: {multiple_profiles_count}"
             )
         )
-        with open("./successful_leases.csv", "w+", encoding="utf-8") as successful_file:
-            writer = csv.writer(successful_file, delimiter=",")
-            writer.writerow(["Lease id", "Section id", "Place number", "Customer name"])
-            writer.writerows(successful)
-
-        with open("./multiple_profiles.csv", "w+", encoding="utf-8") as multiple_file:
-            writer = csv.writer(multiple_file, delimiter=",")
-            writer.writerow(
-                ["Section id", "Place number", "Customer name", "Returned ids"]
-            )
-            writer.writerows(multiple_profiles)
-
-        with open("./failed_leases.csv", "w+", encoding="utf-8") as failed_file:
-            writer = csv.writer(failed_file, delimiter=",")
-            writer.writerow(["Section id", "Place number", "Customer name", "Error"])
-            writer.writerows(failed)
@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+
+from leases.models import BerthLease, WinterStorageLease
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Refresh the renewal candidate snapshots used by the invoice previews "
+        "and the invoicing runs for the upcoming seasons"
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Refreshing berth lease renewal candidates")
+        count = BerthLease.objects.refresh_renewal_candidates()
+        self.stdout.write(f"{count} berth leases can be renewed")
+
+        self.stdout.write("Refreshing winter storage lease renewal candidates")
+        count = WinterStorageLease.objects.refresh_renewal_candidates()
+        self.stdout.write(f"{count} winter storage leases can be renewed")
+
+        self.stdout.write(self.style.SUCCESS("Refreshing renewal candidates done!"))
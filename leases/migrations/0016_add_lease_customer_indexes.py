@@ -0,0 +1,34 @@
+# Generated by Django 4.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leases", "0015_default_ordering_decreasing_start_date"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="berthlease",
+            index=models.Index(
+                fields=["customer", "status", "start_date"],
+                name="berthlease_customer_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="winterstoragelease",
+            index=models.Index(
+                fields=["customer", "status", "start_date"],
+                name="wslease_customer_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="winterstoragelease",
+            index=models.Index(
+                fields=["customer", "place", "section"],
+                name="wslease_customer_place_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.18 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leases", "0016_add_lease_customer_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="berthlease",
+            index=models.Index(
+                fields=["status", "start_date", "end_date", "berth"],
+                name="berthlease_season_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="winterstoragelease",
+            index=models.Index(
+                fields=["status", "start_date", "end_date", "place"],
+                name="wslease_season_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="BerthLeaseRenewalCandidate",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season_start", models.DateField(verbose_name="season start")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="time created"
+                    ),
+                ),
+                (
+                    "lease",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="renewal_candidates",
+                        to="leases.berthlease",
+                        verbose_name="lease",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "berth lease renewal candidate",
+                "verbose_name_plural": "berth lease renewal candidates",
+            },
+        ),
+        migrations.CreateModel(
+            name="WinterStorageLeaseRenewalCandidate",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season_start", models.DateField(verbose_name="season start")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="time created"
+                    ),
+                ),
+                (
+                    "lease",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="renewal_candidates",
+                        to="leases.winterstoragelease",
+                        verbose_name="lease",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "winter storage lease renewal candidate",
+                "verbose_name_plural": "winter storage lease renewal candidates",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="berthleaserenewalcandidate",
+            constraint=models.UniqueConstraint(
+                fields=("season_start", "lease"),
+                name="unique_berth_lease_renewal_candidate",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="winterstorageleaserenewalcandidate",
+            constraint=models.UniqueConstraint(
+                fields=("season_start", "lease"),
+                name="unique_ws_lease_renewal_candidate",
+            ),
+        ),
+    ]
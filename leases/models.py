@@ -4,7 +4,7 @@ from dateutil.relativedelta import relativedelta
 from dateutil.utils import today
 from django.contrib.contenttypes.fields import GenericRelation
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Exists, ExpressionWrapper, OuterRef, Q, QuerySet
 from django.utils.translation import gettext_lazy as _
 from helsinki_gdpr.models import SerializableMixin
@@ -13,7 +13,7 @@ from applications.models import BerthApplication, WinterStorageApplication
 from customers.models import Boat, CustomerProfile
 from payments.enums import OrderType
 from resources.models import Berth, WinterStoragePlace, WinterStorageSection
-from utils.models import TimeStampedModel, UUIDModel
+from utils.models import SerializableManager, TimeStampedModel, UUIDModel
 
 from .consts import ACTIVE_LEASE_STATUSES
 from .enums import LeaseStatus
@@ -27,6 +27,7 @@ from .utils import (
     calculate_winter_season_start_date,
     calculate_winter_storage_lease_end_date,
     calculate_winter_storage_lease_start_date,
+    calculate_year_date_range,
 )
 
 
@@ -100,7 +101,58 @@ class AbstractLease(TimeStampedModel, UUIDModel):
         super().save(*args, **kwargs)
 
 
-class BerthLeaseManager(SerializableMixin.SerializableManager):
+def _get_renewal_candidate_ids(candidate_model, season_start: date) -> list:
+    return list(
+        candidate_model.objects.filter(season_start=season_start).values_list(
+            "lease_id", flat=True
+        )
+    )
+
+
+def _refresh_renewal_candidates(
+    candidate_model, leases: QuerySet, season_start: date
+) -> int:
+    with transaction.atomic():
+        # Only the snapshot of the latest refreshed season is kept around
+        candidate_model.objects.all().delete()
+        candidates = candidate_model.objects.bulk_create(
+            [
+                candidate_model(lease_id=lease_id, season_start=season_start)
+                for lease_id in leases.values_list("pk", flat=True)
+            ]
+        )
+    return len(candidates)
+
+
+def _update_renewal_candidates(
+    candidate_model, get_renewable_leases, leases: QuerySet
+) -> None:
+    """Check the leases again against the renewal candidate snapshot, if there is one"""
+    season_start = candidate_model.objects.values_list(
+        "season_start", flat=True
+    ).first()
+    if not season_start:
+        return
+
+    lease_ids = leases.values("pk")
+    renewable_ids = list(
+        get_renewable_leases(season_start)
+        .filter(pk__in=lease_ids)
+        .values_list("pk", flat=True)
+    )
+    candidate_model.objects.filter(lease__in=lease_ids).exclude(
+        lease_id__in=renewable_ids
+    ).delete()
+    candidate_model.objects.bulk_create(
+        [
+            candidate_model(lease_id=lease_id, season_start=season_start)
+            for lease_id in renewable_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class BerthLeaseManager(SerializableManager):
     def get_queryset(self):
         current_season_start = calculate_berth_lease_start_date()
         today = date.today()
@@ -123,12 +175,19 @@ class BerthLeaseManager(SerializableMixin.SerializableManager):
             )
         )
 
-    def get_renewable_leases(self, season_start: date = None) -> QuerySet:
+    def get_renewable_leases(
+        self, season_start: date = None, use_snapshot: bool = False
+    ) -> QuerySet:
         """
         Get the leases that were active last year
         If today is:
           (1) before season: leases from last year
           (2) during or after season: leases from this year
+
+        With use_snapshot, the leases are read from the renewal candidate snapshot
+        of the season, if it has been refreshed. The snapshot is kept up to date as
+        the leases and the contracts change (see leases.signals), so only the checks
+        on the lease rows themselves are applied again.
         """
         qs = self.get_queryset()
 
@@ -136,6 +195,21 @@ class BerthLeaseManager(SerializableMixin.SerializableManager):
         if not season_start:
             season_start = calculate_season_start_date()
 
+        # Only allow leases that are auto-renewing and have been paid
+        renewable = Q(
+            berth__is_active=True,
+            berth__is_invoiceable=True,
+            status=LeaseStatus.PAID,
+            contract__isnull=False,
+        )
+
+        if use_snapshot and (
+            candidate_ids := _get_renewal_candidate_ids(
+                BerthLeaseRenewalCandidate, season_start
+            )
+        ):
+            return qs.filter(renewable, pk__in=candidate_ids)
+
         current_date = today().date()
         # If today is before the season starts but during the same year (1)
         if current_date < season_start and current_date.year == season_start.year:
@@ -143,25 +217,38 @@ class BerthLeaseManager(SerializableMixin.SerializableManager):
         else:  # (2)
             lease_year = current_date.year
 
+        lease_year_start, lease_year_end = calculate_year_date_range(lease_year)
+
         # Filter leases from the upcoming season
         future_leases = qs.filter(
-            start_date__year__gt=lease_year,
+            start_date__gt=lease_year_end,
             berth=OuterRef("berth"),
             customer=OuterRef("customer"),
         )
 
         # Exclude leases that have already been assigned to the same customer and berth on the future
-        leases: QuerySet = qs.exclude(Exists(future_leases.values("pk"))).filter(
-            # Only allow leases that are auto-renewing and have been paid
-            berth__is_active=True,
-            berth__is_invoiceable=True,
-            status=LeaseStatus.PAID,
-            start_date__year=lease_year,
-            end_date__year=lease_year,
-            contract__isnull=False,
+        return qs.exclude(Exists(future_leases.values("pk"))).filter(
+            renewable,
+            start_date__range=(lease_year_start, lease_year_end),
+            end_date__range=(lease_year_start, lease_year_end),
         )
 
-        return leases
+    def refresh_renewal_candidates(self, season_start: date = None) -> int:
+        """Replace the renewal candidate snapshot with the currently renewable leases"""
+        if not season_start:
+            season_start = calculate_season_start_date()
+
+        return _refresh_renewal_candidates(
+            BerthLeaseRenewalCandidate,
+            self.get_renewable_leases(season_start, use_snapshot=False),
+            season_start,
+        )
+
+    def update_renewal_candidates(self, leases: QuerySet) -> None:
+        """Check the leases again against the renewal candidate snapshot"""
+        _update_renewal_candidates(
+            BerthLeaseRenewalCandidate, self.get_renewable_leases, leases
+        )
 
     def filter_prev_season_leases(self):
         qs = self.get_queryset()
@@ -208,6 +295,16 @@ class BerthLease(AbstractLease, SerializableMixin):
             "-end_date",
             "created_at",
         )
+        indexes = [
+            models.Index(
+                fields=["customer", "status", "start_date"],
+                name="berthlease_customer_status_idx",
+            ),
+            models.Index(
+                fields=["status", "start_date", "end_date", "berth"],
+                name="berthlease_season_idx",
+            ),
+        ]
 
     def clean(self):
         if self.start_date.year != self.end_date.year:
@@ -269,7 +366,7 @@ class BerthLease(AbstractLease, SerializableMixin):
     )
 
 
-class WinterStorageLeaseManager(SerializableMixin.SerializableManager):
+class WinterStorageLeaseManager(SerializableManager):
     def get_queryset(self):
         current_season_start = calculate_winter_storage_lease_start_date()
         today = date.today()
@@ -292,12 +389,19 @@ class WinterStorageLeaseManager(SerializableMixin.SerializableManager):
             )
         )
 
-    def get_renewable_marked_leases(self, season_start: date = None) -> QuerySet:
+    def get_renewable_marked_leases(
+        self, season_start: date = None, use_snapshot: bool = False
+    ) -> QuerySet:
         """
         Get the leases that were active last last season
         If today is:
             (1) during the season: leases that start on the season's start year
             (2) outside of the season: leases that start on season's previous year
+
+        With use_snapshot, the leases are read from the renewal candidate snapshot
+        of the season, if it has been refreshed. The snapshot is kept up to date as
+        the leases change (see leases.signals), so only the checks on the lease rows
+        themselves are applied again.
         """
         qs = self.get_queryset()
 
@@ -305,6 +409,22 @@ class WinterStorageLeaseManager(SerializableMixin.SerializableManager):
         if not season_start:
             season_start = calculate_winter_season_start_date()
 
+        # Only allow leases that have been paid
+        renewable = Q(
+            place__isnull=False,
+            place__is_active=True,
+            place__is_invoiceable=True,
+            section__isnull=True,
+            status=LeaseStatus.PAID,
+        )
+
+        if use_snapshot and (
+            candidate_ids := _get_renewal_candidate_ids(
+                WinterStorageLeaseRenewalCandidate, season_start
+            )
+        ):
+            return qs.filter(renewable, pk__in=candidate_ids)
+
         season_end = calculate_winter_season_end_date(season_start)
         current_date = today().date()
 
@@ -317,26 +437,38 @@ class WinterStorageLeaseManager(SerializableMixin.SerializableManager):
             start_year = season_start.year - 1
             end_year = season_start.year
 
+        end_year_start, end_year_end = calculate_year_date_range(end_year)
+
         # Filter leases from the upcoming season
         future_leases = qs.filter(
-            start_date__year__gte=end_year,
+            start_date__gte=end_year_start,
             place=OuterRef("place"),
             customer=OuterRef("customer"),
         )
 
         # Exclude leases that have already been assigned to the same customer and berth on the future
-        leases: QuerySet = qs.exclude(Exists(future_leases.values("pk"))).filter(
-            # Only allow leases that have been paid
-            place__isnull=False,
-            place__is_active=True,
-            place__is_invoiceable=True,
-            section__isnull=True,
-            status=LeaseStatus.PAID,
-            start_date__year=start_year,
-            end_date__year=end_year,
+        return qs.exclude(Exists(future_leases.values("pk"))).filter(
+            renewable,
+            start_date__range=calculate_year_date_range(start_year),
+            end_date__range=(end_year_start, end_year_end),
+        )
+
+    def refresh_renewal_candidates(self, season_start: date = None) -> int:
+        """Replace the renewal candidate snapshot with the currently renewable leases"""
+        if not season_start:
+            season_start = calculate_winter_season_start_date()
+
+        return _refresh_renewal_candidates(
+            WinterStorageLeaseRenewalCandidate,
+            self.get_renewable_marked_leases(season_start, use_snapshot=False),
+            season_start,
         )
 
-        return leases
+    def update_renewal_candidates(self, leases: QuerySet) -> None:
+        """Check the leases again against the renewal candidate snapshot"""
+        _update_renewal_candidates(
+            WinterStorageLeaseRenewalCandidate, self.get_renewable_marked_leases, leases
+        )
 
 
 class WinterStorageLease(AbstractLease, SerializableMixin):
@@ -387,6 +519,20 @@ class WinterStorageLease(AbstractLease, SerializableMixin):
             "-end_date",
             "created_at",
         )
+        indexes = [
+            models.Index(
+                fields=["customer", "status", "start_date"],
+                name="wslease_customer_status_idx",
+            ),
+            models.Index(
+                fields=["customer", "place", "section"],
+                name="wslease_customer_place_idx",
+            ),
+            models.Index(
+                fields=["status", "start_date", "end_date", "place"],
+                name="wslease_season_idx",
+            ),
+        ]
 
     def get_winter_storage_area(self):
         if self.place:
@@ -519,3 +665,52 @@ class WinterStorageLeaseChange(AbstractLeaseChange):
     class Meta:
         verbose_name = _("winter storage lease change")
         verbose_name_plural = _("winter storage lease changes")
+
+
+class AbstractLeaseRenewalCandidate(models.Model):
+    season_start = models.DateField(verbose_name=_("season start"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("time created"))
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.season_start}: {self.lease_id}"
+
+
+class BerthLeaseRenewalCandidate(AbstractLeaseRenewalCandidate):
+    lease = models.ForeignKey(
+        BerthLease,
+        verbose_name=_("lease"),
+        on_delete=models.CASCADE,
+        related_name="renewal_candidates",
+    )
+
+    class Meta:
+        verbose_name = _("berth lease renewal candidate")
+        verbose_name_plural = _("berth lease renewal candidates")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["season_start", "lease"],
+                name="unique_berth_lease_renewal_candidate",
+            ),
+        ]
+
+
+class WinterStorageLeaseRenewalCandidate(AbstractLeaseRenewalCandidate):
+    lease = models.ForeignKey(
+        WinterStorageLease,
+        verbose_name=_("lease"),
+        on_delete=models.CASCADE,
+        related_name="renewal_candidates",
+    )
+
+    class Meta:
+        verbose_name = _("winter storage lease renewal candidate")
+        verbose_name_plural = _("winter storage lease renewal candidates")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["season_start", "lease"],
+                name="unique_ws_lease_renewal_candidate",
+            ),
+        ]
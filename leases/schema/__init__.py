@@ -1,4 +1,4 @@
-from .loaders import BerthLeaseForBerthLoader
+from .loaders import BerthLeaseForBerthLoader, PrevSeasonBerthLeaseForBerthLoader
 from .mutations import Mutation
 from .queries import Query
 from .types import BerthLeaseNode, LeaseStatusEnum, WinterStorageLeaseNode
@@ -8,6 +8,7 @@ __all__ = [
     "BerthLeaseNode",
     "LeaseStatusEnum",
     "Mutation",
+    "PrevSeasonBerthLeaseForBerthLoader",
     "Query",
     "WinterStorageLeaseNode",
 ]
@@ -16,3 +16,21 @@ class BerthLeaseForBerthLoader(DataLoader):
         return Promise.resolve(
             [leases_by_berth_id.get(berth_id, []) for berth_id in berth_ids]
         )
+
+
+class PrevSeasonBerthLeaseForBerthLoader(DataLoader):
+    def batch_load_fn(self, berth_ids):
+        leases_by_berth_id = {}
+
+        # Ordered by the end date, so the latest lease of each berth is kept
+        for lease in (
+            BerthLease.objects.filter_prev_season_leases()
+            .filter(berth_id__in=berth_ids)
+            .order_by("end_date")
+            .iterator()
+        ):
+            leases_by_berth_id[lease.berth_id] = lease
+
+        return Promise.resolve(
+            [leases_by_berth_id.get(berth_id) for berth_id in berth_ids]
+        )
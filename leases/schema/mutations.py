@@ -1,11 +1,12 @@
 import threading
 from datetime import date, datetime
+from uuid import UUID
 
 import graphene
 from anymail.exceptions import AnymailError
 from dateutil.relativedelta import relativedelta
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import DatabaseError, transaction
 from django.utils.translation import gettext_lazy as _
 
 from applications.enums import ApplicationAreaType, ApplicationStatus
@@ -14,9 +15,12 @@ from applications.schema import BerthApplicationNode, WinterStorageApplicationNo
 from berth_reservations.exceptions import VenepaikkaGraphQLError
 from contracts.services import get_contract_service
 from customers.models import CustomerProfile
+from customers.services import ProfileService
 from leases.utils import exchange_berth_for_lease
 from payments.enums import OrderStatus
+from payments.exceptions import VenepaikkaPaymentError
 from payments.models import BerthProduct, Order, WinterStorageProduct
+from resources.models import WinterStoragePlace
 from resources.schema import BerthNode, WinterStoragePlaceNode, WinterStorageSectionNode
 from users.decorators import (
     add_permission_required,
@@ -24,15 +28,15 @@ from users.decorators import (
     delete_permission_required,
     view_permission_required,
 )
-from utils.relay import get_node_from_global_id
+from utils.relay import from_global_id, get_node_from_global_id
 from utils.schema import update_object
 
 from ..enums import LeaseStatus
 from ..models import BerthLease, WinterStorageLease
 from ..services import BerthInvoicingService, WinterStorageInvoicingService
 from ..stickers import get_next_sticker_number
-from ..utils import calculate_berth_lease_start_date, terminate_lease
-from .types import BerthLeaseNode, WinterStorageLeaseNode
+from ..utils import calculate_berth_lease_start_date, terminate_lease, terminate_leases
+from .types import BerthLeaseNode, FailedInstanceType, WinterStorageLeaseNode
 from .utils import lookup_or_create_boat
 
 
@@ -43,6 +47,15 @@ class AbstractLeaseInput:
     comment = graphene.String()
 
 
+def _decode_global_id(global_id, node_type, id_type):
+    try:
+        return id_type(from_global_id(global_id, node_type=node_type))
+    except (AssertionError, ValueError):
+        raise VenepaikkaGraphQLError(
+            f"{node_type._meta.model._meta.object_name} matching query does not exist."
+        )
+
+
 def _lookup_application_and_customer(info, input, application_node_type):
     from customers.schema import ProfileNode  # import here avoid circular import
 
@@ -373,25 +386,139 @@ class CreateWinterStorageLeaseMutation(graphene.ClientIDMutation):
         if boat := lookup_or_create_boat(info, input):
             input["boat"] = boat
 
-        try:
-            lease = WinterStorageLease.objects.create(**input)
-            order = Order.objects.create(customer=input["customer"], lease=lease)
-            # Do not create a contract for non-billable customers.
-            if not input["customer"].is_non_billable_customer():
-                get_contract_service().create_winter_storage_contract(lease)
-        except WinterStorageProduct.DoesNotExist as e:
-            raise VenepaikkaGraphQLError(e)
-        except ValidationError as e:
-            raise VenepaikkaGraphQLError(str(e))
+        lease = _create_winter_storage_lease(input)
+        return CreateWinterStorageLeaseMutation(winter_storage_lease=lease)
 
-        if application := input.get("application"):
-            application.status = ApplicationStatus.OFFER_GENERATED
-            application.save()
 
-        if order.customer.is_non_billable_customer():
-            order.set_status(OrderStatus.PAID_MANUALLY, "Non-billable customer.")
+def _create_winter_storage_lease(input: dict) -> WinterStorageLease:
+    """Create the lease with its order and contract, the application gets an offer"""
+    try:
+        lease = WinterStorageLease.objects.create(**input)
+        order = Order.objects.create(customer=input["customer"], lease=lease)
+        # Do not create a contract for non-billable customers.
+        if not input["customer"].is_non_billable_customer():
+            get_contract_service().create_winter_storage_contract(lease)
+    except WinterStorageProduct.DoesNotExist as e:
+        raise VenepaikkaGraphQLError(e)
+    except ValidationError as e:
+        raise VenepaikkaGraphQLError(str(e))
 
-        return CreateWinterStorageLeaseMutation(winter_storage_lease=lease)
+    if application := input.get("application"):
+        application.status = ApplicationStatus.OFFER_GENERATED
+        application.save()
+
+    if order.customer.is_non_billable_customer():
+        order.set_status(OrderStatus.PAID_MANUALLY, "Non-billable customer.")
+
+    return lease
+
+
+class WinterStorageLeaseProposalInput(graphene.InputObjectType):
+    application_id = graphene.ID(required=True)
+    place_id = graphene.ID(required=True)
+
+
+class BulkCreateWinterStorageLeasesMutation(graphene.ClientIDMutation):
+    class Input:
+        leases = graphene.List(
+            graphene.NonNull(WinterStorageLeaseProposalInput), required=True
+        )
+
+    winter_storage_leases = graphene.List(
+        graphene.NonNull(WinterStorageLeaseNode), required=True
+    )
+    failed_leases = graphene.List(
+        graphene.NonNull(FailedInstanceType),
+        required=True,
+        description="The applications whose lease could not be created",
+    )
+
+    @classmethod
+    def _parse_inputs(cls, lease_inputs, failed_leases):
+        """Decode the global IDs, so the applications and places can be fetched in bulk"""
+        parsed = []
+        application_ids = set()
+        for lease_input in lease_inputs:
+            global_id = lease_input["application_id"]
+            try:
+                application_id = _decode_global_id(
+                    global_id, WinterStorageApplicationNode, int
+                )
+                if application_id in application_ids:
+                    raise VenepaikkaGraphQLError(
+                        _("The same application cannot be leased more than once")
+                    )
+                application_ids.add(application_id)
+                place_id = _decode_global_id(
+                    lease_input["place_id"], WinterStoragePlaceNode, UUID
+                )
+            except VenepaikkaGraphQLError as e:
+                failed_leases.append(FailedInstanceType(id=global_id, error=str(e)))
+            else:
+                parsed.append((global_id, application_id, place_id))
+        return parsed
+
+    @classmethod
+    @view_permission_required(WinterStorageApplication, CustomerProfile)
+    @add_permission_required(WinterStorageLease)
+    def mutate_and_get_payload(cls, root, info, leases, **input):
+        winter_storage_leases = []
+        failed_leases = []
+
+        parsed = cls._parse_inputs(leases, failed_leases)
+        applications = WinterStorageApplication.objects.select_related(
+            "customer", "boat"
+        ).in_bulk([application_id for _global_id, application_id, _place in parsed])
+        places = WinterStoragePlace.objects.in_bulk(
+            [place_id for _global_id, _application, place_id in parsed]
+        )
+
+        for global_id, application_id, place_id in parsed:
+            application = applications.get(application_id)
+            place = places.get(place_id)
+            try:
+                if not application:
+                    raise VenepaikkaGraphQLError(
+                        _("WinterStorageApplication matching query does not exist.")
+                    )
+                if not place:
+                    raise VenepaikkaGraphQLError(
+                        _("WinterStoragePlace matching query does not exist.")
+                    )
+                if application.area_type != ApplicationAreaType.MARKED:
+                    raise VenepaikkaGraphQLError(
+                        _("Only marked winter storage applications can be leased")
+                    )
+                if not application.customer:
+                    raise VenepaikkaGraphQLError(
+                        _("Application must be connected to an existing customer first")
+                    )
+
+                # Each lease is rolled back on its own, when it can't be created
+                with transaction.atomic():
+                    lease = _create_winter_storage_lease(
+                        {
+                            "application": application,
+                            "customer": application.customer,
+                            "boat": application.boat,
+                            "place": place,
+                        }
+                    )
+            except (
+                # The contract service requests raise OSErrors
+                DatabaseError,
+                OSError,
+                ValidationError,
+                VenepaikkaGraphQLError,
+                VenepaikkaPaymentError,
+            ) as e:
+                failed_leases.append(FailedInstanceType(id=global_id, error=str(e)))
+            else:
+                winter_storage_leases.append(lease)
+
+        return BulkCreateWinterStorageLeasesMutation(
+            winter_storage_leases=winter_storage_leases, failed_leases=failed_leases
+        )
 
 
 class UpdateWinterStorageLeaseMutation(graphene.ClientIDMutation):
@@ -565,6 +692,115 @@ class TerminateWinterStorageLeaseMutation(graphene.ClientIDMutation):
         return TerminateWinterStorageLeaseMutation(winter_storage_lease=lease)
 
 
+class AbstractTerminateLeasesMutation:
+    class Input:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+        end_date = graphene.Date(
+            description="The date which will mark the end of the leases. If none is provided, "
+            "it will be calculated for each lease like on the single lease termination"
+        )
+        profile_token = graphene.String(
+            description="To fetch the emails from Profile service in case the leases don't have an application"
+        )
+
+    failed_leases = graphene.List(
+        graphene.NonNull(FailedInstanceType),
+        required=True,
+        description="The leases that could not be terminated",
+    )
+
+    @classmethod
+    def _terminate_leases(cls, info, ids, node_type, **input):
+        lease_model = node_type._meta.model
+        lease_ids = {}
+        for global_id in ids:
+            try:
+                lease_ids[global_id] = UUID(
+                    from_global_id(global_id, node_type=node_type)
+                )
+            except (AssertionError, ValueError):
+                pass
+
+        # Resolve all the leases and the related objects used on the termination at once
+        found_leases = {
+            lease.id: lease
+            for lease in node_type.get_queryset(
+                lease_model.objects.filter(id__in=lease_ids.values())
+                .select_related("customer", "application")
+                .prefetch_related("orders"),
+                info,
+            )
+        }
+
+        profiles = None
+        if (profile_token := input.get("profile_token")) and found_leases:
+            profiles = ProfileService(profile_token).get_all_profiles(
+                list({lease.customer_id for lease in found_leases.values()})
+            )
+
+        results = terminate_leases(
+            list(found_leases.values()),
+            end_date=input.get("end_date"),
+            profiles=profiles,
+        )
+
+        terminated_leases = []
+        failed_leases = []
+        for global_id in ids:
+            lease = found_leases.get(lease_ids.get(global_id))
+            if not lease:
+                error = _(
+                    f"{lease_model._meta.object_name} matching query does not exist."
+                )
+            elif (error := results.get(lease.id)) is None:
+                terminated_leases.append(lease)
+                continue
+            failed_leases.append(FailedInstanceType(id=global_id, error=error))
+        return terminated_leases, failed_leases
+
+
+class TerminateBerthLeasesMutation(
+    AbstractTerminateLeasesMutation, graphene.ClientIDMutation
+):
+    class Input(AbstractTerminateLeasesMutation.Input):
+        pass
+
+    berth_leases = graphene.List(graphene.NonNull(BerthLeaseNode), required=True)
+
+    @classmethod
+    @change_permission_required(BerthLease)
+    @transaction.atomic
+    def mutate_and_get_payload(cls, root, info, ids, **input):
+        berth_leases, failed_leases = cls._terminate_leases(
+            info, ids, BerthLeaseNode, **input
+        )
+        return TerminateBerthLeasesMutation(
+            berth_leases=berth_leases, failed_leases=failed_leases
+        )
+
+
+class TerminateWinterStorageLeasesMutation(
+    AbstractTerminateLeasesMutation, graphene.ClientIDMutation
+):
+    class Input(AbstractTerminateLeasesMutation.Input):
+        pass
+
+    winter_storage_leases = graphene.List(
+        graphene.NonNull(WinterStorageLeaseNode), required=True
+    )
+
+    @classmethod
+    @change_permission_required(WinterStorageLease)
+    @transaction.atomic
+    def mutate_and_get_payload(cls, root, info, ids, **input):
+        winter_storage_leases, failed_leases = cls._terminate_leases(
+            info, ids, WinterStorageLeaseNode, **input
+        )
+        return TerminateWinterStorageLeasesMutation(
+            winter_storage_leases=winter_storage_leases, failed_leases=failed_leases
+        )
+
+
 class AssignNewStickerNumberMutation(graphene.ClientIDMutation):
     class Input:
         lease_id = graphene.String(required=True)
@@ -724,6 +960,16 @@ class Mutation:
         "\n* A berth lease that is not `PAID` is passed"
         "\n* The passed lease ID doesn't exist"
     )
+    terminate_berth_leases = TerminateBerthLeasesMutation.Field(
+        description="Marks the `BerthLease`s as terminated, like `terminateBerthLease`."
+        "\n\nThe leases are terminated independently, the ones that fail are returned on `failedLeases`. "
+        "The waiting orders of the leases are cancelled and the termination notices are sent to the customers."
+        "\n\n**Requires permissions** to edit leases."
+        "\n\nErrors (per lease):"
+        "\n* A lease that is not `PAID`, `OFFERED` or `ERROR` is passed"
+        "\n* The passed lease ID doesn't exist"
+        "\n* The lease has no email and no profile token was provided"
+    )
 
     create_winter_storage_lease = CreateWinterStorageLeaseMutation.Field(
         description="Creates a `WinterStorageLease` associated with the `WinterStorageApplication` "
@@ -740,6 +986,21 @@ class Mutation:
         "\n* Both `applicationId` and `customerId` are passed"
         "\n* Neither `applicationId` or `placeId` is passed"
     )
+    bulk_create_winter_storage_leases = BulkCreateWinterStorageLeasesMutation.Field(
+        description="Creates the `WinterStorageLease`s for the marked `WinterStorageApplication`s "
+        "and `WinterStoragePlace`s passed (e.g. the confirmed `winterStoragePlaceSuggestions`). "
+        "Each lease is associated with the `CustomerProfile` that owns the application, "
+        "and an `Order` is generated with it."
+        "\n\nThe leases are created independently, the ones that fail are returned on `failedLeases`."
+        "\n\n**Requires permissions** to access applications."
+        "\n\nErrors (per lease):"
+        "\n* The passed application or place doesn't exist"
+        "\n* The same application is passed more than once"
+        "\n* An application without a customer associated is passed"
+        "\n* An application that already has a lease is passed"
+        "\n* The place already has a lease or it is not active"
+        "\n* There is no `WinterStorageProduct` that can be associated to the `order`/`lease`"
+    )
     update_winter_storage_lease = UpdateWinterStorageLeaseMutation.Field(
         description="Updates a `WinterStorageLease` object."
         "\n\n**Requires permissions** to edit leases."
@@ -765,6 +1026,16 @@ class Mutation:
         "\n* A berth lease that is not `PAID` is passed"
         "\n* The passed lease ID doesn't exist"
     )
+    terminate_winter_storage_leases = TerminateWinterStorageLeasesMutation.Field(
+        description="Marks the `WinterStorageLease`s as terminated, like `terminateWinterStorageLease`."
+        "\n\nThe leases are terminated independently, the ones that fail are returned on `failedLeases`. "
+        "The waiting orders of the leases are cancelled and the termination notices are sent to the customers."
+        "\n\n**Requires permissions** to edit leases."
+        "\n\nErrors (per lease):"
+        "\n* A lease that is not `PAID`, `OFFERED` or `ERROR` is passed"
+        "\n* The passed lease ID doesn't exist"
+        "\n* The lease has no email and no profile token was provided"
+    )
     assign_new_sticker_number = AssignNewStickerNumberMutation.Field(
         description="Assigns new sticker number for an unmarked WS lease"
     )
@@ -6,6 +6,7 @@ from graphene_django.filter import DjangoFilterConnectionField
 from users.decorators import view_permission_required
 
 from ..models import BerthLease, WinterStorageLease
+from ..utils import calculate_year_date_range
 from .types import (
     BerthLeaseNode,
     LeaseStatusEnum,
@@ -52,7 +53,7 @@ class Query:
         if statuses:
             qs = qs.filter(status__in=statuses)
         if start_year:
-            qs = qs.filter(start_date__year=start_year)
+            qs = qs.filter(start_date__range=calculate_year_date_range(start_year))
 
         return gql_optimizer.query(
             qs,
@@ -66,7 +67,7 @@ class Query:
         if statuses:
             qs = qs.filter(status__in=statuses)
         if start_year:
-            qs = qs.filter(start_date__year=start_year)
+            qs = qs.filter(start_date__range=calculate_year_date_range(start_year))
 
         return gql_optimizer.query(
             qs,
@@ -75,10 +76,12 @@ class Query:
 
     @view_permission_required(BerthLease)
     def resolve_send_berth_invoice_preview(self, info, **kwargs):
-        count = BerthLease.objects.get_renewable_leases().count()
+        count = BerthLease.objects.get_renewable_leases(use_snapshot=True).count()
         return SendExistingInvoicesPreviewType(expected_leases=count)
 
     @view_permission_required(WinterStorageLease)
     def resolve_send_marked_winter_storage_invoice_preview(self, info, **kwargs):
-        count = WinterStorageLease.objects.get_renewable_marked_leases().count()
+        count = WinterStorageLease.objects.get_renewable_marked_leases(
+            use_snapshot=True
+        ).count()
         return SendExistingInvoicesPreviewType(expected_leases=count)
@@ -6,7 +6,11 @@ from payments.enums import OrderStatus
 from payments.models import BerthProduct, Order
 
 from ...models import BerthLease
-from ...utils import calculate_season_end_date, calculate_season_start_date
+from ...utils import (
+    calculate_season_end_date,
+    calculate_season_start_date,
+    calculate_year_date_range,
+)
 from .base import BaseInvoicingService
 
 
@@ -23,12 +27,14 @@ class BerthInvoicingService(BaseInvoicingService):
 
     @staticmethod
     def get_valid_leases(season_start: date) -> QuerySet:
-        return BerthLease.objects.get_renewable_leases(season_start=season_start)
+        return BerthLease.objects.get_renewable_leases(
+            season_start=season_start, use_snapshot=True
+        )
 
     @staticmethod
     def get_failed_orders(season_start: date) -> QuerySet:
         leases = BerthLease.objects.filter(
-            start_date__year=season_start.year
+            start_date__range=calculate_year_date_range(season_start.year)
         ).values_list("id")
 
         return Order.objects.filter(
@@ -10,6 +10,7 @@ from ...models import WinterStorageLease
 from ...utils import (
     calculate_winter_season_end_date,
     calculate_winter_season_start_date,
+    calculate_year_date_range,
 )
 from .base import BaseInvoicingService
 
@@ -44,12 +45,14 @@ class WinterStorageInvoicingService(BaseInvoicingService):
 
     @staticmethod
     def get_valid_leases(season_start: date) -> QuerySet:
-        return WinterStorageLease.objects.get_renewable_marked_leases(season_start)
+        return WinterStorageLease.objects.get_renewable_marked_leases(
+            season_start, use_snapshot=True
+        )
 
     @staticmethod
     def get_failed_orders(season_start: date) -> QuerySet:
         leases = WinterStorageLease.objects.filter(
-            start_date__year=season_start.year
+            start_date__range=calculate_year_date_range(season_start.year)
         ).values_list("id")
 
         return Order.objects.filter(
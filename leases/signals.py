@@ -0,0 +1,94 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from contracts.models import VismaBerthContract
+from customers.models import Boat
+from resources.counters import update_winter_storage_counters_on_commit
+
+from .consts import ACTIVE_LEASE_STATUSES
+from .models import BerthLease, WinterStorageLease
+
+
+# The leases affect the availability of the places shown on the public map
+@receiver([post_save, post_delete], sender=BerthLease)
+@receiver([post_save, post_delete], sender=WinterStorageLease)
+def invalidate_public_query_cache_handler(sender, instance, **kwargs):
+    bump_public_query_cache_version()
+
+
+# A lease can become renewable (e.g. paid or its contract signed) after the renewal
+# candidates were refreshed, and renewing it creates a lease of the customer for the
+# same berth or place, so the leases of the customer on it are checked again
+@receiver([post_save, post_delete], sender=BerthLease)
+def update_berth_renewal_candidates_handler(sender, instance, raw=False, **kwargs):
+    if not raw:
+        BerthLease.objects.update_renewal_candidates(
+            BerthLease.objects.filter(
+                berth_id=instance.berth_id, customer_id=instance.customer_id
+            )
+        )
+
+
+@receiver([post_save, post_delete], sender=VismaBerthContract)
+def update_berth_contract_renewal_candidates_handler(
+    sender, instance, raw=False, **kwargs
+):
+    if not raw and instance.lease_id:
+        BerthLease.objects.update_renewal_candidates(
+            BerthLease.objects.filter(pk=instance.lease_id)
+        )
+
+
+@receiver([post_save, post_delete], sender=WinterStorageLease)
+def update_winter_storage_renewal_candidates_handler(
+    sender, instance, raw=False, **kwargs
+):
+    # Only the leases of the marked places are renewed
+    if not raw and instance.place_id:
+        WinterStorageLease.objects.update_renewal_candidates(
+            WinterStorageLease.objects.filter(
+                place_id=instance.place_id, customer_id=instance.customer_id
+            )
+        )
+
+
+@receiver([post_save, post_delete], sender=WinterStorageLease)
+def update_winter_storage_counters_handler(sender, instance, raw=False, **kwargs):
+    # The place or section of a lease can't be changed (see WinterStorageLease.clean)
+    if raw:
+        return
+    update_winter_storage_counters_on_commit(
+        [
+            (
+                instance.place.winter_storage_section_id
+                if instance.place_id
+                else instance.section_id
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=Boat)
+def update_unmarked_allocated_area_handler(
+    sender, instance, created=False, raw=False, **kwargs
+):
+    # Only the dimensions of the boat are used for the allocated area
+    if (
+        raw
+        or created
+        or getattr(instance, "_loaded_dimensions", None)
+        == (instance.width, instance.length)
+    ):
+        return
+    update_winter_storage_counters_on_commit(
+        WinterStorageLease.objects.filter(
+            Q(boat=instance) | Q(application__boat=instance),
+            section__isnull=False,
+            status__in=ACTIVE_LEASE_STATUSES,
+        )
+        .order_by()
+        .values_list("section_id", flat=True)
+        .distinct()
+    )
@@ -1,9 +1,14 @@
+from collections import defaultdict
 from datetime import date
+from typing import Iterable, List
 
 from django.db import connection
 
+from leases.models import WinterStorageLease
 from leases.utils import calculate_winter_season_start_date
 
+STICKER_ASSIGNMENT_BATCH_SIZE = 500
+
 
 def get_next_sticker_number(lease_start: date) -> int:
     with connection.cursor() as cursor:
@@ -14,6 +19,47 @@ def get_next_sticker_number(lease_start: date) -> int:
         return cursor.fetchone()[0]
 
 
+def get_next_sticker_numbers(lease_start: date, count: int) -> List[int]:
+    """Reserve a block of sticker numbers from the season's sequence with a single query"""
+    if count <= 0:
+        return []
+
+    with connection.cursor() as cursor:
+        sticker_season = get_ws_sticker_season(lease_start)
+        sequence_name = "ws_stickers_" + sticker_season
+
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)", [sequence_name, count]
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def assign_sticker_numbers(
+    leases: Iterable[WinterStorageLease],
+    batch_size: int = STICKER_ASSIGNMENT_BATCH_SIZE,
+) -> List[WinterStorageLease]:
+    """Assign new sticker numbers for the leases in bulk
+
+    The numbers are reserved per sticker season and written with bulk_update,
+    so the leases are not validated nor saved one by one.
+    """
+    leases_by_season = defaultdict(list)
+    for lease in leases:
+        leases_by_season[get_ws_sticker_season(lease.start_date)].append(lease)
+
+    updated_leases = []
+    for season_leases in leases_by_season.values():
+        for i in range(0, len(season_leases), batch_size):
+            batch = season_leases[i : i + batch_size]
+            numbers = get_next_sticker_numbers(batch[0].start_date, len(batch))
+            for lease, sticker_number in zip(batch, numbers):
+                lease.sticker_number = sticker_number
+            WinterStorageLease.objects.bulk_update(batch, ["sticker_number"])
+            updated_leases.extend(batch)
+
+    return updated_leases
+
+
 def get_ws_sticker_season(lease_start: date) -> str:
     start_date = calculate_winter_season_start_date(lease_start)
     start_year = start_date.year
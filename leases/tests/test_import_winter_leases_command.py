@@ -0,0 +1,97 @@
+import csv
+from unittest import mock
+
+from django.core.management import call_command
+
+from customers.exceptions import MultipleProfilesException, NoProfilesException
+from customers.models import CustomerProfile
+from customers.services import HelsinkiProfileUser, ProfileService
+from customers.tests.factories import BoatFactory
+from resources.tests.factories import BoatTypeFactory, WinterStoragePlaceFactory
+
+from ..enums import LeaseStatus
+from ..models import WinterStorageLease
+
+
+def _write_lease_file(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(rows)
+
+
+def _read_report(path):
+    with open(path, encoding="utf-8") as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_import_winter_leases_from_csv(tmp_path, monkeypatch, customer_profile):
+    monkeypatch.chdir(tmp_path)
+    other_boat_type = BoatTypeFactory(id=9)
+    place_1 = WinterStoragePlaceFactory(number=1)
+    place_2 = WinterStoragePlaceFactory(
+        number=2, winter_storage_section=place_1.winter_storage_section
+    )
+    place_3 = WinterStoragePlaceFactory(
+        number=3, winter_storage_section=place_1.winter_storage_section
+    )
+    existing_boat = BoatFactory(owner=customer_profile, registration_number="A123")
+    section_id = str(place_1.winter_storage_section.id)
+
+    lease_file = tmp_path / "leases.csv"
+    _write_lease_file(
+        lease_file,
+        [
+            # The same customer is listed twice
+            [section_id, "1", "DOE JOHN", "john@example.com", "", "2,5", "6", "", ""],
+            [section_id, "2", "DOE JOHN", "JOHN@example.com", "", "2,5", "6", "", ""],
+            [section_id, "3", "EXISTING JANE", "", "", "", "", "A123", "Comment"],
+            [section_id, "4", "EXISTING JANE", "", "", "", "", "A123", ""],
+            [section_id, "3", "MANY MATT", "", "", "", "", "", ""],
+        ],
+    )
+
+    def find_profile(first_name, last_name, email, phone, **kwargs):
+        if first_name == "Jane":
+            return HelsinkiProfileUser(id=customer_profile.id)
+        if first_name == "Matt":
+            raise MultipleProfilesException(ids=["1", "2"])
+        raise NoProfilesException
+
+    def create_profile(first_name, last_name, email=None, phone=None):
+        return CustomerProfile.objects.create(comment=f"{first_name} {last_name}")
+
+    with mock.patch.object(
+        ProfileService, "find_profile", side_effect=find_profile
+    ) as mock_find_profile, mock.patch.object(
+        ProfileService, "create_profile", side_effect=create_profile
+    ) as mock_create_profile:
+        call_command(
+            "import_winter_leases_from_csv",
+            "--profile-token=token",
+            f"--lease-file-path={lease_file}",
+        )
+
+    # Each unique customer is looked up only once
+    assert mock_find_profile.call_count == 3
+    assert mock_create_profile.call_count == 1
+
+    new_customer = CustomerProfile.objects.get(comment="John Doe")
+    new_customer_leases = WinterStorageLease.objects.filter(customer=new_customer)
+    assert {lease.place for lease in new_customer_leases} == {place_1, place_2}
+    assert new_customer.boats.count() == 1
+    boat = new_customer.boats.get()
+    assert boat.boat_type == other_boat_type
+    assert all(lease.boat == boat for lease in new_customer_leases)
+
+    lease = WinterStorageLease.objects.get(customer=customer_profile)
+    assert lease.place == place_3
+    assert lease.boat == existing_boat
+    assert lease.status == LeaseStatus.PAID
+    assert lease.comment.startswith("Comment\n")
+
+    assert len(_read_report(tmp_path / "successful_leases.csv")) == 3
+    assert _read_report(tmp_path / "multiple_profiles.csv") == [
+        [section_id, "3", "MANY MATT", "1;2"]
+    ]
+    assert _read_report(tmp_path / "failed_leases.csv") == [
+        [section_id, "4", "EXISTING JANE", "WinterStoragePlace does not exist"]
+    ]
@@ -10,6 +10,7 @@ from applications.tests.factories import (
     WinterStorageApplicationFactory,
 )
 from berth_reservations.tests.factories import CustomerProfileFactory
+from contracts.tests.factories import BerthContractFactory
 from customers.tests.factories import BoatFactory
 
 from ..consts import ACTIVE_LEASE_STATUSES
@@ -17,12 +18,17 @@ from ..enums import LeaseStatus
 from ..models import (
     BerthLease,
     BerthLeaseChange,
+    BerthLeaseRenewalCandidate,
     calculate_berth_lease_end_date,
     calculate_berth_lease_start_date,
     WinterStorageLease,
     WinterStorageLeaseChange,
+    WinterStorageLeaseRenewalCandidate,
 )
+from ..services import BerthInvoicingService, WinterStorageInvoicingService
 from ..utils import (
+    calculate_season_end_date,
+    calculate_season_start_date,
     calculate_winter_storage_lease_end_date,
     calculate_winter_storage_lease_start_date,
 )
@@ -511,3 +517,139 @@ def test_winter_storage_lease_one_year_no_error():
     WinterStorageLeaseFactory(start_date="2020-01-01", end_date="2021-01-01")
 
     assert WinterStorageLease.objects.count() == 1
+
+
+def _paid_lease_with_contract(**lease_kwargs):
+    lease = BerthLeaseFactory(status=LeaseStatus.PAID, **lease_kwargs)
+    contract = BerthContractFactory(lease=None)
+    contract.lease = lease
+    contract.save()
+    return lease
+
+
+@freeze_time("2020-01-01T08:00:00Z")
+def test_berth_lease_renewal_candidates_snapshot():
+    last_season = {
+        "start_date": calculate_season_start_date(date(2019, 1, 1)),
+        "end_date": calculate_season_end_date(date(2019, 1, 1)),
+    }
+    lease = _paid_lease_with_contract(**last_season)
+
+    assert BerthLease.objects.refresh_renewal_candidates() == 1
+    assert BerthLeaseRenewalCandidate.objects.get().lease == lease
+
+    assert list(BerthLease.objects.get_renewable_leases(use_snapshot=True)) == [lease]
+
+    # Leases that have been renewed after the snapshot are not renewed twice
+    BerthLease.objects.create(
+        customer=lease.customer,
+        berth=lease.berth,
+        start_date=calculate_season_start_date(),
+        end_date=calculate_season_end_date(),
+    )
+    assert BerthLeaseRenewalCandidate.objects.count() == 0
+    assert BerthLease.objects.get_renewable_leases(use_snapshot=True).count() == 0
+
+    assert BerthLease.objects.refresh_renewal_candidates() == 0
+    assert BerthLeaseRenewalCandidate.objects.count() == 0
+
+
+@freeze_time("2020-01-01T08:00:00Z")
+def test_berth_lease_renewal_candidates_read_from_snapshot(
+    django_assert_num_queries,
+):
+    last_season = {
+        "start_date": calculate_season_start_date(date(2019, 1, 1)),
+        "end_date": calculate_season_end_date(date(2019, 1, 1)),
+    }
+    lease = _paid_lease_with_contract(**last_season)
+    other_lease = _paid_lease_with_contract(**last_season)
+    assert BerthLease.objects.refresh_renewal_candidates() == 2
+
+    # Drop a candidate behind the back of the snapshot, to check it's the source
+    BerthLeaseRenewalCandidate.objects.filter(lease=other_lease).delete()
+
+    # The candidate ids and the leases
+    with django_assert_num_queries(2):
+        assert list(BerthLease.objects.get_renewable_leases(use_snapshot=True)) == [
+            lease
+        ]
+    assert list(
+        BerthInvoicingService.get_valid_leases(calculate_season_start_date())
+    ) == [lease]
+
+
+@freeze_time("2020-01-01T08:00:00Z")
+def test_berth_lease_renewal_candidates_updated_when_leases_change():
+    last_season = {
+        "start_date": calculate_season_start_date(date(2019, 1, 1)),
+        "end_date": calculate_season_end_date(date(2019, 1, 1)),
+    }
+    lease = _paid_lease_with_contract(**last_season)
+    other_lease = _paid_lease_with_contract(**last_season)
+    assert BerthLease.objects.refresh_renewal_candidates() == 2
+
+    # The contract is signed after the snapshot was taken
+    new_lease = _paid_lease_with_contract(**last_season)
+
+    assert set(
+        BerthLeaseRenewalCandidate.objects.values_list("lease_id", flat=True)
+    ) == {lease.id, other_lease.id, new_lease.id}
+    assert set(BerthLease.objects.get_renewable_leases(use_snapshot=True)) == {
+        lease,
+        other_lease,
+        new_lease,
+    }
+
+    # Only the candidate of the changed lease is dropped
+    other_lease.status = LeaseStatus.ERROR
+    other_lease.save()
+
+    assert set(
+        BerthLeaseRenewalCandidate.objects.values_list("lease_id", flat=True)
+    ) == {lease.id, new_lease.id}
+    assert set(
+        BerthInvoicingService.get_valid_leases(calculate_season_start_date())
+    ) == {lease, new_lease}
+
+
+@freeze_time("2019-10-01T08:00:00Z")
+def test_winter_storage_lease_renewable_after_snapshot_is_invoiced():
+    season_start = date(2019, 9, 15)
+    lease_dates = {"start_date": season_start, "end_date": date(2020, 6, 10)}
+    lease = WinterStorageLeaseFactory(status=LeaseStatus.PAID, **lease_dates)
+    new_lease = WinterStorageLeaseFactory(status=LeaseStatus.OFFERED, **lease_dates)
+
+    assert WinterStorageLease.objects.refresh_renewal_candidates(season_start) == 1
+    assert WinterStorageLeaseRenewalCandidate.objects.get().lease == lease
+
+    # The lease is paid after the snapshot was taken
+    new_lease.status = LeaseStatus.PAID
+    new_lease.save()
+
+    assert WinterStorageLeaseRenewalCandidate.objects.count() == 2
+    assert set(WinterStorageInvoicingService.get_valid_leases(season_start)) == {
+        lease,
+        new_lease,
+    }
+    assert (
+        WinterStorageLease.objects.get_renewable_marked_leases(
+            season_start, use_snapshot=True
+        ).count()
+        == 2
+    )
+
+
+@freeze_time("2020-01-01T08:00:00Z")
+def test_berth_lease_renewal_candidates_other_season_not_used():
+    last_season = {
+        "start_date": calculate_season_start_date(date(2019, 1, 1)),
+        "end_date": calculate_season_end_date(date(2019, 1, 1)),
+    }
+    lease = _paid_lease_with_contract(**last_season)
+    _paid_lease_with_contract(**last_season)
+    BerthLeaseRenewalCandidate.objects.create(
+        lease=lease, season_start=date(2019, 6, 10)
+    )
+
+    assert BerthLease.objects.get_renewable_leases(use_snapshot=True).count() == 2
@@ -7,10 +7,11 @@ from babel.dates import format_date
 from dateutil.relativedelta import relativedelta
 from dateutil.utils import today
 from django.core import mail
+from django.utils import timezone
 from freezegun import freeze_time
 from requests import Session
 
-from applications.enums import ApplicationStatus
+from applications.enums import ApplicationAreaType, ApplicationStatus
 from applications.schema import BerthApplicationNode, WinterStorageApplicationNode
 from applications.tests.factories import (
     BerthApplicationFactory,
@@ -23,10 +24,11 @@ from berth_reservations.tests.utils import (
 )
 from contracts.models import BerthContract, WinterStorageContract
 from contracts.schema.types import BerthContractNode
+from contracts.services import get_contract_service
 from contracts.tests.factories import BerthContractFactory
 from customers.schema import BoatNode, ProfileNode
 from customers.tests.conftest import mocked_response_profile
-from customers.tests.factories import BoatFactory
+from customers.tests.factories import BoatFactory, CustomerProfileFactory
 from payments.enums import OrderStatus
 from payments.models import BerthProduct, Order
 from payments.schema import BerthProductNode
@@ -34,7 +36,11 @@ from payments.tests.factories import BerthProductFactory, WinterStorageProductFa
 from payments.tests.utils import get_berth_lease_pricing_category
 from resources.enums import BerthMooringType
 from resources.schema import BerthNode, WinterStoragePlaceNode, WinterStorageSectionNode
-from resources.tests.factories import BerthFactory, BoatTypeFactory
+from resources.tests.factories import (
+    BerthFactory,
+    BoatTypeFactory,
+    WinterStoragePlaceFactory,
+)
 from utils.numbers import rounded
 from utils.relay import to_global_id
 
@@ -2064,6 +2070,215 @@ def test_create_winter_storage_lease_no_contract_for_non_billable_customer(
     assert not hasattr(lease, "contract")
 
 
+BULK_CREATE_WINTER_STORAGE_LEASES_MUTATION = """
+mutation BulkCreateWinterStorageLeases($input: BulkCreateWinterStorageLeasesMutationInput!) {
+    bulkCreateWinterStorageLeases(input: $input) {
+        winterStorageLeases {
+            place {
+                id
+            }
+            application {
+                id
+                status
+            }
+            order {
+                id
+            }
+        }
+        failedLeases {
+            id
+            error
+        }
+    }
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services", "berth_handler"],
+    indirect=True,
+)
+def test_bulk_create_winter_storage_leases(api_client, winter_storage_section):
+    create_winter_storage_product(winter_storage_section.area)
+    applications = WinterStorageApplicationFactory.create_batch(
+        2, customer=CustomerProfileFactory(), area_type=ApplicationAreaType.MARKED
+    )
+    places = WinterStoragePlaceFactory.create_batch(
+        2, winter_storage_section=winter_storage_section
+    )
+    proposals = [
+        {
+            "applicationId": to_global_id(WinterStorageApplicationNode, application.id),
+            "placeId": to_global_id(WinterStoragePlaceNode, place.id),
+        }
+        for application, place in zip(applications, places)
+    ]
+
+    executed = api_client.execute(
+        BULK_CREATE_WINTER_STORAGE_LEASES_MUTATION, input={"leases": proposals}
+    )
+
+    assert WinterStorageLease.objects.count() == 2
+    result = executed["data"]["bulkCreateWinterStorageLeases"]
+    assert result["failedLeases"] == []
+    assert [
+        (lease["application"]["id"], lease["place"]["id"])
+        for lease in result["winterStorageLeases"]
+    ] == [(proposal["applicationId"], proposal["placeId"]) for proposal in proposals]
+    for lease in result["winterStorageLeases"]:
+        assert lease["application"]["status"] == ApplicationStatus.OFFER_GENERATED.name
+        assert lease["order"] is not None
+
+
+def test_bulk_create_winter_storage_leases_failed_leases(
+    superuser_api_client, winter_storage_section
+):
+    create_winter_storage_product(winter_storage_section.area)
+    application = WinterStorageApplicationFactory(
+        customer=CustomerProfileFactory(), area_type=ApplicationAreaType.MARKED
+    )
+    application_without_customer = WinterStorageApplicationFactory(
+        area_type=ApplicationAreaType.MARKED
+    )
+    unmarked_application = WinterStorageApplicationFactory(
+        customer=CustomerProfileFactory(), area_type=ApplicationAreaType.UNMARKED
+    )
+    place, other_place = WinterStoragePlaceFactory.create_batch(
+        2, winter_storage_section=winter_storage_section
+    )
+    application_id = to_global_id(WinterStorageApplicationNode, application.id)
+    application_without_customer_id = to_global_id(
+        WinterStorageApplicationNode, application_without_customer.id
+    )
+    unmarked_application_id = to_global_id(
+        WinterStorageApplicationNode, unmarked_application.id
+    )
+    missing_application_id = to_global_id(WinterStorageApplicationNode, randint(0, 999))
+
+    executed = superuser_api_client.execute(
+        BULK_CREATE_WINTER_STORAGE_LEASES_MUTATION,
+        input={
+            "leases": [
+                {
+                    "applicationId": application_id,
+                    "placeId": to_global_id(WinterStoragePlaceNode, place.id),
+                },
+                {
+                    "applicationId": application_without_customer_id,
+                    "placeId": to_global_id(WinterStoragePlaceNode, other_place.id),
+                },
+                {
+                    "applicationId": missing_application_id,
+                    "placeId": to_global_id(WinterStoragePlaceNode, other_place.id),
+                },
+                {
+                    "applicationId": unmarked_application_id,
+                    "placeId": to_global_id(WinterStoragePlaceNode, other_place.id),
+                },
+            ]
+        },
+    )
+
+    result = executed["data"]["bulkCreateWinterStorageLeases"]
+    assert [lease["application"]["id"] for lease in result["winterStorageLeases"]] == [
+        application_id
+    ]
+    assert result["failedLeases"] == [
+        {
+            "id": application_without_customer_id,
+            "error": "Application must be connected to an existing customer first",
+        },
+        {
+            "id": missing_application_id,
+            "error": "WinterStorageApplication matching query does not exist.",
+        },
+        {
+            "id": unmarked_application_id,
+            "error": "Only marked winter storage applications can be leased",
+        },
+    ]
+    assert WinterStorageLease.objects.count() == 1
+
+
+def test_bulk_create_winter_storage_leases_contract_service_error(
+    superuser_api_client, winter_storage_section
+):
+    create_winter_storage_product(winter_storage_section.area)
+    applications = WinterStorageApplicationFactory.create_batch(
+        2, customer=CustomerProfileFactory(), area_type=ApplicationAreaType.MARKED
+    )
+    places = WinterStoragePlaceFactory.create_batch(
+        2, winter_storage_section=winter_storage_section
+    )
+    application_ids = [
+        to_global_id(WinterStorageApplicationNode, application.id)
+        for application in applications
+    ]
+    contract_service_class = type(get_contract_service())
+    create_contract = contract_service_class.create_winter_storage_contract
+
+    def _create_contract(lease):
+        if lease.application == applications[0]:
+            raise ConnectionError("Contract service unavailable")
+        return create_contract(contract_service_class(), lease)
+
+    with mock.patch.object(
+        contract_service_class,
+        "create_winter_storage_contract",
+        side_effect=_create_contract,
+    ):
+        executed = superuser_api_client.execute(
+            BULK_CREATE_WINTER_STORAGE_LEASES_MUTATION,
+            input={
+                "leases": [
+                    {
+                        "applicationId": application_id,
+                        "placeId": to_global_id(WinterStoragePlaceNode, place.id),
+                    }
+                    for application_id, place in zip(application_ids, places)
+                ]
+            },
+        )
+
+    # The failed lease is rolled back and the rest are still created
+    result = executed["data"]["bulkCreateWinterStorageLeases"]
+    assert result["failedLeases"] == [
+        {"id": application_ids[0], "error": "Contract service unavailable"}
+    ]
+    assert [lease["application"]["id"] for lease in result["winterStorageLeases"]] == [
+        application_ids[1]
+    ]
+    assert WinterStorageLease.objects.get().application == applications[1]
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["api_client", "user", "harbor_services", "berth_supervisor"],
+    indirect=True,
+)
+def test_bulk_create_winter_storage_leases_not_enough_permissions(
+    api_client, winter_storage_application, winter_storage_place
+):
+    executed = api_client.execute(
+        BULK_CREATE_WINTER_STORAGE_LEASES_MUTATION,
+        input={
+            "leases": [
+                {
+                    "applicationId": to_global_id(
+                        WinterStorageApplicationNode, winter_storage_application.id
+                    ),
+                    "placeId": to_global_id(
+                        WinterStoragePlaceNode, winter_storage_place.id
+                    ),
+                }
+            ]
+        },
+    )
+
+    assert_not_enough_permissions(executed)
+
+
 TERMINATE_BERTH_LEASE_MUTATION = """
 mutation TERMINATE_BERTH_LEASE($input: TerminateBerthLeaseMutationInput!) {
     terminateBerthLease(input: $input) {
@@ -2363,6 +2578,96 @@ def test_terminate_berth_lease_before_season(api_client):
     assert Berth.objects.get(id=berth_lease.berth_id).is_available
 
 
+TERMINATE_BERTH_LEASES_MUTATION = """
+mutation TERMINATE_BERTH_LEASES($input: TerminateBerthLeasesMutationInput!) {
+    terminateBerthLeases(input: $input) {
+        berthLeases {
+            id
+            status
+        }
+        failedLeases {
+            id
+            error
+        }
+    }
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services", "berth_handler"],
+    indirect=True,
+)
+def test_terminate_berth_leases(
+    api_client, offered_berth_order, notification_template_berth_lease_terminated
+):
+    paid_lease = BerthLeaseFactory(
+        status=LeaseStatus.PAID,
+        application=BerthApplicationFactory(email="foo@email.com", language="fi"),
+    )
+    drafted_lease = BerthLeaseFactory(status=LeaseStatus.DRAFTED)
+    offered_lease_id = to_global_id(BerthLeaseNode, offered_berth_order.lease.id)
+    paid_lease_id = to_global_id(BerthLeaseNode, paid_lease.id)
+    drafted_lease_id = to_global_id(BerthLeaseNode, drafted_lease.id)
+    nonexistent_lease_id = to_global_id(BerthLeaseNode, uuid.uuid4())
+    terminated_at = timezone.now()
+
+    executed = api_client.execute(
+        TERMINATE_BERTH_LEASES_MUTATION,
+        input={
+            "ids": [
+                offered_lease_id,
+                paid_lease_id,
+                drafted_lease_id,
+                nonexistent_lease_id,
+            ]
+        },
+    )
+
+    payload = executed["data"]["terminateBerthLeases"]
+    assert payload["berthLeases"] == [
+        {"id": offered_lease_id, "status": LeaseStatus.TERMINATED.name},
+        {"id": paid_lease_id, "status": LeaseStatus.TERMINATED.name},
+    ]
+    assert [failed["id"] for failed in payload["failedLeases"]] == [
+        drafted_lease_id,
+        nonexistent_lease_id,
+    ]
+    assert (
+        "Only leases in paid, error or offered status can be terminated, "
+        "current status is drafted" in payload["failedLeases"][0]["error"]
+    )
+    assert (
+        "BerthLease matching query does not exist."
+        in payload["failedLeases"][1]["error"]
+    )
+    offered_berth_order.refresh_from_db()
+    assert offered_berth_order.status == OrderStatus.CANCELLED
+    assert offered_berth_order.modified_at >= terminated_at
+    assert offered_berth_order.log_entries.filter(
+        from_status=OrderStatus.OFFERED, to_status=OrderStatus.CANCELLED
+    ).exists()
+    drafted_lease.refresh_from_db()
+    assert drafted_lease.status == LeaseStatus.DRAFTED
+    assert len(mail.outbox) == 2
+    assert ["foo@email.com"] in [email.to for email in mail.outbox]
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["api_client", "user", "harbor_services", "berth_supervisor"],
+    indirect=True,
+)
+def test_terminate_berth_leases_not_enough_permissions(api_client, berth_lease):
+    executed = api_client.execute(
+        TERMINATE_BERTH_LEASES_MUTATION,
+        input={"ids": [to_global_id(BerthLeaseNode, berth_lease.id)]},
+    )
+
+    assert_not_enough_permissions(executed)
+
+
 TERMINATE_WINTER_STORAGE_LEASE_MUTATION = """
 mutation TERMINATE_WINTER_STORAGE_LEASE_MUTATION($input: TerminateWinterStorageLeaseMutationInput!) {
     terminateWinterStorageLease(input: $input) {
@@ -2617,3 +2922,87 @@ def test_terminate_ws_lease_before_season(api_client):
         "endDate": str(start_date),
     }
     assert WinterStoragePlace.objects.get(id=ws_lease.place_id).is_available
+
+
+TERMINATE_WINTER_STORAGE_LEASES_MUTATION = """
+mutation TERMINATE_WINTER_STORAGE_LEASES($input: TerminateWinterStorageLeasesMutationInput!) {
+    terminateWinterStorageLeases(input: $input) {
+        winterStorageLeases {
+            id
+            status
+            endDate
+        }
+        failedLeases {
+            id
+            error
+        }
+    }
+}
+"""
+
+
+@freeze_time("2020-07-01T08:00:00Z")
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services", "berth_handler"],
+    indirect=True,
+)
+def test_terminate_winter_storage_leases_with_profile_token(
+    api_client, notification_template_ws_lease_terminated
+):
+    ws_lease = WinterStorageLeaseFactory(
+        start_date=today() - relativedelta(weeks=1),
+        end_date=today() + relativedelta(weeks=1),
+        status=LeaseStatus.PAID,
+        application=None,
+    )
+    # No email on the lease nor on the profile
+    ws_lease_without_email = WinterStorageLeaseFactory(
+        start_date=today() - relativedelta(weeks=1),
+        end_date=today() + relativedelta(weeks=1),
+        status=LeaseStatus.PAID,
+        application=None,
+    )
+    ws_lease_id = to_global_id(WinterStorageLeaseNode, ws_lease.id)
+    ws_lease_without_email_id = to_global_id(
+        WinterStorageLeaseNode, ws_lease_without_email.id
+    )
+    data = {
+        "id": to_global_id(ProfileNode, ws_lease.customer.id),
+        "primary_email": {"email": "foo@email.com"},
+        "primary_phone": {},
+    }
+
+    with mock.patch.object(
+        Session,
+        "post",
+        side_effect=mocked_response_profile(count=0, data=data, use_edges=True),
+    ) as mock_post:
+        executed = api_client.execute(
+            TERMINATE_WINTER_STORAGE_LEASES_MUTATION,
+            input={
+                "ids": [ws_lease_id, ws_lease_without_email_id],
+                "profileToken": "profile_token",
+            },
+        )
+
+    # The profiles are fetched in a single request
+    assert mock_post.call_count == 1
+    payload = executed["data"]["terminateWinterStorageLeases"]
+    assert payload["winterStorageLeases"] == [
+        {
+            "id": ws_lease_id,
+            "status": LeaseStatus.TERMINATED.name,
+            "endDate": str(today().date()),
+        }
+    ]
+    assert len(payload["failedLeases"]) == 1
+    assert payload["failedLeases"][0]["id"] == ws_lease_without_email_id
+    assert (
+        "The lease has no email and no profile token was provided"
+        in payload["failedLeases"][0]["error"]
+    )
+    ws_lease_without_email.refresh_from_db()
+    assert ws_lease_without_email.status == LeaseStatus.PAID
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["foo@email.com"]
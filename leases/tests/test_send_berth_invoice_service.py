@@ -683,3 +683,41 @@ def test_non_invoiceable_berth(notification_template_orders_approved):
     order = Order.objects.first()
     assert order.id == invoicing_service.successful_orders[0]
     assert order.product == expected_product
+
+
+@freeze_time("2020-01-01T08:00:00Z")
+def test_send_berth_invoices_lease_renewable_after_snapshot(
+    notification_template_orders_approved,
+):
+    last_season = {
+        "boat": None,
+        "status": LeaseStatus.PAID,
+        "start_date": calculate_season_start_date(today() - relativedelta(years=1)),
+        "end_date": calculate_season_end_date(today() - relativedelta(years=1)),
+    }
+    leases = [_lease_with_contract(**last_season)]
+    assert BerthLease.objects.refresh_renewal_candidates() == 1
+
+    # The lease becomes renewable once the contract is signed after the refresh
+    leases.append(_lease_with_contract(**last_season))
+
+    data = []
+    for lease in leases:
+        user = UserFactory()
+        data.append(
+            {
+                "id": to_global_id(ProfileNode, lease.customer.id),
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "primary_email": {"email": user.email},
+                "primary_phone": {"phone": faker.phone_number()},
+            }
+        )
+
+    invoicing_service = _send_invoices(data)
+
+    assert len(invoicing_service.successful_orders) == 2
+    assert len(invoicing_service.failed_leases) == 0
+    assert {order.customer for order in Order.objects.all()} == {
+        lease.customer for lease in leases
+    }
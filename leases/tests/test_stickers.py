@@ -1,6 +1,13 @@
 from datetime import date
 
-from leases.stickers import get_next_sticker_number, get_ws_sticker_season
+from leases.models import WinterStorageLease
+from leases.stickers import (
+    assign_sticker_numbers,
+    get_next_sticker_number,
+    get_next_sticker_numbers,
+    get_ws_sticker_season,
+)
+from leases.tests.factories import WinterStorageLeaseFactory
 
 
 def test_get_ws_sticker_season():
@@ -18,3 +25,35 @@ def test_get_next_sticker_number(sticker_sequences):
     lease_start = date(year=2023, month=9, day=10)
     assert get_next_sticker_number(lease_start) == 1
     assert get_next_sticker_number(lease_start) == 2
+
+
+def test_get_next_sticker_numbers(sticker_sequences):
+    lease_start = date(year=2020, month=9, day=10)
+    assert get_next_sticker_numbers(lease_start, 3) == [1, 2, 3]
+    assert get_next_sticker_number(lease_start) == 4
+    assert get_next_sticker_numbers(lease_start, 0) == []
+
+
+def test_assign_sticker_numbers(sticker_sequences, django_assert_num_queries):
+    leases_2020 = [
+        WinterStorageLeaseFactory(
+            start_date=date(year=2020, month=9, day=15),
+            end_date=date(year=2021, month=6, day=10),
+        )
+        for _i in range(3)
+    ]
+    lease_2021 = WinterStorageLeaseFactory(
+        start_date=date(year=2021, month=9, day=15),
+        end_date=date(year=2022, month=6, day=10),
+    )
+
+    # One reservation and one update per season and batch
+    with django_assert_num_queries(6):
+        assign_sticker_numbers(leases_2020 + [lease_2021], batch_size=2)
+
+    assert [
+        WinterStorageLease.objects.get(pk=lease.pk).sticker_number
+        for lease in leases_2020
+    ] == [1, 2, 3]
+    lease_2021.refresh_from_db()
+    assert lease_2021.sticker_number == 1
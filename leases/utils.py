@@ -1,26 +1,35 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Tuple, TYPE_CHECKING, Union
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+from uuid import UUID
 
+from anymail.exceptions import AnymailError
 from babel.dates import format_date
 from dateutil.relativedelta import relativedelta
 from dateutil.utils import today
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_ilmoitin.utils import send_notification
 
 from berth_reservations.exceptions import VenepaikkaGraphQLError
-from customers.services import ProfileService
+from berth_reservations.translated_names import translated_names
+from customers.services import HelsinkiProfileUser, ProfileService
 from payments.enums import OrderStatus
+from payments.exceptions import OrderStatusTransitionError
 from utils.email import is_valid_email
+from utils.messaging import queue_notification, send_queued_notifications
 
 from .consts import TERMINABLE_STATUSES
 from .enums import LeaseStatus
 
 if TYPE_CHECKING:
     from leases.models import BerthLease, WinterStorageLease
+    from leases.notifications import NotificationType
+    from payments.models import Order
     from resources.models import Berth
 
 
@@ -76,6 +85,16 @@ def calculate_prev_season_end_date() -> date:
     return date(day=14, month=9, year=today.year - 1)
 
 
+def calculate_year_date_range(year: Union[int, str]) -> Tuple[date, date]:
+    """Return the first and the last day of the year
+
+    Filtering the lease dates with a range (instead of ``__year``) keeps
+    the filters usable by the composite (status, start_date, end_date) indexes.
+    """
+    year = int(year)
+    return date(year, 1, 1), date(year, 12, 31)
+
+
 def calculate_winter_season_start_date(lease_start: date = None) -> date:
     """Return the date when the winter season starts
 
@@ -199,15 +218,42 @@ def calculate_lease_termination_date(
     return calculate_winter_season_end_date(lease.start_date)
 
 
-def terminate_lease(
-    lease: Union[BerthLease, WinterStorageLease],
-    end_date: date = None,
-    profile_token: str = None,
-    send_notice: bool = True,
-) -> Union[BerthLease, WinterStorageLease]:
+def _get_terminated_lease_notice(
+    lease: Union[BerthLease, WinterStorageLease], email: Optional[str]
+) -> Tuple[str, NotificationType, dict, str]:
+    """Return the email, notification type, context and language of the notice"""
     from .models import BerthLease
     from .notifications import NotificationType
 
+    language = (
+        lease.application.language if lease.application else settings.LANGUAGES[0][0]
+    )
+
+    if not email and lease.application:
+        email = lease.application.email
+
+    if not email:
+        raise ValidationError(
+            _("The lease has no email and no profile token was provided")
+        )
+
+    if not is_valid_email(email):
+        raise ValidationError(_("Missing customer email"))
+
+    notification_type = (
+        NotificationType.BERTH_LEASE_TERMINATED_LEASE_NOTICE
+        if isinstance(lease, BerthLease)
+        else NotificationType.WINTER_STORAGE_LEASE_TERMINATED_LEASE_NOTICE
+    )
+    context = {
+        "subject": notification_type.label,
+        "cancelled_at": format_date(today(), locale="fi"),
+        "lease": lease,
+    }
+    return email, notification_type, context, language
+
+
+def _check_lease_can_be_terminated(lease: Union[BerthLease, WinterStorageLease]):
     if lease.status not in TERMINABLE_STATUSES:
         raise ValidationError(
             _(
@@ -215,6 +261,15 @@ def terminate_lease(
             )
         )
 
+
+def terminate_lease(
+    lease: Union[BerthLease, WinterStorageLease],
+    end_date: date = None,
+    profile_token: str = None,
+    send_notice: bool = True,
+) -> Union[BerthLease, WinterStorageLease]:
+    _check_lease_can_be_terminated(lease)
+
     for order in lease.orders.all():
         if order.status in OrderStatus.get_waiting_statuses():
             order.set_status(OrderStatus.CANCELLED, _("Lease was terminated"))
@@ -224,12 +279,6 @@ def terminate_lease(
     lease.save()
 
     if send_notice:
-        language = (
-            lease.application.language
-            if lease.application
-            else settings.LANGUAGES[0][0]
-        )
-
         email = None
 
         if profile_token:
@@ -237,35 +286,107 @@ def terminate_lease(
             profile = profile_service.get_profile(lease.customer.id)
             email = profile.email
 
-        if not email and lease.application:
-            email = lease.application.email
+        email, notification_type, context, language = _get_terminated_lease_notice(
+            lease, email
+        )
+        send_notification(email, notification_type, context, language=language)
 
-        if not email:
-            raise ValidationError(
-                _("The lease has no email and no profile token was provided")
-            )
+    return lease
 
-        if not is_valid_email(email):
-            raise ValidationError(_("Missing customer email"))
 
-        notification_type = (
-            NotificationType.BERTH_LEASE_TERMINATED_LEASE_NOTICE
-            if isinstance(lease, BerthLease)
-            else NotificationType.WINTER_STORAGE_LEASE_TERMINATED_LEASE_NOTICE
-        )
+def _cancel_terminated_lease_orders(orders: List[Order]) -> None:
+    """Cancel the waiting orders with one update and bulk create their log entries"""
+    from payments.models import Order, OrderLogEntry
 
-        send_notification(
-            email,
-            notification_type,
-            {
-                "subject": notification_type.label,
-                "cancelled_at": format_date(today(), locale="fi"),
-                "lease": lease,
-            },
-            language=language,
-        )
+    if not orders:
+        return
 
-    return lease
+    # update() skips the auto_now of modified_at
+    modified_at = timezone.now()
+    Order.objects.filter(id__in=[order.id for order in orders]).update(
+        status=OrderStatus.CANCELLED, modified_at=modified_at
+    )
+    OrderLogEntry.objects.bulk_create(
+        [
+            OrderLogEntry(
+                order=order,
+                from_status=order.status,
+                to_status=OrderStatus.CANCELLED,
+                comment=_("Lease was terminated"),
+            )
+            for order in orders
+        ]
+    )
+    for order in orders:
+        order.status = OrderStatus.CANCELLED
+        order.modified_at = modified_at
+
+
+def terminate_leases(
+    leases: List[Union[BerthLease, WinterStorageLease]],
+    end_date: date = None,
+    profiles: Optional[Dict[UUID, HelsinkiProfileUser]] = None,
+    send_notice: bool = True,
+) -> Dict[UUID, Optional[str]]:
+    """
+    Terminate the leases and return the error of each lease (None if it was terminated).
+
+    The leases should have their orders and application prefetched. The waiting
+    orders of all the terminated leases are cancelled at once, and the notices
+    are queued while terminating the leases and sent together at the end.
+    If profiles is passed, the notices are sent to the email of the customer profile.
+    """
+    results = {}
+    orders_to_cancel = []
+
+    for lease in leases:
+        try:
+            with transaction.atomic():
+                _check_lease_can_be_terminated(lease)
+
+                waiting_orders = [
+                    order
+                    for order in lease.orders.all()
+                    if order.status in OrderStatus.get_waiting_statuses()
+                ]
+                for order in waiting_orders:
+                    # Same check as Order.set_status
+                    if order.status == OrderStatus.DRAFTED:
+                        raise OrderStatusTransitionError(
+                            f'Cannot set order {order.order_number} state to "{OrderStatus.CANCELLED}", '
+                            f'it is in an invalid state "{order.status}".'
+                        )
+
+                lease.status = LeaseStatus.TERMINATED
+                lease.end_date = calculate_lease_termination_date(lease, end_date)
+                lease.save()
+
+                if send_notice:
+                    profile = profiles.get(lease.customer_id) if profiles else None
+                    email, notification_type, context, language = (
+                        _get_terminated_lease_notice(
+                            lease, profile.email if profile else None
+                        )
+                    )
+                    queue_notification(email, notification_type, context, language)
+        except (
+            AnymailError,
+            OSError,
+            OrderStatusTransitionError,
+            ValidationError,
+            VenepaikkaGraphQLError,
+        ) as e:
+            results[lease.id] = str(e)
+        else:
+            results[lease.id] = None
+            orders_to_cancel += waiting_orders
+
+    _cancel_terminated_lease_orders(orders_to_cancel)
+
+    if send_notice and any(error is None for error in results.values()):
+        send_queued_notifications()
+
+    return results
 
 
 def exchange_berth_for_lease(
@@ -277,6 +398,7 @@ def exchange_berth_for_lease(
 ) -> Tuple(BerthLease, BerthLease):
     # Avoid circular imports
     from leases.models import BerthLease
+    from resources.models import Harbor
 
     end_date = old_lease.end_date
     contract = None
@@ -305,7 +427,8 @@ def exchange_berth_for_lease(
             comment=_(
                 f"{new_lease_comment}\n"
                 f"{_('Previous berth info')}:\n"
-                f"{_('Harbor name')}: {old_lease.berth.pier.harbor.name}\n"
+                f"{_('Harbor name')}: "
+                f"{translated_names.get(Harbor, old_lease.berth.pier.harbor_id)}\n"
                 f"{_('Pier ID')}: {old_lease.berth.pier.identifier}\n"
                 f"{_('Berth number')}: {old_lease.berth.number}\n"
             ),
@@ -6,6 +6,7 @@ class PaymentsConfig(AppConfig):
 
     def ready(self):
         import payments.notifications  # noqa
+        import payments.signals  # noqa
 
         # Verify active payment provider configuration
         from .providers import load_provider_config
@@ -29,7 +29,7 @@ from leases.stickers import get_next_sticker_number
 from leases.utils import calculate_season_start_date
 from resources.enums import AreaRegion
 from resources.models import AbstractArea, Berth
-from utils.models import TimeStampedModel, UUIDModel
+from utils.models import SerializableManager, TimeStampedModel, UUIDModel
 from utils.numbers import rounded as round_to_nearest, rounded as rounded_decimal
 
 from .enums import (
@@ -376,7 +376,7 @@ class TalpaProductAccounting(models.Model):
         ]
 
 
-class OrderManager(SerializableMixin.SerializableManager):
+class OrderManager(SerializableManager):
     def berth_orders(self):
         product_ct = ContentType.objects.get_for_model(BerthProduct)
         lease_ct = ContentType.objects.get_for_model(BerthLease)
@@ -937,7 +937,18 @@ class Order(UUIDModel, TimeStampedModel, SerializableMixin):
 
         super().save(*args, **kwargs)
 
-    def set_status(self, new_status: OrderStatus, comment: str = None) -> None:
+    def set_status(
+        self,
+        new_status: OrderStatus,
+        comment: str = None,
+        update_sticker_number: bool = True,
+    ) -> None:
+        """Change the order status and the status of the attached lease and application
+
+        When ``update_sticker_number`` is False, the caller is responsible for assigning
+        the sticker numbers (e.g. with ``leases.stickers.assign_sticker_numbers``)
+        for the leases that ``needs_new_sticker_number``.
+        """
         old_status = self.status
         if new_status == old_status:
             return
@@ -980,7 +991,8 @@ class Order(UUIDModel, TimeStampedModel, SerializableMixin):
 
         if self.order_type == OrderType.LEASE_ORDER and self.lease:
             self.update_lease_and_application(new_status)
-            self.update_sticker_number_if_needed()
+            if update_sticker_number:
+                self.update_sticker_number_if_needed()
 
         self.create_log_entry(
             from_status=old_status, to_status=new_status, comment=comment
@@ -1025,13 +1037,18 @@ class Order(UUIDModel, TimeStampedModel, SerializableMixin):
                 application.status = new_application_status
                 application.save(update_fields=["status"])
 
-    def update_sticker_number_if_needed(self):
-        if (
-            self.status in OrderStatus.get_paid_statuses()
+    def needs_new_sticker_number(self) -> bool:
+        return bool(
+            self.order_type == OrderType.LEASE_ORDER
+            and self.lease
+            and self.status in OrderStatus.get_paid_statuses()
             and (application := self.lease.application)
             and isinstance(self.lease, WinterStorageLease)
             and application.area_type == ApplicationAreaType.UNMARKED
-        ):
+        )
+
+    def update_sticker_number_if_needed(self):
+        if self.needs_new_sticker_number():
             sticker_number = get_next_sticker_number(self.lease.start_date)
             self.lease.sticker_number = sticker_number
             self.lease.save(update_fields=["sticker_number"])
@@ -1104,6 +1121,8 @@ class OrderLine(UUIDModel, TimeStampedModel, SerializableMixin):
         validators=[MinValueValidator(Decimal("0.00"))],
     )
 
+    objects = SerializableManager()
+
     def clean(self):
         creating = self._state.adding
         if not creating:
@@ -1220,6 +1239,8 @@ class OrderLogEntry(UUIDModel, TimeStampedModel, SerializableMixin):
     to_status = models.CharField(choices=OrderStatus.choices, max_length=9)
     comment = models.TextField(blank=True, null=True)
 
+    objects = SerializableManager()
+
     class Meta:
         verbose_name_plural = _("order log entries")
 
@@ -1379,7 +1400,7 @@ class AbstractOffer(UUIDModel, TimeStampedModel):
         self.save()
 
 
-class BerthSwitchOfferManager(SerializableMixin.SerializableManager):
+class BerthSwitchOfferManager(SerializableManager):
     def expire_too_old_offers(self, older_than_days, dry_run=False) -> int:
         # Check all orders that are in PENDING status, and if there is
         # {older_than_days} full days elapsed after the offers's due_date, then
@@ -28,7 +28,7 @@ class OfferedBerthSwichOffersForBerthLoader(DataLoader):
     def batch_load_fn(self, berth_ids):
 
         offers_by_berths = {
-            offer.berth.id: offer
+            offer.berth_id: offer
             for offer in BerthSwitchOffer.objects.filter(
                 berth_id__in=berth_ids,
                 status=OfferStatus.OFFERED,
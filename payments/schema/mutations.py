@@ -1,4 +1,5 @@
 from decimal import Decimal
+from uuid import UUID
 
 import graphene
 from anymail.exceptions import AnymailError
@@ -22,6 +23,7 @@ from customers.services import ProfileService
 from leases.enums import LeaseStatus
 from leases.models import BerthLease, WinterStorageLease
 from leases.schema import BerthLeaseNode, WinterStorageLeaseNode
+from leases.stickers import assign_sticker_numbers
 from leases.utils import (
     calculate_season_end_date,
     calculate_season_start_date,
@@ -35,7 +37,7 @@ from users.decorators import (
     delete_permission_required,
     view_permission_required,
 )
-from utils.relay import get_node_from_global_id
+from utils.relay import from_global_id, get_node_from_global_id
 from utils.schema import update_object
 
 from ..enums import OfferStatus, OrderStatus, OrderType, ProductServiceType
@@ -54,7 +56,7 @@ from ..utils import (
     fetch_order_profile,
     prepare_for_resending,
     resend_order,
-    send_berth_switch_offer,
+    send_berth_switch_offers,
     send_cancellation_notice,
     send_refund_notice,
     update_order_from_profile,
@@ -415,10 +417,15 @@ class UpdateOrdersMutation(graphene.ClientIDMutation):
     @classmethod
     @change_permission_required(Order)
     @view_permission_required(BerthLease, WinterStorageLease)
+    @transaction.atomic
     def mutate_and_get_payload(cls, root, info, orders, **input):
 
         successful_orders = []
         failed_orders = []
+        # Sticker numbers for the paid unmarked WS leases are assigned in bulk at the end.
+        # The orders are updated in savepoints of the mutation transaction, so the
+        # paid leases are not left without a sticker if the assignment fails.
+        leases_without_sticker = []
 
         for order_input in orders:
             order_id = order_input.pop("id")
@@ -451,8 +458,14 @@ class UpdateOrdersMutation(graphene.ClientIDMutation):
                     # usually triggers a change in lease status.
                     new_status = order_input.pop("status", None)
                     update_object(order, order_input)
-                    if new_status:
-                        order.set_status(new_status, _("Manually updated by admin"))
+                    if new_status and new_status != order.status:
+                        order.set_status(
+                            new_status,
+                            _("Manually updated by admin"),
+                            update_sticker_number=False,
+                        )
+                        if order.needs_new_sticker_number():
+                            leases_without_sticker.append(order.lease)
 
             except (
                 ValidationError,
@@ -463,6 +476,9 @@ class UpdateOrdersMutation(graphene.ClientIDMutation):
                 failed_orders.append(FailedOrderType(id=order_id, error=str(e)))
             else:
                 successful_orders.append(order)
+
+        assign_sticker_numbers(leases_without_sticker)
+
         return UpdateOrdersMutation(
             successful_orders=successful_orders, failed_orders=failed_orders
         )
@@ -634,6 +650,10 @@ class SendBerthSwitchOfferMutation(graphene.ClientIDMutation):
 
     sent_offers = graphene.List(graphene.ID)
     failed_offers = graphene.List(FailedOfferType)
+    sms_errors = graphene.List(
+        FailedOfferType,
+        description="The sent offers whose SMS notice could not be sent",
+    )
 
     @classmethod
     @change_permission_required(
@@ -641,50 +661,56 @@ class SendBerthSwitchOfferMutation(graphene.ClientIDMutation):
     )
     def mutate_and_get_payload(cls, root, info, offers, **input):
         due_date = input.pop("due_date", None)
+        profile_token = input.get("profile_token")
 
-        failed_offers = []
-        sent_offers = []
-
+        offer_ids = {}
         for offer_id in offers:
             try:
-                with transaction.atomic():
-                    offer = get_node_from_global_id(
-                        info, offer_id, only_type=BerthSwitchOfferNode, nullable=False
-                    )
+                offer_ids[offer_id] = UUID(
+                    from_global_id(offer_id, node_type=BerthSwitchOfferNode)
+                )
+            except (AssertionError, ValueError):
+                pass
+
+        # Resolve all the offers and the related objects used on the notifications at once
+        found_offers = {
+            offer.id: offer
+            for offer in BerthSwitchOfferNode.get_queryset(
+                BerthSwitchOffer.objects.filter(
+                    id__in=offer_ids.values()
+                ).select_related(
+                    "customer", "application", "lease", "berth__pier__harbor"
+                ),
+                info,
+            )
+        }
 
-                    if offer.status not in (OfferStatus.DRAFTED, OfferStatus.OFFERED):
-                        # This mutation can also be used to resend offers
-                        raise ValidationError(
-                            _(f"Cannot send offer in {offer.status} status.")
-                        )
+        profiles = None
+        if profile_token and found_offers:
+            profiles = ProfileService(profile_token).get_all_profiles(
+                list({offer.customer_id for offer in found_offers.values()})
+            )
 
-                    if profile_token := input.get("profile_token"):
-                        offer.update_from_profile(profile_token)
+        results, sms_results = send_berth_switch_offers(
+            list(found_offers.values()), due_date, profiles=profiles
+        )
 
-                    if not offer.customer_email and not offer.customer_phone:
-                        failed_offers.append(
-                            FailedOfferType(
-                                id=offer_id,
-                                error=_(
-                                    "Profile token is required if an offer does not previously have email or phone."
-                                ),
-                            )
-                        )
-                        continue
-                    send_berth_switch_offer(offer, due_date)
-            except (
-                AnymailError,
-                OSError,
-                BerthSwitchOffer.DoesNotExist,
-                ValidationError,
-                VenepaikkaGraphQLError,
-            ) as e:
-                failed_offers.append(FailedOfferType(id=offer_id, error=str(e)))
-            else:
+        failed_offers = []
+        sent_offers = []
+        sms_errors = []
+        for offer_id in offers:
+            offer = found_offers.get(offer_ids.get(offer_id))
+            if not offer:
+                error = _("BerthSwitchOffer matching query does not exist.")
+            elif (error := results.get(offer.id)) is None:
                 sent_offers.append(offer.id)
+                if sms_error := sms_results.get(offer.id):
+                    sms_errors.append(FailedOfferType(id=offer_id, error=sms_error))
+                continue
+            failed_offers.append(FailedOfferType(id=offer_id, error=error))
 
         return SendBerthSwitchOfferMutation(
-            sent_offers=sent_offers, failed_offers=failed_offers
+            sent_offers=sent_offers, failed_offers=failed_offers, sms_errors=sms_errors
         )
 
 
@@ -2,7 +2,9 @@ from graphene import Decimal, Field, ID, List, Node, String
 from graphene_django import DjangoConnectionField
 
 from berth_reservations.exceptions import VenepaikkaGraphQLError
+from berth_reservations.translated_names import translated_names
 from leases.models import BerthLease, WinterStorageLease
+from resources.models import Harbor, WinterStorageArea
 from users.decorators import view_permission_required
 from utils.relay import from_global_id
 
@@ -137,7 +139,10 @@ class Query:
 
         if statuses:
             qs = qs.filter(status__in=statuses)
-        return qs
+        # The generic product and lease are fetched with a query per content type
+        return qs.select_related("customer").prefetch_related(
+            "product", "lease", "order_lines", "log_entries"
+        )
 
     def resolve_order_refunds(self, info, order_id, **kwargs):
         return OrderRefund.objects.filter(order_id=from_global_id(order_id, OrderNode))
@@ -158,17 +163,21 @@ class Query:
         if isinstance(order.lease, BerthLease):
             place_number = order.lease.berth.number
             section_identifier = order.lease.berth.pier.identifier
-            area_name = order.lease.berth.pier.harbor.name
+            area_name = translated_names.get(Harbor, order.lease.berth.pier.harbor_id)
         elif isinstance(order.lease, WinterStorageLease):
             if order.lease.place:
                 place_number = str(order.lease.place.number)
                 section_identifier = order.lease.place.winter_storage_section.identifier
-                area_name = order.lease.place.winter_storage_section.area.name
+                area_name = translated_names.get(
+                    WinterStorageArea, order.lease.place.winter_storage_section.area_id
+                )
             else:
                 # unmarked ws lease
                 place_number = None
                 section_identifier = order.lease.section.identifier
-                area_name = order.lease.section.area.name
+                area_name = translated_names.get(
+                    WinterStorageArea, order.lease.section.area_id
+                )
         else:
             place_number = None
             section_identifier = None
@@ -193,7 +202,7 @@ class Query:
             status=offer.status,
             berth=offer.berth.number,
             pier=offer.berth.pier.identifier,
-            harbor=offer.berth.pier.harbor.name,
+            harbor=translated_names.get(Harbor, offer.berth.pier.harbor_id),
         )
 
     @staticmethod
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+
+from .models import BerthSwitchOffer
+
+
+# The pending offers affect the availability of the berths shown on the public map
+@receiver([post_save, post_delete], sender=BerthSwitchOffer)
+def invalidate_public_query_cache_handler(sender, instance, **kwargs):
+    bump_public_query_cache_version()
@@ -7,11 +7,13 @@ from babel.dates import format_date
 from dateutil.relativedelta import relativedelta
 from dateutil.utils import today
 from django.core import mail
+from django.db import DatabaseError
 from django.test import override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 
-from applications.enums import ApplicationStatus
+from applications.enums import ApplicationAreaType, ApplicationStatus
+from applications.tests.factories import WinterStorageApplicationFactory
 from berth_reservations.tests.utils import (
     assert_doesnt_exist,
     assert_field_missing,
@@ -21,9 +23,10 @@ from berth_reservations.tests.utils import (
 from customers.schema import ProfileNode
 from leases.enums import LeaseStatus
 from leases.schema import BerthLeaseNode, WinterStorageLeaseNode
-from leases.tests.factories import BerthLeaseFactory
+from leases.tests.factories import BerthLeaseFactory, WinterStorageLeaseFactory
 from leases.utils import calculate_season_start_date
 from resources.schema import WinterStorageAreaNode
+from resources.tests.factories import WinterStorageSectionFactory
 from utils.numbers import rounded
 from utils.relay import to_global_id
 
@@ -1000,6 +1003,89 @@ def test_set_order_status_to_paid_manually(api_client, initial_status, berth_lea
     assert order.lease.status == LeaseStatus.PAID
 
 
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services"],
+    indirect=True,
+)
+def test_set_unmarked_ws_orders_paid_manually_assigns_stickers(
+    api_client, sticker_sequences
+):
+    orders = [
+        OrderFactory(
+            lease=WinterStorageLeaseFactory(
+                application=WinterStorageApplicationFactory(
+                    area_type=ApplicationAreaType.UNMARKED
+                ),
+                place=None,
+                section=WinterStorageSectionFactory(),
+            ),
+            status=OrderStatus.OFFERED,
+        )
+        for _i in range(2)
+    ]
+    variables = {
+        "orders": [
+            {
+                "id": to_global_id(OrderNode, order.id),
+                "status": OrderStatusEnum.get(OrderStatus.PAID_MANUALLY).name,
+            }
+            for order in orders
+        ]
+    }
+
+    executed = api_client.execute(UPDATE_ORDERS_MUTATION, input=variables)
+
+    assert len(executed["data"]["updateOrders"]["failedOrders"]) == 0
+    assert len(executed["data"]["updateOrders"]["successfulOrders"]) == 2
+    sticker_numbers = set()
+    for order in orders:
+        order.lease.refresh_from_db()
+        assert order.lease.status == LeaseStatus.PAID
+        sticker_numbers.add(order.lease.sticker_number)
+    assert sticker_numbers == {1, 2}
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["berth_services"],
+    indirect=True,
+)
+def test_update_orders_sticker_assignment_error_rolls_back(api_client):
+    order = OrderFactory(
+        lease=WinterStorageLeaseFactory(
+            application=WinterStorageApplicationFactory(
+                area_type=ApplicationAreaType.UNMARKED
+            ),
+            place=None,
+            section=WinterStorageSectionFactory(),
+        ),
+        status=OrderStatus.OFFERED,
+    )
+    lease_status = order.lease.status
+    variables = {
+        "orders": [
+            {
+                "id": to_global_id(OrderNode, order.id),
+                "status": OrderStatusEnum.get(OrderStatus.PAID_MANUALLY).name,
+            }
+        ]
+    }
+
+    with mock.patch(
+        "payments.schema.mutations.assign_sticker_numbers",
+        side_effect=DatabaseError("Sticker sequence missing"),
+    ):
+        executed = api_client.execute(UPDATE_ORDERS_MUTATION, input=variables)
+
+    assert_in_errors("Sticker sequence missing", executed)
+    order.refresh_from_db()
+    order.lease.refresh_from_db()
+    assert order.status == OrderStatus.OFFERED
+    assert order.lease.status == lease_status
+    assert order.lease.sticker_number is None
+
+
 @pytest.mark.parametrize(
     "api_client",
     ["berth_services"],
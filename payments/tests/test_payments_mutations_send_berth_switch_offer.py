@@ -7,16 +7,15 @@ from freezegun import freeze_time
 from requests import Session
 
 from applications.enums import ApplicationStatus
-from berth_reservations.tests.factories import CustomerProfileFactory
 from berth_reservations.tests.utils import assert_not_enough_permissions
 from customers.services import SMSNotificationService
 from customers.tests.conftest import mocked_response_profile
-from payments.notifications import NotificationType
 from payments.schema.types import BerthSwitchOfferNode
 from utils.relay import to_global_id
 
 from ..enums import OfferStatus
 from .conftest import ProfileNode
+from .factories import BerthSwitchOfferFactory
 
 SEND_BERTH_SWITCH_OFFER_MUTATION = """
 mutation SEND_BERTH_SWITCH_OFFER_MUTATION($input: SendBerthSwitchOfferMutationInput!) {
@@ -26,6 +25,10 @@ mutation SEND_BERTH_SWITCH_OFFER_MUTATION($input: SendBerthSwitchOfferMutationIn
             error
         }
         sentOffers
+        smsErrors {
+            id
+            error
+        }
     }
 }"""
 
@@ -82,12 +85,10 @@ def test_send_berth_switch_offer(
     if profile_token:
         variables["profileToken"] = profile_token
 
-    customer_profile = CustomerProfileFactory()
-
     profile_email = "email_stored_in_profile@kuva.hel.ninja"
     profile_phone = "+358404192519"
     profile_data = {
-        "id": to_global_id(ProfileNode, customer_profile.id),
+        "id": to_global_id(ProfileNode, berth_switch_offer.customer.id),
         "first_name": berth_switch_offer.application.first_name,
         "last_name": berth_switch_offer.application.last_name,
         "primary_email": {"email": profile_email},
@@ -97,11 +98,9 @@ def test_send_berth_switch_offer(
     with mock.patch.object(
         Session,
         "post",
-        side_effect=mocked_response_profile(
-            count=0, data=profile_data, use_edges=False
-        ),
+        side_effect=mocked_response_profile(count=0, data=profile_data),
     ), mock.patch.object(
-        SMSNotificationService, "send", return_value=None
+        SMSNotificationService, "send_plain_text", return_value=None
     ) as mock_send_sms:
         executed = api_client.execute(SEND_BERTH_SWITCH_OFFER_MUTATION, input=variables)
 
@@ -133,19 +132,9 @@ def test_send_berth_switch_offer(
         assert str(berth_switch_offer.pk) in mail.outbox[0].alternatives[0][0]
         assert mail.outbox[0].alternatives[0][1] == "text/html"
 
-        accept_url = f"https://front-end-url/fi/offer?offer_number={berth_switch_offer.offer_number}&accept=true"
-        cancel_url = f"https://front-end-url/fi/offer?offer_number={berth_switch_offer.offer_number}&accept=false"
         mock_send_sms.assert_called_with(
-            NotificationType.SMS_BERTH_SWITCH_NOTICE,
-            {
-                "subject": "Berth switch offer approved",
-                "offer": berth_switch_offer,
-                "accept_url": accept_url,
-                "cancel_url": cancel_url,
-                "due_date": "31.1.2020",
-            },
             profile_phone if profile_token else offer_original_phone,
-            language="fi",
+            f"Offer {berth_switch_offer.pk} due date 31.1.2020",
         )
     else:
         # no profile_token and no contact info
@@ -194,3 +183,105 @@ def test_send_berth_switch_offer_non_existent_offer(superuser_api_client, berth)
         executed["data"]["sendBerthSwitchOffer"]["failedOffers"][0]["error"]
         == "BerthSwitchOffer matching query does not exist."
     )
+
+
+@freeze_time("2020-10-01T08:00:00Z")
+def test_send_berth_switch_offers_batch(
+    superuser_api_client, notification_template_switch_offer_sent
+):
+    offers = []
+    for offer_status in (
+        OfferStatus.DRAFTED,
+        OfferStatus.ACCEPTED,
+        OfferStatus.DRAFTED,
+    ):
+        offer = BerthSwitchOfferFactory(
+            status=offer_status, due_date=datetime.date(2020, 11, 1)
+        )
+        offer.application.status = ApplicationStatus.PENDING
+        offer.application.save()
+        offers.append(offer)
+
+    profiles_data = [
+        {
+            "id": to_global_id(ProfileNode, offer.customer.id),
+            "first_name": offer.application.first_name,
+            "last_name": offer.application.last_name,
+            "primary_email": {"email": f"customer-{i}@kuva.hel.ninja"},
+            "primary_phone": {"phone": f"+35840419251{i}"},
+        }
+        for i, offer in enumerate(offers)
+    ]
+
+    variables = {
+        "offers": [to_global_id(BerthSwitchOfferNode, o.id) for o in offers],
+        "profileToken": "dummy_token",
+    }
+
+    with mock.patch.object(
+        Session,
+        "post",
+        side_effect=mocked_response_profile(count=0, data=profiles_data),
+    ) as mock_profile_request, mock.patch.object(
+        SMSNotificationService, "send_plain_text", return_value=None
+    ) as mock_send_sms:
+        executed = superuser_api_client.execute(
+            SEND_BERTH_SWITCH_OFFER_MUTATION, input=variables
+        )
+
+    # All the profiles are fetched with a single request
+    assert mock_profile_request.call_count == 1
+
+    payload = executed["data"]["sendBerthSwitchOffer"]
+    assert payload["sentOffers"] == [str(offers[0].id), str(offers[2].id)]
+    assert payload["failedOffers"] == [
+        {
+            "id": to_global_id(BerthSwitchOfferNode, offers[1].id),
+            "error": "Cannot send offer in accepted status.",
+        }
+    ]
+
+    assert len(mail.outbox) == 2
+    assert mock_send_sms.call_count == 2
+    assert {call.args[0] for call in mock_send_sms.call_args_list} == {
+        "+358404192510",
+        "+358404192512",
+    }
+    for offer in (offers[0], offers[2]):
+        offer.refresh_from_db()
+        assert offer.status == OfferStatus.OFFERED
+
+
+@freeze_time("2020-10-01T08:00:00Z")
+def test_send_berth_switch_offer_sms_error(
+    superuser_api_client, berth_switch_offer, notification_template_switch_offer_sent
+):
+    berth_switch_offer.status = OfferStatus.DRAFTED
+    berth_switch_offer.due_date = datetime.date(2020, 11, 1)
+    berth_switch_offer.customer_email = "test@kuva.hel.ninja"
+    berth_switch_offer.customer_phone = "+358505658789"
+    berth_switch_offer.save()
+    berth_switch_offer.application.status = ApplicationStatus.PENDING
+    berth_switch_offer.application.save()
+    offer_id = to_global_id(BerthSwitchOfferNode, berth_switch_offer.id)
+
+    with mock.patch.object(
+        SMSNotificationService,
+        "send_plain_text",
+        side_effect=ConnectionError("SMS service unavailable"),
+    ):
+        executed = superuser_api_client.execute(
+            SEND_BERTH_SWITCH_OFFER_MUTATION, input={"offers": [offer_id]}
+        )
+
+    # The offer was sent by email, so it's not reported as failed
+    payload = executed["data"]["sendBerthSwitchOffer"]
+    assert payload["sentOffers"] == [str(berth_switch_offer.id)]
+    assert payload["failedOffers"] == []
+    assert payload["smsErrors"] == [
+        {"id": offer_id, "error": "SMS service unavailable"}
+    ]
+
+    berth_switch_offer.refresh_from_db()
+    assert berth_switch_offer.status == OfferStatus.OFFERED
+    assert len(mail.outbox) == 1
@@ -24,20 +24,24 @@ import calendar
 import random
 import struct
 import time
+from concurrent.futures import as_completed, ThreadPoolExecutor
 from datetime import date, timedelta
 from decimal import Decimal
 from functools import lru_cache, wraps
-from typing import Callable
+from typing import Callable, Dict, List, Tuple
 
+from anymail.exceptions import AnymailError
 from babel.dates import format_date
 from dateutil.relativedelta import relativedelta
 from dateutil.rrule import MONTHLY, rrule
 from dateutil.utils import today
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
-from django_ilmoitin.utils import send_notification
+from django_ilmoitin.models import NotificationTemplate
+from django_ilmoitin.utils import render_notification_template, send_notification
 
 from applications.enums import ApplicationStatus
 from berth_reservations.exceptions import VenepaikkaGraphQLError
@@ -516,7 +520,7 @@ def approve_order(
         if order.lease.application:
             # Update application status
             order.lease.application.status = ApplicationStatus.OFFER_SENT
-            order.lease.application.save()
+            order.lease.application.save(update_fields=["status"])
 
     if order.customer.is_non_billable_customer():
         order.set_status(OrderStatus.PAID_MANUALLY, "Non-billable customer.")
@@ -761,10 +765,9 @@ def get_context(
         }
 
 
-def send_berth_switch_offer(
-    offer,
-    due_date: date,
-) -> None:
+def _prepare_berth_switch_offer(offer, due_date: date) -> Tuple[str, str, dict]:
+    """Update the offer as offered and return the email, language and context
+    for the notifications"""
     if due_date:
         offer.due_date = due_date
         offer.save()
@@ -792,17 +795,101 @@ def send_berth_switch_offer(
         "cancel_url": get_offer_customer_url(offer, language, False),
         "due_date": format_date(offer.due_date, locale="fi"),
     }
+    return email, language, context
+
+
+def send_sms_messages(messages: List[Tuple[UUID, str, str]]) -> Dict[UUID, str]:
+    """Send the (id, phone, message) SMS messages concurrently through a bounded
+    worker pool and return the errors by id"""
+    if not messages:
+        return {}
+
+    errors = {}
+    sms_service = SMSNotificationService()
+    with ThreadPoolExecutor(
+        max_workers=min(settings.NOTIFICATION_MAX_WORKERS, len(messages))
+    ) as executor:
+        futures = {
+            executor.submit(sms_service.send_plain_text, phone, message): message_id
+            for message_id, phone, message in messages
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except OSError as e:
+                errors[futures[future]] = str(e)
+    return errors
 
-    send_notification(email, notification_type.value, context, language)
 
-    if offer.customer_phone:
-        sms_service = SMSNotificationService()
-        sms_service.send(
-            NotificationType.SMS_BERTH_SWITCH_NOTICE,
-            context,
-            offer.customer_phone,
-            language=language,
-        )
+def send_berth_switch_offers(
+    offers: List[AbstractOffer],
+    due_date: date,
+    profiles: Optional[Dict[UUID, HelsinkiProfileUser]] = None,
+) -> Tuple[Dict[UUID, Optional[str]], Dict[UUID, str]]:
+    """
+    Send the offers and return the error of each offer (None if it was sent)
+    and the errors of the SMS notices by offer.
+
+    The offers are updated and the emails queued one by one, and the SMS notices
+    (remote requests) are sent afterwards through a bounded worker pool. The offer
+    has already been sent by then, so a failed SMS notice doesn't fail the offer.
+    If profiles is passed, the customer info of the offers is updated from them.
+    """
+    from .notifications import NotificationType
+
+    results = {}
+    sms_messages = []
+    sms_template = None
+
+    for offer in offers:
+        try:
+            with transaction.atomic():
+                if offer.status not in (OfferStatus.DRAFTED, OfferStatus.OFFERED):
+                    # Offers can also be resent
+                    raise ValidationError(
+                        _(f"Cannot send offer in {offer.status} status.")
+                    )
+
+                if profiles is not None:
+                    if (profile := profiles.get(offer.customer_id)) is None:
+                        raise ValidationError(_("Customer profile not found"))
+                    offer.update_from_customer_profile(profile)
+
+                if not offer.customer_email and not offer.customer_phone:
+                    raise ValidationError(
+                        _(
+                            "Profile token is required if an offer does not previously have email or phone."
+                        )
+                    )
+
+                email, language, context = _prepare_berth_switch_offer(offer, due_date)
+                send_notification(
+                    email,
+                    NotificationType.BERTH_SWITCH_OFFER_APPROVED.value,
+                    context,
+                    language,
+                )
+
+                if offer.customer_phone:
+                    sms_template = sms_template or NotificationTemplate.objects.get(
+                        type=NotificationType.SMS_BERTH_SWITCH_NOTICE.value
+                    )
+                    message = render_notification_template(
+                        sms_template, context, language
+                    ).body_text
+                    sms_messages.append((offer.id, offer.customer_phone, message))
+        except (
+            AnymailError,
+            OSError,
+            NotificationTemplate.DoesNotExist,
+            ValidationError,
+            VenepaikkaGraphQLError,
+        ) as e:
+            results[offer.id] = str(e)
+        else:
+            results[offer.id] = None
+
+    return results, send_sms_messages(sms_messages)
 
 
 def get_offer_customer_url(
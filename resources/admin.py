@@ -187,6 +187,8 @@ class WinterStorageSectionAdmin(admin.OSMGeoAdmin):
         "number_of_places",
         "number_of_free_places",
         "number_of_inactive_places",
+        "unmarked_capacity",
+        "unmarked_allocated_area",
     )
     search_fields = (
         "id",
@@ -0,0 +1,210 @@
+import threading
+from decimal import Decimal
+from typing import Iterable
+
+from dateutil.utils import today
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Q, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from leases.consts import ACTIVE_LEASE_STATUSES
+
+from .models import WinterStorageArea, WinterStoragePlace, WinterStorageSection
+
+COUNTER_FIELDS = (
+    "max_width",
+    "max_length",
+    "number_of_places",
+    "number_of_free_places",
+    "number_of_inactive_places",
+    "unmarked_allocated_area",
+)
+AREA_COUNTER_FIELDS = COUNTER_FIELDS + ("unmarked_capacity",)
+EMPTY_COUNTERS = {
+    "max_width": None,
+    "max_length": None,
+    "number_of_places": 0,
+    "number_of_free_places": 0,
+    "number_of_inactive_places": 0,
+    "unmarked_allocated_area": Decimal("0.00"),
+    "unmarked_capacity": None,
+}
+COUNTERS_BATCH_SIZE = 500
+
+# The date the counters were last checked to be up to date in this process
+_counters_checked_on = None
+# The sections changed in the current transaction of each thread
+_pending_sections = threading.local()
+
+AREA_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def _update_counters(model, instances, counters, fields=COUNTER_FIELDS) -> int:
+    """Store the counters of the instances that have changed"""
+    changed = []
+    for instance in instances:
+        values = {**EMPTY_COUNTERS, **counters.get(instance.id, {})}
+        if any(getattr(instance, field) != values[field] for field in fields):
+            for field in fields:
+                setattr(instance, field, values[field])
+            changed.append(instance)
+
+    model.objects.bulk_update(changed, fields, batch_size=COUNTERS_BATCH_SIZE)
+    return len(changed)
+
+
+def _get_unmarked_allocated_areas(sections) -> dict:
+    """
+    Sum up the boat areas of the active unmarked leases of the sections. The area
+    is calculated like the price of the lease: from the boat of the lease or, when
+    the lease has no boat, from the boat of the application.
+    """
+    lease_boat_area = Coalesce(
+        F("leases__boat__width") * F("leases__boat__length"),
+        F("leases__application__boat__width") * F("leases__application__boat__length"),
+        Value(Decimal("0.00")),
+        output_field=AREA_FIELD,
+    )
+    return dict(
+        WinterStorageSection.objects.filter(
+            id__in=[section.id for section in sections],
+            leases__status__in=ACTIVE_LEASE_STATUSES,
+            leases__end_date__gte=today().date(),
+        )
+        .order_by()
+        .values("id")
+        .annotate(allocated=Sum(lease_boat_area, output_field=AREA_FIELD))
+        .values_list("id", "allocated")
+    )
+
+
+def update_winter_storage_area_counters(areas: QuerySet = None) -> int:
+    """Sum up the counters of the sections for the given areas (all by default)"""
+    if areas is None:
+        areas = WinterStorageArea.objects.all()
+    areas = list(areas.order_by().only("id", *AREA_COUNTER_FIELDS))
+
+    counters = {
+        row.pop("area_id"): row
+        for row in WinterStorageSection.objects.filter(area__in=areas)
+        .order_by()
+        .values("area_id")
+        .annotate(
+            max_width=Max("max_width"),
+            max_length=Max("max_length"),
+            number_of_places=Coalesce(Sum("number_of_places"), 0),
+            number_of_free_places=Coalesce(Sum("number_of_free_places"), 0),
+            number_of_inactive_places=Coalesce(Sum("number_of_inactive_places"), 0),
+            unmarked_allocated_area=Coalesce(
+                Sum("unmarked_allocated_area"), Value(Decimal("0.00"))
+            ),
+            unmarked_capacity=Sum("unmarked_capacity"),
+        )
+    }
+    return _update_counters(WinterStorageArea, areas, counters, AREA_COUNTER_FIELDS)
+
+
+@transaction.atomic
+def update_winter_storage_counters(sections: QuerySet = None) -> int:
+    """
+    Recalculate the place counters and the allocated unmarked area of the given
+    sections (all by default) and of the areas they belong to.
+
+    The free places and the active leases depend on the current date, so the
+    sections are marked with the date of the calculation and recalculated on the
+    next day by refresh_stale_winter_storage_counters.
+    """
+    if sections is None:
+        sections = WinterStorageSection.objects.all()
+    sections = list(sections.order_by().only("id", "area_id", *COUNTER_FIELDS))
+    if not sections:
+        return 0
+
+    # The places are annotated with the availability by WinterStoragePlaceManager
+    counters = {
+        row.pop("winter_storage_section_id"): row
+        for row in WinterStoragePlace.objects.filter(
+            winter_storage_section__in=sections
+        )
+        .order_by()
+        .values("winter_storage_section_id")
+        .annotate(
+            max_width=Max("place_type__width"),
+            max_length=Max("place_type__length"),
+            number_of_places=Count("pk"),
+            number_of_free_places=Count(
+                "pk", filter=Q(is_available=True, is_active=True)
+            ),
+            number_of_inactive_places=Count("pk", filter=Q(is_active=False)),
+        )
+    }
+    for section_id, allocated in _get_unmarked_allocated_areas(sections).items():
+        counters.setdefault(section_id, {})["unmarked_allocated_area"] = (
+            allocated.quantize(Decimal("0.01"))
+        )
+    updated = _update_counters(WinterStorageSection, sections, counters)
+    current_date = today().date()
+    WinterStorageSection.objects.filter(id__in=[s.id for s in sections]).exclude(
+        counters_updated_on=current_date
+    ).update(counters_updated_on=current_date)
+
+    update_winter_storage_area_counters(
+        WinterStorageArea.objects.filter(id__in={s.area_id for s in sections})
+    )
+    return updated
+
+
+def refresh_stale_winter_storage_counters() -> int:
+    """
+    Recalculate the counters of the sections that have not been updated today.
+
+    The places become free when their leases end, without anything being saved,
+    so the counters are refreshed on the first read of each day. The check is done
+    once a day in each process.
+    """
+    global _counters_checked_on
+
+    current_date = today().date()
+    if _counters_checked_on == current_date:
+        return 0
+
+    updated = update_winter_storage_counters(
+        WinterStorageSection.objects.exclude(counters_updated_on=current_date)
+    )
+    if updated:
+        # The counters are saved without the signals
+        bump_public_query_cache_version()
+    _counters_checked_on = current_date
+    return updated
+
+
+def update_winter_storage_counters_on_commit(section_ids: Iterable) -> None:
+    """
+    Recalculate the counters of the sections once the current transaction is
+    committed. The sections changed in the same transaction are collected, so
+    bulk changes recalculate each section only once.
+    """
+    section_ids = set(section_ids) - {None}
+    if not section_ids:
+        return
+
+    if not hasattr(_pending_sections, "ids"):
+        _pending_sections.ids = set()
+    _pending_sections.ids |= section_ids
+    # Registered on every call, since the callbacks of a rolled back savepoint are
+    # dropped. The first callback to run updates all the pending sections.
+    transaction.on_commit(_update_pending_winter_storage_counters)
+
+
+def _update_pending_winter_storage_counters() -> None:
+    section_ids = getattr(_pending_sections, "ids", set())
+    if not section_ids:
+        return
+
+    _pending_sections.ids = set()
+    if update_winter_storage_counters(
+        WinterStorageSection.objects.filter(id__in=section_ids)
+    ):
+        # The counters are saved without the signals
+        bump_public_query_cache_version()
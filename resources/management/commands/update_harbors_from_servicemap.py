@@ -1,58 +1,74 @@
-import requests
-from django.conf import settings
-from django.contrib.gis.geos import Point
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from munigeo.models import Municipality
 
-from ...models import Harbor
+from ...models import Harbor, WinterStorageArea
+from ...servicemap import ServicemapClient, sync_areas_from_servicemap
+
+AREA_TYPES = {
+    "harbors": Harbor,
+    "winter_storage_areas": WinterStorageArea,
+}
 
 
 class Command(BaseCommand):
-    @staticmethod
-    def _get_servicemap_url(sm_id):
-        return "https://api.hel.fi/servicemap/v2/unit/{}/".format(sm_id)
+    help = "Update the harbors (and winter storage areas) details from Servicemap"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--area-type",
+            choices=[*AREA_TYPES.keys(), "all"],
+            default="harbors",
+            help="The type of areas to update",
+        )
+        parser.add_argument(
+            "--servicemap-url",
+            type=str,
+            help="Servicemap API URL, defaults to settings.SERVICEMAP_API_URL",
+        )
+        parser.add_argument(
+            "--workers", type=int, help="Number of concurrent requests to Servicemap"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the changes, without saving them",
+        )
 
-    def handle(self, **options):
-        updated_harbors = 0
+    def handle(self, area_type="harbors", **options):
+        client = ServicemapClient(
+            api_url=options.get("servicemap_url"), max_workers=options.get("workers")
+        )
 
-        for harbor in Harbor.objects.all():
+        models = AREA_TYPES.values() if area_type == "all" else [AREA_TYPES[area_type]]
+        for model in models:
             self.stdout.write(
-                "Fetching info for harbor with servicemap ID {}".format(
-                    harbor.servicemap_id
-                )
+                "Fetching info for {}".format(model._meta.verbose_name_plural)
             )
-
-            sm_response = requests.get(
-                self._get_servicemap_url(harbor.servicemap_id), timeout=10
+            results = sync_areas_from_servicemap(
+                model.objects.all(), client=client, dry_run=options.get("dry_run")
             )
-            sm_info = sm_response.json()
 
-            with transaction.atomic():
-                harbor.zip_code = sm_info["address_zip"]
-                harbor.www_url = sm_info["www"]["fi"]  # only FI for now
-                harbor.email = sm_info["email"]
-                harbor.phone = sm_info["phone"]
+            updated = 0
+            for result in results:
+                if result.error:
+                    self.stderr.write(
+                        "Could not update {} ({}): {}".format(
+                            result.area, result.area.servicemap_id, result.error
+                        )
+                    )
+                elif result.changes:
+                    updated += 1
+                    self.stdout.write(
+                        "{} ({}):".format(result.area, result.area.servicemap_id)
+                    )
+                    for name, (old_value, new_value) in result.changes.items():
+                        self.stdout.write(f"  {name}: {old_value} -> {new_value}")
 
-                harbor.municipality = Municipality.objects.get(
-                    id=sm_info["municipality"]
+            unchanged = sum(
+                1 for r in results if not (r.error or r.changes or r.not_modified)
+            )
+            not_modified = sum(1 for r in results if r.not_modified)
+            self.stdout.write(
+                "Successfully updated {} {} ({} unchanged, {} not modified)".format(
+                    updated, model._meta.verbose_name_plural, unchanged, not_modified
                 )
-
-                longitude, latitude = sm_info["location"]["coordinates"]
-                harbor.location = Point(longitude, latitude, srid=settings.DEFAULT_SRID)
-
-                harbor.save()
-
-                for lang, value in sm_info["name"].items():
-                    harbor.set_current_language(lang)
-                    harbor.name = value
-                    harbor.save()
-
-                for lang, value in sm_info["street_address"].items():
-                    harbor.set_current_language(lang)
-                    harbor.street_address = value
-                    harbor.save()
-
-                updated_harbors += 1
-
-        self.stdout.write("Successfully updated {} harbors".format(updated_harbors))
+            )
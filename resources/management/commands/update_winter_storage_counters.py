@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from resources.counters import update_winter_storage_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the stored place counters of all the winter storage sections "
+        "and areas. Should be run daily, since the free places depend on the season."
+    )
+
+    def handle(self, *args, **options):
+        updated = update_winter_storage_counters()
+        if updated:
+            bump_public_query_cache_version()
+        self.stdout.write(f"Updated the counters of {updated} sections")
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.18 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resources", "0033_winterstorageplace_comment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="max_length",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=5,
+                null=True,
+                verbose_name="maximum length (m)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="max_width",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=5,
+                null=True,
+                verbose_name="maximum width (m)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="number_of_free_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of free places"
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="number_of_inactive_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of inactive places"
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="number_of_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of places"
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="max_length",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=5,
+                null=True,
+                verbose_name="maximum length (m)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="max_width",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=5,
+                null=True,
+                verbose_name="maximum width (m)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="number_of_free_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of free places"
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="number_of_inactive_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of inactive places"
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="number_of_places",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="number of places"
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.18 on 2026-10-19 13:00
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resources", "0034_winter_storage_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="unmarked_allocated_area",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                editable=False,
+                max_digits=10,
+                verbose_name="allocated unmarked area (m²)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragearea",
+            name="unmarked_capacity",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=10,
+                null=True,
+                verbose_name="unmarked capacity (m²)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="unmarked_allocated_area",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                editable=False,
+                max_digits=10,
+                verbose_name="allocated unmarked area (m²)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="unmarked_capacity",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                help_text="Total area available for the boats of the unmarked leases",
+                max_digits=10,
+                null=True,
+                verbose_name="unmarked capacity (m²)",
+            ),
+        ),
+    ]
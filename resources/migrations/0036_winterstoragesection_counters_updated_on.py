@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resources", "0035_winter_storage_unmarked_capacity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="winterstoragesection",
+            name="counters_updated_on",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="counters updated on",
+            ),
+        ),
+    ]
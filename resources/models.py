@@ -1,3 +1,8 @@
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, Optional, Tuple
+
 from dateutil.utils import today
 from django.conf import settings
 from django.contrib.gis.db import models
@@ -32,6 +37,7 @@ from leases.utils import (
     calculate_season_start_date,
     calculate_winter_season_start_date,
     calculate_winter_storage_lease_end_date,
+    calculate_year_date_range,
 )
 from payments.enums import OfferStatus, PriceTier
 from utils.models import TimeStampedModel, UUIDModel
@@ -120,6 +126,57 @@ class AbstractArea(TimeStampedModel, UUIDModel):
         abstract = True
 
 
+class AbstractWinterStorageCounters(models.Model):
+    """
+    Aggregates of the winter storage places and of the unmarked leases, stored to
+    show the availability without loading them. Kept up to date by resources.counters.
+    """
+
+    max_width = models.DecimalField(
+        verbose_name=_("maximum width (m)"),
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    max_length = models.DecimalField(
+        verbose_name=_("maximum length (m)"),
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    number_of_places = models.PositiveIntegerField(
+        verbose_name=_("number of places"), default=0, editable=False
+    )
+    number_of_free_places = models.PositiveIntegerField(
+        verbose_name=_("number of free places"), default=0, editable=False
+    )
+    number_of_inactive_places = models.PositiveIntegerField(
+        verbose_name=_("number of inactive places"), default=0, editable=False
+    )
+    # The boat areas (width x length) of the active unmarked leases
+    unmarked_allocated_area = models.DecimalField(
+        verbose_name=_("allocated unmarked area (m²)"),
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        editable=False,
+    )
+
+    @property
+    def unmarked_free_area(self) -> Optional[Decimal]:
+        """Negative when the unmarked leases exceed the capacity"""
+        if self.unmarked_capacity is None:
+            return None
+        return self.unmarked_capacity - self.unmarked_allocated_area
+
+    class Meta:
+        abstract = True
+
+
 class HarborManager(TranslatableManager):
     def get_queryset(self):
         pier_qs = Pier.objects.filter(harbor=OuterRef("pk")).values("harbor__pk")
@@ -227,7 +284,9 @@ class Harbor(AbstractArea, TranslatableModel, SerializableMixin):
     serialize_fields = ({"name": "name"},)
 
 
-class WinterStorageArea(AbstractArea, TranslatableModel, SerializableMixin):
+class WinterStorageArea(
+    AbstractArea, AbstractWinterStorageCounters, TranslatableModel, SerializableMixin
+):
     municipality = models.ForeignKey(
         Municipality,
         null=True,
@@ -266,6 +325,15 @@ class WinterStorageArea(AbstractArea, TranslatableModel, SerializableMixin):
     estimated_number_of_unmarked_spaces = models.PositiveSmallIntegerField(
         verbose_name=_("estimated number of unmarked places"), null=True, blank=True
     )
+    # Sum of the capacities of the sections
+    unmarked_capacity = models.DecimalField(
+        verbose_name=_("unmarked capacity (m²)"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     translations = TranslatedFields(
         name=models.CharField(
@@ -396,73 +464,6 @@ class PierManager(models.Manager):
         )
 
 
-class WinterStorageSectionManager(models.Manager):
-    def get_queryset(self):
-        place_qs = WinterStoragePlace.objects.filter(
-            winter_storage_section=OuterRef("pk")
-        )
-        dimension_qs = _get_dimensions_qs(
-            place_qs,
-            place_type_name="place_type",
-            section_name="winter_storage_section",
-        )
-
-        # When annotating the count, if no elements match the filter, the whole queryset will
-        # return an empty QuerySet<[]>, which will then return None as value for the count.
-        #
-        # By adding the other annotate with Coalesce, we ensure that, we'll always get an int value
-        available_places = (
-            place_qs.filter(is_available=True, is_active=True)
-            .order_by()
-            .values("winter_storage_section")
-            .annotate(nullable_count=Count("*"))
-            .values("nullable_count")
-            .annotate(count=Coalesce("nullable_count", Value(0)))
-            .values("count")
-        )
-        inactive_places = (
-            place_qs.filter(Q(is_active=False))
-            .order_by()
-            .values("winter_storage_section")
-            .annotate(nullable_count=Count("*"))
-            .values("nullable_count")
-            .annotate(count=Coalesce("nullable_count", Value(0)))
-            .values("count")
-        )
-
-        all_places = (
-            place_qs.order_by()
-            .values("winter_storage_section")
-            .annotate(count=Count("*"))
-            .values("count")
-        )
-
-        return (
-            super()
-            .get_queryset()
-            .annotate(
-                max_width=Subquery(
-                    dimension_qs("width"),
-                    output_field=DecimalField(),
-                ),
-                max_length=Subquery(
-                    dimension_qs("length"),
-                    output_field=DecimalField(),
-                ),
-                number_of_places=Subquery(
-                    all_places, output_field=PositiveIntegerField()
-                ),
-                number_of_free_places=Subquery(
-                    available_places, output_field=PositiveIntegerField()
-                ),
-                number_of_inactive_places=Subquery(
-                    inactive_places,
-                    output_field=PositiveIntegerField(),
-                ),
-            )
-        )
-
-
 class Pier(AbstractAreaSection, SerializableMixin):
     harbor = models.ForeignKey(
         Harbor, verbose_name=_("harbor"), related_name="piers", on_delete=models.CASCADE
@@ -504,7 +505,9 @@ class Pier(AbstractAreaSection, SerializableMixin):
     serialize_fields = ({"name": "identifier"},)
 
 
-class WinterStorageSection(AbstractAreaSection, SerializableMixin):
+class WinterStorageSection(
+    AbstractAreaSection, AbstractWinterStorageCounters, SerializableMixin
+):
     area = models.ForeignKey(
         WinterStorageArea,
         verbose_name=_("winter storage area"),
@@ -523,7 +526,18 @@ class WinterStorageSection(AbstractAreaSection, SerializableMixin):
         verbose_name=_("summer storage for boats"), default=False
     )
 
-    objects = WinterStorageSectionManager()
+    unmarked_capacity = models.DecimalField(
+        verbose_name=_("unmarked capacity (m²)"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text=_("Total area available for the boats of the unmarked leases"),
+    )
+    # The free places depend on the date, see refresh_stale_winter_storage_counters
+    counters_updated_on = models.DateField(
+        verbose_name=_("counters updated on"), null=True, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = _("winter storage section")
@@ -560,6 +574,73 @@ class AbstractPlaceType(TimeStampedModel, UUIDModel):
         abstract = True
 
 
+# (width, length, depth, mooring type)
+BerthTypeDimensions = Tuple[Decimal, Decimal, Optional[Decimal], int]
+
+
+class BerthTypeManager(models.Manager):
+    @staticmethod
+    def normalize_dimensions(width, length, depth, mooring_type) -> BerthTypeDimensions:
+        """Round the dimensions the same way as the database would store them"""
+
+        def _quantize(value):
+            return Decimal(str(value)).quantize(Decimal("0.01")) if value else value
+
+        return _quantize(width), _quantize(length), _quantize(depth), mooring_type
+
+    def get_or_create_many(
+        self, dimensions: Iterable[BerthTypeDimensions]
+    ) -> Dict[BerthTypeDimensions, "BerthType"]:
+        """
+        Resolve the berth types matching the dimensions with a single query,
+        creating the missing ones in bulk.
+
+        The dimensions have to be normalized with `normalize_dimensions`.
+        """
+        dimensions = set(dimensions)
+        if not dimensions:
+            return {}
+
+        lookup = reduce(
+            or_,
+            (
+                Q(
+                    width=width,
+                    length=length,
+                    mooring_type=mooring_type,
+                    **(
+                        {"depth": depth}
+                        if depth is not None
+                        else {"depth__isnull": True}
+                    ),
+                )
+                for width, length, depth, mooring_type in dimensions
+            ),
+        )
+        berth_types = {
+            (bt.width, bt.length, bt.depth, bt.mooring_type): bt
+            for bt in self.filter(lookup)
+        }
+
+        missing = [
+            self.model(
+                width=width, length=length, depth=depth, mooring_type=mooring_type
+            )
+            for (width, length, depth, mooring_type) in dimensions - berth_types.keys()
+        ]
+        for berth_type in self.bulk_create(missing):
+            berth_types[
+                (
+                    berth_type.width,
+                    berth_type.length,
+                    berth_type.depth,
+                    berth_type.mooring_type,
+                )
+            ] = berth_type
+
+        return berth_types
+
+
 class BerthType(AbstractPlaceType):
     mooring_type = models.PositiveSmallIntegerField(
         choices=BerthMooringType.choices, verbose_name=_("mooring type")
@@ -572,6 +653,8 @@ class BerthType(AbstractPlaceType):
         null=True,
     )
 
+    objects = BerthTypeManager()
+
     class Meta:
         verbose_name = _("berth type")
         verbose_name_plural = _("berth types")
@@ -641,7 +724,7 @@ class BerthManager(models.Manager):
             # Check the lease ends latest at the end of the season
             end_date__lte=season_end,
         )
-        in_last_season = Q(end_date__year=last_year)
+        in_last_season = Q(end_date__range=calculate_year_date_range(last_year))
 
         active_current_status = Q(status__in=ACTIVE_LEASE_STATUSES)
         paid_status = Q(status=LeaseStatus.PAID)
@@ -776,7 +859,7 @@ class WinterStoragePlaceManager(models.Manager):
             # Check the lease ends latest at the end of the season
             end_date__lte=season_end,
         )
-        in_last_season = Q(end_date__year=last_year)
+        in_last_season = Q(end_date__range=calculate_year_date_range(last_year))
 
         active_current_status = Q(status__in=ACTIVE_LEASE_STATUSES)
         paid_status = Q(status=LeaseStatus.PAID)
@@ -1,6 +1,7 @@
 from .loaders import (
     BerthLoader,
     BerthTypeLoader,
+    BoatTypesForHarborLoader,
     HarborLoader,
     PierLoader,
     PiersForHarborLoader,
@@ -30,6 +31,7 @@ __all__ = [
     "BerthLoader",
     "BerthNode",
     "BerthTypeLoader",
+    "BoatTypesForHarborLoader",
     "BoatTypeType",
     "HarborFilter",
     "HarborLoader",
@@ -1,5 +1,6 @@
 from collections import defaultdict
 
+from django.db.models import F
 from promise import Promise
 from promise.dataloader import DataLoader
 
@@ -66,3 +67,21 @@ class SuitableBoatTypeLoader(DataLoader):
         return Promise.resolve(
             [boat_types.get(boat_type_id) for boat_type_id in boat_type_ids]
         )
+
+
+class BoatTypesForHarborLoader(DataLoader):
+    def batch_load_fn(self, harbor_ids):
+        boat_types_for_harbor = defaultdict(list)
+
+        for boat_type in (
+            BoatType.objects.filter(piers__harbor_id__in=harbor_ids)
+            .annotate(harbor_id=F("piers__harbor_id"))
+            .distinct()
+            .order_by("id")
+            .prefetch_related("translations")
+        ):
+            boat_types_for_harbor[boat_type.harbor_id].append(boat_type)
+
+        return Promise.resolve(
+            [boat_types_for_harbor.get(harbor_id, []) for harbor_id in harbor_ids]
+        )
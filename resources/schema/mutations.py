@@ -1,13 +1,18 @@
+from uuid import UUID
+
 import graphene
 import graphql_geojson
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Q
 from django.db.utils import IntegrityError
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from graphene_file_upload.scalars import Upload
 from munigeo.models import Municipality
 
 from berth_reservations.exceptions import VenepaikkaGraphQLError
+from berth_reservations.public_query_cache import bump_public_query_cache_version
 from leases.enums import LeaseStatus
 from leases.models import BerthLease, WinterStorageLease
 from users.decorators import (
@@ -15,7 +20,7 @@ from users.decorators import (
     change_permission_required,
     delete_permission_required,
 )
-from utils.relay import get_node_from_global_id
+from utils.relay import from_global_id, get_node_from_global_id
 from utils.schema import update_object
 
 from ..models import (
@@ -33,6 +38,7 @@ from ..models import (
 from .types import (
     BerthMooringTypeEnum,
     BerthNode,
+    FailedBerthType,
     HarborNode,
     PierNode,
     WinterStorageAreaNode,
@@ -41,6 +47,8 @@ from .types import (
     WinterStorageSectionNode,
 )
 
+BERTH_BULK_UPDATE_BATCH_SIZE = 500
+
 
 def delete_inactive_leases(lease_class, lookup, model_name):
     # Get all the leases related to the resource
@@ -172,6 +180,172 @@ class UpdateBerthMutation(graphene.ClientIDMutation):
         return UpdateBerthMutation(berth=berth)
 
 
+class UpdateBerthInput(BerthInput, graphene.InputObjectType):
+    id = graphene.ID(required=True)
+
+
+def _get_uuid_from_global_id(global_id, node_type):
+    model = node_type._meta.model
+    try:
+        return UUID(from_global_id(global_id, node_type=node_type))
+    except (AssertionError, ValueError):
+        raise VenepaikkaGraphQLError(
+            f"{model._meta.object_name} matching query does not exist."
+        )
+
+
+class BulkUpdateBerthsMutation(graphene.ClientIDMutation):
+    class Input:
+        berths = graphene.List(graphene.NonNull(UpdateBerthInput), required=True)
+
+    successful_berths = graphene.List(graphene.NonNull(BerthNode), required=True)
+    failed_berths = graphene.List(graphene.NonNull(FailedBerthType), required=True)
+
+    @classmethod
+    def _parse_inputs(cls, berth_inputs, failed_berths):
+        """Decode the global IDs, so the berths and piers can be fetched in bulk"""
+        parsed = []
+        berth_ids = set()
+        for berth_input in berth_inputs:
+            global_id = berth_input.pop("id")
+            try:
+                berth_id = _get_uuid_from_global_id(global_id, BerthNode)
+                if berth_id in berth_ids:
+                    raise VenepaikkaGraphQLError(
+                        _("The same berth cannot be updated more than once")
+                    )
+                berth_ids.add(berth_id)
+                if pier_id := berth_input.pop("pier_id", None):
+                    berth_input["pier_id"] = _get_uuid_from_global_id(pier_id, PierNode)
+            except VenepaikkaGraphQLError as e:
+                failed_berths.append(FailedBerthType(id=global_id, error=str(e)))
+            else:
+                parsed.append((global_id, berth_id, berth_input))
+        return parsed
+
+    @classmethod
+    def _apply_input(cls, berth, berth_input, taken_numbers):
+        """
+        Validate and apply the input to the berth (without saving it).
+        Returns the updated fields and the dimensions of the new berth type, if any.
+        """
+        width = berth_input.pop("width", None)
+        length = berth_input.pop("length", None)
+        depth_in_input = "depth" in berth_input
+        depth = berth_input.pop("depth", None)
+        mooring_type = berth_input.pop("mooring_type", None)
+
+        dimensions = None
+        if any([width, length, depth_in_input, mooring_type]):
+            old_berth_type = berth.berth_type
+            dimensions = BerthType.objects.normalize_dimensions(
+                width or old_berth_type.width,
+                length or old_berth_type.length,
+                # Checking directly if it's in the input keys because it allows null values
+                depth if depth_in_input else old_berth_type.depth,
+                mooring_type or old_berth_type.mooring_type,
+            )
+
+        old_number_key = (berth.pier_id, berth.number)
+        for field, value in berth_input.items():
+            setattr(berth, field, value)
+        berth.clean_fields(exclude=["pier", "berth_type"])
+
+        # Numbers are never swapped within the same batch, since the unique
+        # constraint is checked row by row when the berths are updated
+        number_key = (berth.pier_id, berth.number)
+        if number_key != old_number_key:
+            if number_key in taken_numbers:
+                raise ValidationError(
+                    _("Berth with this Pier and Number already exists.")
+                )
+            taken_numbers.add(number_key)
+
+        fields = {"pier" if field == "pier_id" else field for field in berth_input}
+        return fields, dimensions
+
+    @classmethod
+    @transaction.atomic
+    def _save_berths(cls, berths, berth_dimensions, update_fields):
+        berth_types = BerthType.objects.get_or_create_many(berth_dimensions.values())
+        modified_at = now()
+        for berth in berths:
+            berth.modified_at = modified_at
+            if dimensions := berth_dimensions.get(berth):
+                berth.berth_type = berth_types[dimensions]
+        try:
+            Berth.objects.bulk_update(
+                berths,
+                fields=sorted(update_fields),
+                batch_size=BERTH_BULK_UPDATE_BATCH_SIZE,
+            )
+        except IntegrityError as e:
+            raise VenepaikkaGraphQLError(e)
+
+    @classmethod
+    @change_permission_required(Berth)
+    def mutate_and_get_payload(cls, root, info, berths, **input):
+        successful_berths = []
+        failed_berths = []
+
+        parsed = cls._parse_inputs(berths, failed_berths)
+        berths_by_id = Berth.objects.select_related("berth_type").in_bulk(
+            [berth_id for _global_id, berth_id, _input in parsed]
+        )
+        pier_ids = {
+            berth_input["pier_id"]
+            for _global_id, _berth_id, berth_input in parsed
+            if "pier_id" in berth_input
+        }
+        existing_pier_ids = set(
+            Pier.objects.filter(id__in=pier_ids).values_list("id", flat=True)
+        )
+        taken_numbers = set(
+            Berth.objects.filter(
+                Q(pier_id__in=pier_ids)
+                | Q(pier_id__in={berth.pier_id for berth in berths_by_id.values()})
+            )
+            .order_by()
+            .values_list("pier_id", "number")
+        )
+
+        update_fields = {"modified_at"}
+        berth_dimensions = {}
+        for global_id, berth_id, berth_input in parsed:
+            try:
+                if not (berth := berths_by_id.get(berth_id)):
+                    raise VenepaikkaGraphQLError(
+                        _("Berth matching query does not exist.")
+                    )
+                if berth_input.get("pier_id", berth.pier_id) not in (
+                    existing_pier_ids | {berth.pier_id}
+                ):
+                    raise VenepaikkaGraphQLError(
+                        _("Pier matching query does not exist.")
+                    )
+                fields, dimensions = cls._apply_input(berth, berth_input, taken_numbers)
+            except (ValidationError, VenepaikkaGraphQLError) as e:
+                failed_berths.append(FailedBerthType(id=global_id, error=str(e)))
+                continue
+
+            update_fields |= fields
+            if dimensions:
+                berth_dimensions[berth] = dimensions
+                update_fields.add("berth_type")
+            successful_berths.append(berth)
+
+        cls._save_berths(successful_berths, berth_dimensions, update_fields)
+
+        # bulk_update doesn't send the signals invalidating the cached queries,
+        # which also include the pier and harbor availability aggregates
+        if successful_berths:
+            bump_public_query_cache_version()
+
+        return BulkUpdateBerthsMutation(
+            successful_berths=successful_berths, failed_berths=failed_berths
+        )
+
+
 class DeleteBerthMutation(graphene.ClientIDMutation):
     class Input:
         id = graphene.ID(required=True)
@@ -819,6 +993,14 @@ class Mutation:
         "\n* Both BerthType ID and BerthType dimensions are passed"
         "\n* BerthType dimensions or BerthMooringType are missing"
     )
+    bulk_update_berths = BulkUpdateBerthsMutation.Field(
+        description="Updates multiple `Berth` objects at once."
+        "\n\n**Requires permissions** to edit resources."
+        "\n\nThe berth types matching the new dimensions are resolved "
+        "(or created) for all the berths together. "
+        "The berths that could not be updated are returned in `failedBerths`, "
+        "while the rest are updated in a single transaction."
+    )
 
     # Harbors
     create_harbor = CreateHarborMutation.Field()
@@ -138,21 +138,20 @@ class Query:
         return Harbor.objects.filter(servicemap_id=kwargs.get("servicemap_id")).first()
 
     def resolve_harbors(self, info, **kwargs):
-        # TODO: optimize this further
-        # currently, still results in too many DB queries
-        # although, django-graphene might introduce fixes for this
-        # so, check the state of this against a newer version later
-
         servicemap_ids = kwargs.get("servicemap_ids", None)
         qs = Harbor.objects.translated(get_language())
         qs = qs.filter(servicemap_id__in=servicemap_ids) if servicemap_ids else qs.all()
 
         return (
             qs.prefetch_related(
+                "translations",
                 Prefetch(
                     "piers",
                     queryset=Pier.objects.prefetch_related(
-                        Prefetch("berths", queryset=Berth.objects.all())
+                        Prefetch(
+                            "berths",
+                            queryset=Berth.objects.select_related("berth_type"),
+                        )
                     ),
                 ),
                 "piers__suitable_boat_types",
@@ -182,17 +181,8 @@ class Query:
         ).select_related("area", "area__availability_level", "area__municipality")
 
     def resolve_winter_storage_areas(self, info, **kwargs):
-        # TODO: optimize this further
-        # currently, still results in too many DB queries
-        # although, django-graphene might introduce fixes for this
-        # so, check the state of this against a newer version later
-
+        # The place counters are stored in the areas, so the sections
+        # and places don't need to be loaded
         return WinterStorageArea.objects.prefetch_related(
-            "translations",
-            Prefetch(
-                "sections",
-                queryset=WinterStorageSection.objects.prefetch_related(
-                    Prefetch("places", queryset=WinterStoragePlace.objects.all())
-                ),
-            ),
+            "translations"
         ).select_related("availability_level", "municipality")
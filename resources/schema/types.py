@@ -5,7 +5,6 @@ from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from graphene import relay
 from graphene_django.fields import DjangoConnectionField
-from graphene_django.filter import DjangoFilterConnectionField
 from graphene_django.types import DjangoObjectType
 
 from applications.models import BerthApplication, WinterStorageApplication
@@ -14,8 +13,13 @@ from leases.models import BerthLease, WinterStorageLease
 from payments.models import BerthSwitchOffer
 from users.decorators import view_permission_required
 from utils.enum import graphene_enum
-from utils.schema import CountConnection
+from utils.schema import (
+    CONNECTION_ARGS,
+    CountConnection,
+    DjangoFilterListConnectionField,
+)
 
+from ..counters import refresh_stale_winter_storage_counters
 from ..enums import BerthMooringType
 from ..models import (
     AvailabilityLevel,
@@ -28,7 +32,7 @@ from ..models import (
     WinterStoragePlaceType,
     WinterStorageSection,
 )
-from .utils import resolve_piers
+from .utils import is_prefetched, resolve_piers
 
 BerthMooringTypeEnum = graphene_enum(BerthMooringType)
 
@@ -82,6 +86,14 @@ class PierNode(graphql_geojson.GeoJSONType):
         connection_class = CountConnection
 
     def resolve_berths(self, info, **kwargs):
+        # The berths prefetched along with the piers can be filtered in memory
+        if is_prefetched(self, "berths"):
+            berths = self.berths.all()
+            if "is_available" in kwargs:
+                is_available = kwargs.get("is_available")
+                return [berth for berth in berths if berth.is_available == is_available]
+            return list(berths)
+
         filters = Q()
         if "is_available" in kwargs:
             filters &= Q(is_available=kwargs.get("is_available"))
@@ -92,7 +104,7 @@ class PierNode(graphql_geojson.GeoJSONType):
 
     def resolve_suitable_boat_types(self, info, **kwargs):
         return info.context.suitable_boat_type_loader.load_many(
-            keys=self.suitable_boat_types.values_list("id", flat=True)
+            keys=[boat_type.id for boat_type in self.suitable_boat_types.all()]
         )
 
 
@@ -140,10 +152,7 @@ class BerthNode(DjangoObjectType):
 
     @view_permission_required(BerthLease, BerthApplication, CustomerProfile)
     def resolve_prev_season_lease(self, info, **kwargs):
-        try:
-            return self.leases.filter_prev_season_leases().latest("end_date")
-        except BerthLease.DoesNotExist:
-            return None
+        return info.context.prev_season_lease_for_berth_loader.load(self.id)
 
     @view_permission_required(BerthSwitchOffer, BerthApplication, CustomerProfile)
     def resolve_pending_switch_offer(self, info, **kwargs):
@@ -165,6 +174,11 @@ class BerthNode(DjangoObjectType):
         return self.berth_type.mooring_type
 
 
+class FailedBerthType(graphene.ObjectType):
+    id = graphene.ID(required=True)
+    error = graphene.String()
+
+
 class AbstractMapType:
     url = graphene.String(required=True)
 
@@ -207,7 +221,7 @@ class HarborNode(graphql_geojson.GeoJSONType):
     max_width = graphene.Float()
     max_length = graphene.Float()
     max_depth = graphene.Float()
-    piers = DjangoFilterConnectionField(
+    piers = DjangoFilterListConnectionField(
         PierNode,
         min_berth_width=graphene.Float(),
         min_berth_length=graphene.Float(),
@@ -234,6 +248,9 @@ class HarborNode(graphql_geojson.GeoJSONType):
         return self.image_file_url
 
     def resolve_piers(self, info, **kwargs):
+        # The piers prefetched by the harbors query can be used when they aren't filtered
+        if is_prefetched(self, "piers") and not kwargs.keys() - CONNECTION_ARGS:
+            return list(self.piers.all())
         return resolve_piers(info, **kwargs).filter(harbor_id=self.id)
 
     def resolve_max_width(self, info, **kwargs):
@@ -255,13 +272,7 @@ class HarborNode(graphql_geojson.GeoJSONType):
         return self.number_of_places or 0
 
     def resolve_suitable_boat_types(self, info, **kwargs):
-        type_ids = (
-            self.piers.order_by("suitable_boat_types__id")
-            .distinct("suitable_boat_types__id")
-            .values_list("suitable_boat_types", flat=True)
-        )
-        filtered_ids = list(filter(None, type_ids))
-        return info.context.suitable_boat_type_loader.load_many(keys=filtered_ids)
+        return info.context.boat_types_for_harbor_loader.load(self.id)
 
 
 class WinterStoragePlaceNode(DjangoObjectType):
@@ -329,6 +340,16 @@ class WinterStorageSectionNode(graphql_geojson.GeoJSONType):
     number_of_places = graphene.Int(required=True)
     number_of_free_places = graphene.Int(required=True)
     number_of_inactive_places = graphene.Int(required=True)
+    unmarked_capacity = graphene.Float(
+        description="Total area (m²) for the boats of the unmarked leases"
+    )
+    unmarked_allocated_area = graphene.Float(
+        required=True,
+        description="Area (m²) taken by the boats of the active unmarked leases",
+    )
+    unmarked_free_area = graphene.Float(
+        description="Negative when the unmarked leases exceed the capacity"
+    )
     leases = DjangoConnectionField(
         "leases.schema.WinterStorageLeaseNode",
         description="**Requires permissions** to query this field.",
@@ -348,6 +369,12 @@ class WinterStorageSectionNode(graphql_geojson.GeoJSONType):
         interfaces = (relay.Node,)
         connection_class = CountConnection
 
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        # The free places depend on the date
+        refresh_stale_winter_storage_counters()
+        return super().get_queryset(queryset, info)
+
     @view_permission_required(
         WinterStorageLease, WinterStorageApplication, CustomerProfile
     )
@@ -379,6 +406,12 @@ class WinterStorageAreaNode(graphql_geojson.GeoJSONType):
         filterset_class = WinterStorageAreaFilter
         connection_class = CountConnection
 
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        # The free places depend on the date
+        refresh_stale_winter_storage_counters()
+        return super().get_queryset(queryset, info)
+
     name = graphene.String()
     street_address = graphene.String()
     municipality = graphene.String()
@@ -388,6 +421,16 @@ class WinterStorageAreaNode(graphql_geojson.GeoJSONType):
     number_of_places = graphene.Int(required=True)
     number_of_free_places = graphene.Int(required=True)
     number_of_inactive_places = graphene.Int(required=True)
+    unmarked_capacity = graphene.Float(
+        description="Total area (m²) for the boats of the unmarked leases"
+    )
+    unmarked_allocated_area = graphene.Float(
+        required=True,
+        description="Area (m²) taken by the boats of the active unmarked leases",
+    )
+    unmarked_free_area = graphene.Float(
+        description="Negative when the unmarked leases exceed the capacity"
+    )
     electricity = graphene.Boolean(required=True)
     water = graphene.Boolean(required=True)
     gate = graphene.Boolean(required=True)
@@ -397,28 +440,3 @@ class WinterStorageAreaNode(graphql_geojson.GeoJSONType):
 
     def resolve_image_file(self, info, **kwargs):
         return self.image_file_url
-
-    def resolve_max_width(self, info, **kwargs):
-        return (
-            max([section.max_width or 0 for section in self.sections.all()], default=0)
-            or None
-        )
-
-    def resolve_max_length(self, info, **kwargs):
-        return (
-            max([section.max_length or 0 for section in self.sections.all()], default=0)
-            or None
-        )
-
-    def resolve_number_of_free_places(self, info, **kwargs):
-        return sum(
-            [section.number_of_free_places or 0 for section in self.sections.all()]
-        )
-
-    def resolve_number_of_inactive_places(self, info, **kwargs):
-        return sum(
-            [section.number_of_inactive_places or 0 for section in self.sections.all()]
-        )
-
-    def resolve_number_of_places(self, info, **kwargs):
-        return sum([section.number_of_places or 0 for section in self.sections.all()])
@@ -10,6 +10,10 @@ from utils.relay import get_node_from_global_id
 from ..models import Berth, BerthType, Pier
 
 
+def is_prefetched(instance, related_name: str) -> bool:
+    return related_name in getattr(instance, "_prefetched_objects_cache", {})
+
+
 def resolve_piers(info, **kwargs):
     min_width = kwargs.get("min_berth_width")
     min_length = kwargs.get("min_berth_length")
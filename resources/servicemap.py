@@ -0,0 +1,204 @@
+import logging
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import requests
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import transaction
+from munigeo.models import Municipality
+from requests.adapters import HTTPAdapter, Retry
+
+from .models import AbstractArea
+
+logger = logging.getLogger(__name__)
+
+SERVICEMAP_VALIDATORS_CACHE_KEY_PREFIX = "servicemap_unit"
+
+
+@dataclass
+class ServicemapUnit:
+    unit_id: str
+    # None if the unit has not been modified since the previous fetch
+    data: Optional[dict]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.data is None
+
+
+class ServicemapClient:
+    """
+    Fetches the Servicemap units concurrently with a pooled session.
+
+    The ETag and Last-Modified headers of the responses are stored in the cache,
+    so the next fetches are conditional and the unchanged units are not downloaded again.
+    """
+
+    def __init__(self, api_url: str = None, max_workers: int = None, timeout=10):
+        self.api_url = (api_url or settings.SERVICEMAP_API_URL).rstrip("/")
+        self.max_workers = max_workers or settings.SERVICEMAP_MAX_WORKERS
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(
+                total=3, backoff_factor=1, status_forcelist=[502, 503, 504]
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_unit_url(self, unit_id: str) -> str:
+        return f"{self.api_url}/unit/{unit_id}/"
+
+    @staticmethod
+    def _get_validators_cache_key(unit_id: str) -> str:
+        return f"{SERVICEMAP_VALIDATORS_CACHE_KEY_PREFIX}:{unit_id}"
+
+    def fetch_unit(self, unit_id: str) -> ServicemapUnit:
+        headers = {}
+        if validators := cache.get(self._get_validators_cache_key(unit_id)):
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.session.get(
+            self.get_unit_url(unit_id), headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 304:
+            return ServicemapUnit(unit_id, None)
+
+        response.raise_for_status()
+        return ServicemapUnit(
+            unit_id,
+            response.json(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def fetch_units(
+        self, unit_ids: Iterable[str]
+    ) -> Iterator[Tuple[str, Union[ServicemapUnit, Exception]]]:
+        """Yield the units (or the errors fetching them) in the order they are received"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_unit, unit_id): unit_id
+                for unit_id in unit_ids
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def save_validators(self, unit: ServicemapUnit) -> None:
+        """Store the validators once the unit has been processed successfully"""
+        if unit.etag or unit.last_modified:
+            cache.set(
+                self._get_validators_cache_key(unit.unit_id),
+                {"etag": unit.etag, "last_modified": unit.last_modified},
+                None,
+            )
+
+
+@dataclass
+class AreaSyncResult:
+    area: AbstractArea
+    # field name -> (old value, new value)
+    changes: Dict[str, Tuple] = field(default_factory=dict)
+    not_modified: bool = False
+    error: Optional[str] = None
+
+
+def get_area_changes(
+    area: AbstractArea, data: dict, municipalities: Dict[str, Municipality]
+) -> Dict[str, Tuple]:
+    """Apply the Servicemap unit data to the area (without saving it)
+    and return the changed fields"""
+    changes = {}
+
+    def _set(name, value, language=None):
+        if language:
+            area.set_current_language(language)
+            old_value = getattr(area, name) if area.has_translation(language) else None
+        else:
+            old_value = getattr(area, name)
+        if old_value != value:
+            setattr(area, name, value)
+            changes[f"{name}_{language}" if language else name] = (old_value, value)
+
+    if (municipality := municipalities.get(data["municipality"])) is None:
+        raise Municipality.DoesNotExist(
+            f"Municipality {data['municipality']} does not exist"
+        )
+
+    longitude, latitude = data["location"]["coordinates"]
+
+    _set("zip_code", data["address_zip"])
+    _set("www_url", (data.get("www") or {}).get("fi") or "")  # only FI for now
+    _set("email", data["email"] or "")
+    _set("phone", data["phone"] or "")
+    _set("municipality_id", municipality.id)
+    _set("location", Point(longitude, latitude, srid=settings.DEFAULT_SRID))
+
+    current_language = area.get_current_language()
+    for lang, value in data["name"].items():
+        _set("name", value, language=lang)
+    for lang, value in data["street_address"].items():
+        _set("street_address", value, language=lang)
+    area.set_current_language(current_language)
+
+    return changes
+
+
+def sync_areas_from_servicemap(
+    queryset, client: ServicemapClient = None, dry_run: bool = False
+) -> List[AreaSyncResult]:
+    """
+    Update the areas of the queryset (harbors or winter storage areas)
+    from their Servicemap units.
+
+    Only the changed areas are saved, once with all their translations.
+    """
+    client = client or ServicemapClient()
+    areas = {
+        area.servicemap_id: area
+        for area in queryset.exclude(servicemap_id__isnull=True)
+        .exclude(servicemap_id="")
+        .prefetch_related("translations")
+    }
+    municipalities = Municipality.objects.in_bulk()
+
+    results = []
+    for unit_id, unit in client.fetch_units(areas.keys()):
+        result = AreaSyncResult(areas[unit_id])
+        results.append(result)
+
+        if isinstance(unit, Exception):
+            result.error = str(unit)
+            continue
+        if unit.not_modified:
+            result.not_modified = True
+            continue
+
+        try:
+            result.changes = get_area_changes(result.area, unit.data, municipalities)
+            if result.changes and not dry_run:
+                with transaction.atomic():
+                    result.area.save()
+        except Exception as e:
+            logger.exception(f"Could not update the area {unit_id}")
+            result.error = str(e)
+            continue
+
+        if not dry_run:
+            client.save_validators(unit)
+
+    return results
@@ -0,0 +1,95 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from berth_reservations.public_query_cache import bump_public_query_cache_version
+from berth_reservations.translated_names import invalidate_translated_names
+
+from .counters import (
+    update_winter_storage_area_counters,
+    update_winter_storage_counters_on_commit,
+)
+from .models import (
+    AvailabilityLevel,
+    Berth,
+    BoatType,
+    Harbor,
+    Pier,
+    WinterStorageArea,
+    WinterStoragePlace,
+    WinterStoragePlaceType,
+    WinterStorageSection,
+)
+
+HarborTranslation = Harbor._parler_meta.root_model
+WinterStorageAreaTranslation = WinterStorageArea._parler_meta.root_model
+BoatTypeTranslation = BoatType._parler_meta.root_model
+AvailabilityLevelTranslation = AvailabilityLevel._parler_meta.root_model
+
+
+@receiver([post_save, post_delete], sender=Harbor)
+@receiver([post_save, post_delete], sender=HarborTranslation)
+@receiver([post_save, post_delete], sender=Pier)
+@receiver([post_save, post_delete], sender=Berth)
+@receiver([post_save, post_delete], sender=WinterStorageArea)
+@receiver([post_save, post_delete], sender=WinterStorageAreaTranslation)
+@receiver([post_save, post_delete], sender=WinterStorageSection)
+@receiver([post_save, post_delete], sender=WinterStoragePlace)
+def invalidate_public_query_cache_handler(sender, instance, **kwargs):
+    bump_public_query_cache_version()
+
+
+@receiver(pre_save, sender=WinterStoragePlace)
+def store_previous_place_section(sender, instance, raw=False, **kwargs):
+    """Keep the previous section, so its counters are updated if the place moves"""
+    instance._previous_section_id = (
+        None
+        if raw or instance._state.adding
+        else WinterStoragePlace.objects.filter(pk=instance.pk)
+        .values_list("winter_storage_section_id", flat=True)
+        .first()
+    )
+
+
+@receiver([post_save, post_delete], sender=WinterStoragePlace)
+def update_section_counters_on_place_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_winter_storage_counters_on_commit(
+        [
+            instance.winter_storage_section_id,
+            getattr(instance, "_previous_section_id", None),
+        ]
+    )
+
+
+@receiver(post_save, sender=WinterStoragePlaceType)
+def update_section_counters_on_place_type_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_winter_storage_counters_on_commit(
+        WinterStoragePlace.objects.filter(place_type=instance)
+        .order_by()
+        .values_list("winter_storage_section_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver([post_save, post_delete], sender=WinterStorageSection)
+def update_area_counters_on_section_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_winter_storage_area_counters(
+        WinterStorageArea.objects.filter(id=instance.area_id)
+    )
+
+
+@receiver([post_save, post_delete], sender=Harbor)
+@receiver([post_save, post_delete], sender=HarborTranslation)
+@receiver([post_save, post_delete], sender=WinterStorageArea)
+@receiver([post_save, post_delete], sender=WinterStorageAreaTranslation)
+@receiver([post_save, post_delete], sender=BoatType)
+@receiver([post_save, post_delete], sender=BoatTypeTranslation)
+@receiver([post_save, post_delete], sender=AvailabilityLevel)
+@receiver([post_save, post_delete], sender=AvailabilityLevelTranslation)
+def invalidate_translated_names_handler(sender, **kwargs):
+    invalidate_translated_names(sender)
@@ -1,3 +1,8 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
 from applications.tests.conftest import berth_application  # noqa
@@ -76,3 +81,53 @@ def winter_storage_place():
 def winter_storage_place_type():
     winter_storage_place_type = WinterStoragePlaceTypeFactory()
     return winter_storage_place_type
+
+
+class ServicemapStandInServer(ThreadingHTTPServer):
+    """Local stand-in for the Servicemap API serving the units in `units`"""
+
+    def __init__(self):
+        self.units = {}
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), ServicemapStandInHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/"
+
+
+class ServicemapStandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        match = re.fullmatch(r"/unit/(\w+)/", self.path)
+        if not match or match.group(1) not in self.server.units:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps(self.server.units[match.group(1)]).encode()
+        etag = '"{}"'.format(hash(body))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servicemap_server():
+    server = ServicemapStandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -1,12 +1,18 @@
 import random
 from datetime import date
+from decimal import Decimal
+from io import StringIO
 from unittest import mock
 
 import pytest  # noqa
 from dateutil.relativedelta import relativedelta
 from dateutil.utils import today
+from django.core.management import call_command
+from django.db import transaction
+from django.db.transaction import on_commit
 from freezegun import freeze_time
 
+from customers.models import Boat
 from leases.consts import ACTIVE_LEASE_STATUSES, INACTIVE_LEASE_STATUSES
 from leases.enums import LeaseStatus
 from leases.tests.factories import BerthLeaseFactory, WinterStorageLeaseFactory
@@ -21,10 +27,21 @@ from leases.utils import (
 from payments.enums import OfferStatus
 from payments.tests.factories import BerthSwitchOfferFactory
 
-from ..models import Berth, Pier, WinterStoragePlace, WinterStorageSection
+from ..counters import (
+    refresh_stale_winter_storage_counters,
+    update_winter_storage_counters,
+)
+from ..models import (
+    Berth,
+    Pier,
+    WinterStorageArea,
+    WinterStoragePlace,
+    WinterStorageSection,
+)
 from .factories import (
     BerthFactory,
     PierFactory,
+    WinterStorageAreaFactory,
     WinterStoragePlaceFactory,
     WinterStorageSectionFactory,
 )
@@ -443,3 +460,190 @@ def test_winter_storage_section_number_of_places():
     assert section.number_of_free_places == free_places
     assert section.number_of_inactive_places == inactive_places
     assert section.number_of_places == free_places + inactive_places
+
+
+def test_winter_storage_counters_updated_on_lease_change():
+    section = WinterStorageSectionFactory()
+    place = WinterStoragePlaceFactory(winter_storage_section=section, number=1)
+    WinterStoragePlaceFactory(winter_storage_section=section, number=2)
+
+    lease = WinterStorageLeaseFactory(place=place, status=LeaseStatus.PAID)
+    # The factory mutes the post_save signals
+    lease.save()
+
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.number_of_places == 2
+    assert section.number_of_free_places == 1
+    area = WinterStorageArea.objects.get(pk=section.area_id)
+    assert area.number_of_free_places == 1
+
+    lease.status = LeaseStatus.REFUSED
+    lease.save()
+
+    assert WinterStorageSection.objects.get(pk=section.pk).number_of_free_places == 2
+    assert WinterStorageArea.objects.get(pk=area.pk).number_of_free_places == 2
+
+
+def test_winter_storage_area_counters():
+    area = WinterStorageAreaFactory()
+    section_1 = WinterStorageSectionFactory(area=area)
+    section_2 = WinterStorageSectionFactory(area=area)
+    place_1 = WinterStoragePlaceFactory(winter_storage_section=section_1, number=1)
+    place_2 = WinterStoragePlaceFactory(
+        winter_storage_section=section_2, number=1, is_active=False
+    )
+
+    area = WinterStorageArea.objects.get(pk=area.pk)
+    assert area.number_of_places == 2
+    assert area.number_of_free_places == 1
+    assert area.number_of_inactive_places == 1
+    assert area.max_width == max(place_1.place_type.width, place_2.place_type.width)
+    assert area.max_length == max(place_1.place_type.length, place_2.place_type.length)
+
+    section_2.delete()
+
+    area = WinterStorageArea.objects.get(pk=area.pk)
+    assert area.number_of_places == 1
+    assert area.number_of_inactive_places == 0
+    assert area.max_width == place_1.place_type.width
+
+
+def test_winter_storage_unmarked_allocated_area():
+    area = WinterStorageAreaFactory()
+    section = WinterStorageSectionFactory(area=area, unmarked_capacity=Decimal("50"))
+    WinterStorageSectionFactory(area=area, unmarked_capacity=Decimal("30"))
+
+    lease = WinterStorageLeaseFactory(
+        place=None,
+        section=section,
+        boat__width=Decimal("2.5"),
+        boat__length=Decimal("6"),
+        status=LeaseStatus.PAID,
+    )
+    # The factory mutes the post_save signals
+    lease.save()
+
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.unmarked_allocated_area == Decimal("15.00")
+    assert section.unmarked_free_area == Decimal("35.00")
+    area = WinterStorageArea.objects.get(pk=area.pk)
+    assert area.unmarked_capacity == Decimal("80.00")
+    assert area.unmarked_allocated_area == Decimal("15.00")
+    assert area.unmarked_free_area == Decimal("65.00")
+
+    boat = lease.boat
+    boat.length = Decimal("8")
+    boat.save()
+
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.unmarked_allocated_area == Decimal("20.00")
+
+    lease.status = LeaseStatus.REFUSED
+    lease.save()
+
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.unmarked_allocated_area == Decimal("0.00")
+    assert WinterStorageArea.objects.get(pk=area.pk).unmarked_allocated_area == Decimal(
+        "0.00"
+    )
+
+
+def test_update_winter_storage_counters_command():
+    place = WinterStoragePlaceFactory()
+    section = place.winter_storage_section
+    # Leave the counters out of date, like when the season changes
+    WinterStorageSection.objects.filter(pk=section.pk).update(number_of_free_places=0)
+    WinterStorageArea.objects.filter(pk=section.area_id).update(number_of_free_places=0)
+
+    call_command("update_winter_storage_counters", stdout=StringIO())
+
+    assert WinterStorageSection.objects.get(pk=section.pk).number_of_free_places == 1
+    assert WinterStorageArea.objects.get(pk=section.area_id).number_of_free_places == 1
+
+
+def test_winter_storage_counters_updated_once_on_commit(
+    monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(transaction, "on_commit", on_commit)
+    section = WinterStorageSectionFactory()
+    places = WinterStoragePlaceFactory.create_batch(3, winter_storage_section=section)
+    leases = [
+        WinterStorageLeaseFactory(place=place, status=LeaseStatus.PAID)
+        for place in places
+    ]
+
+    with mock.patch(
+        "resources.counters.update_winter_storage_counters",
+        wraps=update_winter_storage_counters,
+    ) as mock_update_counters, django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            for lease in leases:
+                # The factory mutes the post_save signals
+                lease.save()
+            assert mock_update_counters.call_count == 0
+
+    mock_update_counters.assert_called_once()
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.number_of_places == 3
+    assert section.number_of_free_places == 0
+
+
+def test_winter_storage_counters_not_updated_for_other_boat_changes():
+    lease = WinterStorageLeaseFactory(
+        place=None, section=WinterStorageSectionFactory(), status=LeaseStatus.PAID
+    )
+    boat = Boat.objects.get(pk=lease.boat_id)
+
+    with mock.patch(
+        "leases.signals.update_winter_storage_counters_on_commit"
+    ) as mock_update_counters:
+        boat.name = "New name"
+        boat.save()
+        mock_update_counters.assert_not_called()
+
+        boat.width += 1
+        boat.save()
+        mock_update_counters.assert_called_once()
+
+
+def test_winter_storage_counters_updated_when_place_moves():
+    place = WinterStoragePlaceFactory()
+    section = place.winter_storage_section
+    other_section = WinterStorageSectionFactory()
+
+    place.winter_storage_section = other_section
+    place.save()
+
+    assert WinterStorageSection.objects.get(pk=section.pk).number_of_places == 0
+    assert WinterStorageArea.objects.get(pk=section.area_id).number_of_places == 0
+    assert WinterStorageSection.objects.get(pk=other_section.pk).number_of_places == 1
+
+
+def test_refresh_stale_winter_storage_counters(monkeypatch):
+    monkeypatch.setattr("resources.counters._counters_checked_on", None)
+    with freeze_time("2021-01-01T08:00:00Z"):
+        place = WinterStoragePlaceFactory()
+        lease = WinterStorageLeaseFactory(
+            place=place,
+            status=LeaseStatus.PAID,
+            start_date=date(2020, 9, 15),
+            end_date=date(2021, 6, 10),
+        )
+        lease.save()
+        section = WinterStorageSection.objects.get(pk=place.winter_storage_section_id)
+        assert section.number_of_free_places == 0
+        assert section.counters_updated_on == date(2021, 1, 1)
+
+        # The counters are up to date
+        assert refresh_stale_winter_storage_counters() == 0
+
+    # The lease has ended without anything being saved
+    with freeze_time("2021-07-01T08:00:00Z"):
+        assert refresh_stale_winter_storage_counters() == 1
+        # Only checked once a day
+        assert refresh_stale_winter_storage_counters() == 0
+
+    section = WinterStorageSection.objects.get(pk=section.pk)
+    assert section.number_of_free_places == 1
+    assert section.counters_updated_on == date(2021, 7, 1)
+    assert WinterStorageArea.objects.get(pk=section.area_id).number_of_free_places == 1
@@ -5,6 +5,7 @@ import uuid
 import pytest
 from graphql_relay import from_global_id, to_global_id
 
+from berth_reservations.public_query_cache import get_public_query_cache_version
 from berth_reservations.tests.utils import (
     assert_doesnt_exist,
     assert_field_missing,
@@ -35,7 +36,7 @@ from ..schema import (
     WinterStoragePlaceTypeNode,
     WinterStorageSectionNode,
 )
-from .factories import BerthTypeFactory, WinterStoragePlaceFactory
+from .factories import BerthFactory, BerthTypeFactory, WinterStoragePlaceFactory
 
 CREATE_BERTH_MUTATION = """
 mutation CreateBerth($input: CreateBerthMutationInput!) {
@@ -568,6 +569,148 @@ def test_update_berth_not_enough_permissions(api_client, berth, pier, berth_type
     assert_not_enough_permissions(executed)
 
 
+BULK_UPDATE_BERTHS_MUTATION = """
+mutation BulkUpdateBerths($input: BulkUpdateBerthsMutationInput!) {
+    bulkUpdateBerths(input: $input) {
+        successfulBerths {
+            id
+            number
+            isActive
+            pier {
+                id
+            }
+            width
+            length
+            depth
+            mooringType
+        }
+        failedBerths {
+            id
+            error
+        }
+    }
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["harbor_services", "berth_services"],
+    indirect=True,
+)
+def test_bulk_update_berths(pier, berth_type, api_client):
+    berths = BerthFactory.create_batch(3, pier=pier, berth_type=berth_type)
+    other_berth = BerthFactory(pier=pier, number="999")
+    global_ids = [to_global_id(BerthNode._meta.name, str(b.id)) for b in berths]
+    new_width = round(float(berth_type.width) + 1, 2)
+
+    variables = {
+        "berths": [
+            # Uses the existing berth type
+            {
+                "id": global_ids[0],
+                "width": float(berth_type.width),
+                "length": float(berth_type.length),
+                "isActive": False,
+            },
+            # Creates a new berth type, shared by both berths
+            {"id": global_ids[1], "width": new_width},
+            {"id": global_ids[2], "width": new_width, "number": "1000"},
+            # The number is already taken
+            {"id": global_ids[0], "number": "999"},
+            {
+                "id": to_global_id(BerthNode._meta.name, str(other_berth.id)),
+                "number": "1000",
+            },
+        ]
+    }
+    assert BerthType.objects.count() == 2
+
+    executed = api_client.execute(BULK_UPDATE_BERTHS_MUTATION, input=variables)
+
+    assert BerthType.objects.count() == 3
+    payload = executed["data"]["bulkUpdateBerths"]
+    assert [b["id"] for b in payload["successfulBerths"]] == global_ids
+    assert payload["successfulBerths"][0]["isActive"] is False
+    assert payload["successfulBerths"][0]["width"] == float(berth_type.width)
+    assert payload["successfulBerths"][2]["number"] == "1000"
+    assert {b["width"] for b in payload["successfulBerths"][1:]} == {new_width}
+    assert payload["failedBerths"] == [
+        {
+            "id": global_ids[0],
+            "error": "The same berth cannot be updated more than once",
+        },
+        {
+            "id": to_global_id(BerthNode._meta.name, str(other_berth.id)),
+            "error": "['Berth with this Pier and Number already exists.']",
+        },
+    ]
+
+    assert Berth.objects.get(id=berths[0].id).berth_type == berth_type
+    assert not Berth.objects.get(id=berths[0].id).is_active
+    new_berth_type = Berth.objects.get(id=berths[1].id).berth_type
+    assert new_berth_type != berth_type
+    assert Berth.objects.get(id=berths[2].id).berth_type == new_berth_type
+    assert Berth.objects.get(id=other_berth.id).number == "999"
+
+
+def test_bulk_update_berths_invalidates_public_query_cache(berth, superuser_api_client):
+    version = get_public_query_cache_version()
+
+    superuser_api_client.execute(
+        BULK_UPDATE_BERTHS_MUTATION,
+        input={
+            "berths": [
+                {
+                    "id": to_global_id(BerthNode._meta.name, str(berth.id)),
+                    "comment": "foobar",
+                }
+            ]
+        },
+    )
+
+    assert get_public_query_cache_version() != version
+    assert Berth.objects.get(id=berth.id).comment == "foobar"
+
+
+def test_bulk_update_berths_pier_does_not_exist(berth, superuser_api_client):
+    global_id = to_global_id(BerthNode._meta.name, str(berth.id))
+    variables = {
+        "berths": [
+            {"id": global_id, "pierId": to_global_id(PierNode._meta.name, uuid.uuid4())}
+        ]
+    }
+
+    executed = superuser_api_client.execute(
+        BULK_UPDATE_BERTHS_MUTATION, input=variables
+    )
+
+    assert executed["data"]["bulkUpdateBerths"] == {
+        "successfulBerths": [],
+        "failedBerths": [
+            {"id": global_id, "error": "Pier matching query does not exist."}
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "api_client",
+    ["api_client", "user", "berth_supervisor", "berth_handler"],
+    indirect=True,
+)
+def test_bulk_update_berths_not_enough_permissions(api_client, berth):
+    variables = {
+        "berths": [
+            {"id": to_global_id(BerthNode._meta.name, str(berth.id)), "number": "666"}
+        ]
+    }
+
+    executed = api_client.execute(BULK_UPDATE_BERTHS_MUTATION, input=variables)
+
+    assert Berth.objects.get(id=berth.id).number == berth.number
+    assert_not_enough_permissions(executed)
+
+
 CREATE_HARBOR_MUTATION = """
 mutation CreateHarbor($input: CreateHarborMutationInput!) {
     createHarbor(input: $input) {
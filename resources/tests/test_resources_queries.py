@@ -1625,3 +1625,70 @@ def test_get_winter_storage_area_services(api_client):
             ]
         }
     }
+
+
+PUBLIC_HARBORS_QUERY = """
+query PublicHarbors {
+    harbors {
+        edges {
+            node {
+                id
+            }
+        }
+    }
+}
+"""
+
+
+def _post_public_query(client, query, **extra):
+    return client.post(
+        "/graphql/",
+        json.dumps({"query": query}),
+        content_type="application/json",
+        **extra,
+    )
+
+
+def test_public_query_response_is_cached(
+    client, settings, harbor, django_assert_num_queries
+):
+    settings.PUBLIC_QUERY_CACHE_ENABLED = True
+
+    response = _post_public_query(client, PUBLIC_HARBORS_QUERY)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert json.loads(response.content)["data"]["harbors"]["edges"] == [
+        {"node": {"id": to_global_id(HarborNode._meta.name, harbor.id)}}
+    ]
+
+    with django_assert_num_queries(0):
+        cached_response = _post_public_query(client, PUBLIC_HARBORS_QUERY)
+        not_modified_response = _post_public_query(
+            client, PUBLIC_HARBORS_QUERY, HTTP_IF_NONE_MATCH=etag
+        )
+
+    assert cached_response.content == response.content
+    assert cached_response["ETag"] == etag
+    assert not_modified_response.status_code == 304
+    assert not_modified_response["ETag"] == etag
+
+
+def test_public_query_cache_invalidated_on_changes(client, settings, harbor):
+    settings.PUBLIC_QUERY_CACHE_ENABLED = True
+
+    response = _post_public_query(client, PUBLIC_HARBORS_QUERY)
+    HarborFactory()
+    new_response = _post_public_query(client, PUBLIC_HARBORS_QUERY)
+
+    assert new_response["ETag"] != response["ETag"]
+    assert len(json.loads(new_response.content)["data"]["harbors"]["edges"]) == 2
+
+
+def test_public_query_cache_ignores_mutations(client, settings):
+    settings.PUBLIC_QUERY_CACHE_ENABLED = True
+
+    response = _post_public_query(
+        client, "mutation { deleteHarbor(input: {id: 123}) { clientMutationId } }"
+    )
+
+    assert not response.has_header("ETag")
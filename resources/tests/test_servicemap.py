@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from ..models import Harbor, WinterStorageArea
+from ..servicemap import ServicemapClient, sync_areas_from_servicemap
+
+
+def _get_unit_data(municipality, name="Satama", street_address="Rantatie 1"):
+    return {
+        "address_zip": "00100",
+        "www": {"fi": "https://www.hel.fi/satama"},
+        "email": "satama@example.com",
+        "phone": "+358 9 123",
+        "municipality": municipality.id,
+        "location": {"type": "Point", "coordinates": [24.95, 60.17]},
+        "name": {"fi": name, "sv": f"{name} sv"},
+        "street_address": {"fi": street_address, "sv": f"{street_address} sv"},
+    }
+
+
+def test_update_harbors_from_servicemap(servicemap_server, harbor, municipality):
+    servicemap_server.units[harbor.servicemap_id] = _get_unit_data(municipality)
+    out = StringIO()
+
+    call_command(
+        "update_harbors_from_servicemap",
+        f"--servicemap-url={servicemap_server.url}",
+        stdout=out,
+    )
+
+    harbor = Harbor.objects.get(id=harbor.id)
+    assert harbor.zip_code == "00100"
+    assert harbor.www_url == "https://www.hel.fi/satama"
+    assert harbor.municipality == municipality
+    assert harbor.location.coords == (24.95, 60.17)
+    assert harbor.safe_translation_getter("name", language_code="fi") == "Satama"
+    assert harbor.safe_translation_getter("name", language_code="sv") == "Satama sv"
+    assert (
+        harbor.safe_translation_getter("street_address", language_code="sv")
+        == "Rantatie 1 sv"
+    )
+    assert "zip_code:" in out.getvalue()
+    assert "Successfully updated 1 harbors" in out.getvalue()
+
+
+def test_update_harbors_from_servicemap_conditional_request(
+    servicemap_server, harbor, municipality
+):
+    servicemap_server.units[harbor.servicemap_id] = _get_unit_data(municipality)
+    client = ServicemapClient(api_url=servicemap_server.url)
+
+    sync_areas_from_servicemap(Harbor.objects.all(), client=client)
+    modified_at = Harbor.objects.get(id=harbor.id).modified_at
+
+    [result] = sync_areas_from_servicemap(Harbor.objects.all(), client=client)
+
+    assert result.not_modified
+    assert "If-None-Match" in servicemap_server.requests[-1][1]
+    assert Harbor.objects.get(id=harbor.id).modified_at == modified_at
+
+
+def test_update_harbors_from_servicemap_only_changed_are_saved(
+    servicemap_server, harbor, municipality
+):
+    servicemap_server.units[harbor.servicemap_id] = _get_unit_data(municipality)
+    client = ServicemapClient(api_url=servicemap_server.url)
+    sync_areas_from_servicemap(Harbor.objects.all(), client=client)
+    modified_at = Harbor.objects.get(id=harbor.id).modified_at
+
+    # Fetch the unit again without the validators of the previous fetch
+    cache.clear()
+    [result] = sync_areas_from_servicemap(Harbor.objects.all(), client=client)
+
+    assert not result.not_modified
+    assert result.changes == {}
+    assert Harbor.objects.get(id=harbor.id).modified_at == modified_at
+
+
+def test_update_harbors_from_servicemap_dry_run(
+    servicemap_server, harbor, municipality
+):
+    old_zip_code = harbor.zip_code
+    servicemap_server.units[harbor.servicemap_id] = _get_unit_data(municipality)
+
+    call_command(
+        "update_harbors_from_servicemap",
+        f"--servicemap-url={servicemap_server.url}",
+        "--dry-run",
+        stdout=StringIO(),
+    )
+
+    assert Harbor.objects.get(id=harbor.id).zip_code == old_zip_code
+
+
+def test_update_winter_storage_areas_from_servicemap(
+    servicemap_server, winter_storage_area, municipality
+):
+    servicemap_server.units[winter_storage_area.servicemap_id] = _get_unit_data(
+        municipality, name="Talvisäilytys"
+    )
+    err = StringIO()
+
+    call_command(
+        "update_harbors_from_servicemap",
+        "--area-type=all",
+        f"--servicemap-url={servicemap_server.url}",
+        stdout=StringIO(),
+        stderr=err,
+    )
+
+    winter_storage_area = WinterStorageArea.objects.get(id=winter_storage_area.id)
+    assert winter_storage_area.municipality == municipality
+    assert (
+        winter_storage_area.safe_translation_getter("name", language_code="fi")
+        == "Talvisäilytys"
+    )
+    assert err.getvalue() == ""
@@ -2,7 +2,12 @@ import pytest
 
 from customers.models import User
 
-from ..utils import _build_permstring, user_has_models_perms
+from ..utils import (
+    _build_permstring,
+    is_customer,
+    reset_authorization_context,
+    user_has_models_perms,
+)
 
 
 @pytest.mark.parametrize(
@@ -30,3 +35,31 @@ def test_user_has_models_perms_invalid_perm():
         user_has_models_perms("foobar", (User,))
 
     assert exception.value.args[0] == "The permission to check is not a valid type"
+
+
+def test_is_customer_is_memoized(customer_profile, django_assert_num_queries):
+    user = customer_profile.user
+    assert is_customer(user)
+
+    with django_assert_num_queries(0):
+        assert is_customer(user)
+
+
+def test_user_has_models_perms_is_memoized(user, django_assert_num_queries):
+    check = user_has_models_perms("view", (User,))
+    assert not check(user)
+
+    with django_assert_num_queries(0):
+        assert not check(user)
+        assert not user_has_models_perms("view", (User,))(user)
+
+
+def test_reset_authorization_context(customer_profile):
+    user = customer_profile.user
+    assert is_customer(user)
+
+    user.groups.clear()
+    assert is_customer(user)
+
+    reset_authorization_context(user)
+    assert not is_customer(user)
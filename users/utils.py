@@ -1,4 +1,5 @@
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from typing import Dict, List, Tuple
 
 from django.conf import settings
 from django.contrib.auth.models import Group
@@ -18,6 +19,51 @@ def _build_permstring(perm, model):
     return f"{model._meta.app_label}.{perm}_{model._meta.model_name}"
 
 
+class AuthorizationContext:
+    """
+    Memoizes the authorization checks of a user.
+
+    The groups are loaded once and the results of the permission checks are kept,
+    so the checks done for every row of a query do not hit the DB again.
+    A new context is started for every GraphQL execution (see GQLAuthorizationContext),
+    otherwise the context lives as long as the user instance (i.e. the request).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._perms: Dict[Tuple[str, ...], bool] = {}
+
+    @cached_property
+    def group_names(self) -> List[str]:
+        return list(self.user.groups.values_list("name", flat=True))
+
+    @cached_property
+    def is_customer(self) -> bool:
+        user = self.user
+        if user.is_staff or user.is_superuser:
+            return False
+        return self.group_names == [settings.CUSTOMER_GROUP_NAME] and hasattr(
+            user, "customer"
+        )
+
+    def has_perms(self, perms: Tuple[str, ...]) -> bool:
+        if perms not in self._perms:
+            self._perms[perms] = self.user.has_perms(perms)
+        return self._perms[perms]
+
+
+def get_authorization_context(user) -> AuthorizationContext:
+    if (context := getattr(user, "_authorization_context", None)) is None:
+        context = reset_authorization_context(user)
+    return context
+
+
+def reset_authorization_context(user) -> AuthorizationContext:
+    context = AuthorizationContext(user)
+    user._authorization_context = context
+    return context
+
+
 def user_has_models_perms(perm, models):
     """Check if the user has all the permissions required"""
     if len(list(models)) == 0:
@@ -26,8 +72,10 @@ def user_has_models_perms(perm, models):
     if perm not in VALID_PERMS:
         raise ValueError("The permission to check is not a valid type")
 
+    perms = tuple(_build_permstring(perm, model) for model in models)
+
     def wrapper(user):
-        return user.has_perms([_build_permstring(perm, model) for model in models])
+        return get_authorization_context(user).has_perms(perms)
 
     return wrapper
 
@@ -49,15 +97,7 @@ def user_has_delete_permission(*models):
 
 
 def is_customer(user):
-    if user.is_staff or user.is_superuser:
-        return False
-    elif (
-        user.groups.count() == 1
-        and user.groups.first().name == settings.CUSTOMER_GROUP_NAME
-        and hasattr(user, "customer")
-    ):
-        return True
-    return False
+    return get_authorization_context(user).is_customer
 
 
 @lru_cache(maxsize=3)
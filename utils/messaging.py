@@ -1,4 +1,13 @@
+import logging
+
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from django_ilmoitin.models import NotificationTemplate, NotificationTemplateException
+from django_ilmoitin.utils import render_notification_template, send_mail
+from mailer.engine import send_all
+from mailer.models import Message
+
+logger = logging.getLogger(__name__)
 
 
 def get_email_subject(notification_type):
@@ -19,3 +28,47 @@ def get_email_subject(notification_type):
     elif notification_type == ApplicationsNotificationType.BERTH_APPLICATION_REJECTED:
         return _("Berth application processed")
     return notification_type.label
+
+
+def queue_notification(email, notification_type, context=None, language=None) -> None:
+    """
+    Queue the notification like ``django_ilmoitin.utils.send_notification`` does,
+    but without sending the mail queue right away. Used for sending notifications
+    in bulk, the queue should be sent once at the end with ``send_queued_notifications``.
+    """
+    language = language or settings.LANGUAGES[0][0]
+    template = NotificationTemplate.objects.filter(type=notification_type).first()
+    if not template:
+        logger.warning(
+            f'No notification template created for "{notification_type}" event, '
+            "not sending anything."
+        )
+        return
+
+    try:
+        subject, body_html, body_text = render_notification_template(
+            template, context or {}, language
+        )
+    except NotificationTemplateException as e:
+        logger.error(e, exc_info=True)
+        return
+
+    from_email = getattr(settings, "ILMOITIN_TRANSLATED_FROM_EMAIL", {}).get(
+        language, settings.DEFAULT_FROM_EMAIL
+    )
+    send_mail(subject, body_text, email, from_email=from_email, body_html=body_html)
+
+    if template.admin_notification_subject and template.admin_notification_text:
+        for admin in template.admins_to_notify.all():
+            send_mail(
+                template.admin_notification_subject,
+                template.admin_notification_text,
+                admin.email,
+                from_email=from_email,
+            )
+
+
+def send_queued_notifications() -> None:
+    if not getattr(settings, "ILMOITIN_QUEUE_NOTIFICATIONS", False):
+        Message.objects.retry_deferred()
+        send_all()
@@ -2,6 +2,7 @@ import uuid
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from helsinki_gdpr.models import SerializableMixin
 
 
 class UUIDModel(models.Model):
@@ -17,3 +18,12 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class SerializableManager(SerializableMixin.SerializableManager):
+    def serialize(self):
+        # Unlike get_queryset().all(), all() returns the objects prefetched
+        # for a related manager instead of querying them again
+        return [
+            obj.serialize() if hasattr(obj, "serialize") else [] for obj in self.all()
+        ]
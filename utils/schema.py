@@ -1,8 +1,12 @@
 import graphene
 from django.db.models import QuerySet
+from graphene_django.filter import DjangoFilterConnectionField
 
 from users.utils import is_customer, user_has_view_permission
 
+# The arguments of a connection field, besides the filters
+CONNECTION_ARGS = {"first", "last", "before", "after", "offset"}
+
 
 def update_object(instance, input):
     if not input:
@@ -57,3 +61,17 @@ class CountConnection(graphene.Connection):
             return self.resolve_count(info)
 
         return len(self.iterable)
+
+
+class DjangoFilterListConnectionField(DjangoFilterConnectionField):
+    """
+    DjangoFilterConnectionField, which also accepts a list of nodes (e.g. prefetched
+    objects) from the resolver. The list is returned as it is, so the resolver
+    is responsible for filtering it.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, **kwargs):
+        if isinstance(iterable, list):
+            return iterable
+        return super().resolve_queryset(connection, iterable, info, args, **kwargs)